@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Metin Temizleme Benchmark'ı
+Path: benchmarks/bench_clean_text.py
+
+Eski satır bazlı apply + str.replace döngüsü ile vektörel tek-regex temizliği
+sentetik bir veri seti üzerinde karşılaştırır.
+
+Kullanım:
+    python benchmarks/bench_clean_text.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from text_normalization import CLEANER_NOISE_TEXTS, clean_review_texts  # noqa: E402
+
+WORDS = [
+    "harika", "yer", "çok", "güzel", "personel", "ilgili", "fiyatlar", "uygun",
+    "очень", "хорошо", "great", "service", "temiz", "kalabalık", "havalimanı",
+    "Abone ol", "Varsayılan", "Deneyimini paylaş", "  ", "\n", "\t"
+]
+
+
+def make_dataset(rows, seed=42):
+    """Sentetik yorum metinleri üret (boş değerler ve gereksiz metinler dahil)"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(rows):
+        if rng.random() < 0.02:
+            texts.append(None)
+        else:
+            texts.append(" ".join(rng.choices(WORDS, k=rng.randint(3, 40))))
+    return pd.Series(texts, dtype=object)
+
+
+def legacy_clean(series):
+    """Eski clean_data 5. adımı"""
+    series = series.fillna('').apply(lambda x: re.sub(r'\s+', ' ', x).strip())
+    for text in CLEANER_NOISE_TEXTS:
+        series = series.str.replace(text, '', regex=False)
+    return series
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {elapsed:8.2f} sn")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="clean_data metin temizleme benchmark'ı")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"📦 {args.rows} satırlık sentetik veri üretiliyor...")
+    series = make_dataset(args.rows)
+
+    print("⏱️ Sonuçlar:")
+    _, legacy_time = timed("apply + str.replace döngüsü", legacy_clean, series)
+    _, object_time = timed("tek regex (object/string)", clean_review_texts, series, prefer_arrow=False)
+    _, arrow_time = timed("tek regex (string[pyarrow])", clean_review_texts, series)
+
+    _, len_apply = timed(".apply(len)", series.fillna('').apply, len)
+    _, len_vector = timed(".str.len() (pyarrow)", lambda s: s.str.len(), series.fillna('').astype("string[pyarrow]"))
+
+    print(f"🚀 Temizlik hızlanması: x{legacy_time / arrow_time:.1f} (object: x{legacy_time / object_time:.1f})")
+    print(f"🚀 Uzunluk hızlanması: x{len_apply / len_vector:.1f}")
+
+
+if __name__ == "__main__":
+    main()
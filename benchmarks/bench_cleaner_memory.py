@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Temizleyici Bellek/dtype Benchmark'ı
+Path: benchmarks/bench_cleaner_memory.py
+
+Sentetik bir yorum tablosunu iki şekilde karşılaştırır:
+- Eski: varsayılan object sütunlar (float puan, object bool bayrak, Python str metinler)
+- Yeni: review_schema.apply_review_schema (pyarrow string, kategori, Int8, boolean)
+
+Bellek memory_usage(deep=True) ile ölçülür; ardından temizleyicinin tipik işlemleri zamanlanır.
+
+Kullanım:
+    python benchmarks/bench_cleaner_memory.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from review_schema import apply_review_schema  # noqa: E402
+
+WORDS = ["harika", "yer", "çok", "güzel", "personel", "ilgili", "fiyatlar", "uygun",
+         "очень", "хорошо", "great", "service", "temiz", "kalabalık", "havalimanı"]
+DATES = ["bugün", "dün", "2 gün önce", "1 hafta önce", "15 Ocak 2024", "3 ay önce", "1 yıl önce"]
+
+
+def make_dataset(rows, seed=42):
+    """load_data'nın eski çıktısına benzer object sütunlu tablo"""
+    rng = random.Random(seed)
+    authors = [f"Kullanıcı {i}" for i in range(rows // 3 + 1)]
+    return pd.DataFrame({
+        'review_id': [f"{rng.getrandbits(128):032x}" for _ in range(rows)],
+        'author_name': [rng.choice(authors) for _ in range(rows)],
+        'rating': [float(rng.randint(1, 5)) if rng.random() > 0.01 else None for _ in range(rows)],
+        'text_original': [" ".join(rng.choices(WORDS, k=rng.randint(3, 40))) for _ in range(rows)],
+        'date': [rng.choice(DATES) for _ in range(rows)],
+        'has_photos': [rng.random() < 0.2 for _ in range(rows)],
+        'business_reply': [None if rng.random() > 0.3 else "Teşekkür ederiz!" for _ in range(rows)],
+        'business_id': [str(1000 + rng.randrange(20)) for _ in range(rows)],
+    }).astype(object)
+
+
+def operations(df):
+    """Temizleyicide tekrar tekrar yapılan işlemler"""
+    return {
+        'drop_duplicates': lambda: df.drop_duplicates(subset=['author_name', 'text_original']),
+        'rating value_counts': lambda: df['rating'].value_counts(dropna=False),
+        'işletme başına ortalama': lambda: df.groupby('business_id', observed=True)['rating'].mean(),
+        'boş yazar maskesi': lambda: df['author_name'].isna() | (df['author_name'] == ''),
+    }
+
+
+def timed(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temizleyici dtype şeması bellek benchmark'ı")
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+
+    legacy = make_dataset(args.rows)
+    start = time.perf_counter()
+    typed = apply_review_schema(legacy)
+    print(f"🧱 Şema uygulandı: {time.perf_counter() - start:.2f} sn")
+
+    legacy_memory = legacy.memory_usage(deep=True)
+    typed_memory = typed.memory_usage(deep=True)
+    print(f"{'Sütun':<16} {'object':>12} {'şema':>12} {'dtype':>16}")
+    for column in typed.columns:
+        print(f"{column:<16} {legacy_memory[column] / 2**20:9.1f} MiB {typed_memory[column] / 2**20:9.1f} MiB "
+              f"{str(typed[column].dtype):>16}")
+    print(f"{'TOPLAM':<16} {legacy_memory.sum() / 2**20:9.1f} MiB {typed_memory.sum() / 2**20:9.1f} MiB "
+          f"({legacy_memory.sum() / typed_memory.sum():.1f}x)")
+
+    print(f"\n{'İşlem':<26} {'object':>10} {'şema':>10}")
+    legacy_ops, typed_ops = operations(legacy), operations(typed)
+    for name in legacy_ops:
+        print(f"{name:<26} {timed(legacy_ops[name]) * 1000:7.1f} ms {timed(typed_ops[name]) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
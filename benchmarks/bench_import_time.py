@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Import Süresi (Soğuk Başlangıç) Benchmark'ı
+Path: benchmarks/bench_import_time.py
+
+İş başına yeni süreç başlatan işçilerde modül import süresi her işte ödenir. Bu betik her ölçümü
+ayrı bir Python sürecinde yapar:
+- Boş yorumlayıcı başlangıcı (referans)
+- `import pagination_scraper` (pandas ve Playwright ilk kullanıma kadar yüklenmemeli)
+- Karşılaştırma için pandas + Playwright'ın eager import edildiği eski durum
+
+Ayrıca import sırasında ağır modüllerin yüklenip yüklenmediğini ve çalışma klasöründe dosya/klasör
+oluşup oluşmadığını kontrol eder; biri olursa çıkış kodu 1'dir.
+
+Kullanım:
+    python benchmarks/bench_import_time.py --runs 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'pyarrow', 'playwright')
+
+CHECK_SCRIPT = f"""
+import json, os, sys
+sys.path.insert(0, {ROOT!r})
+import logging
+import pagination_scraper
+print(json.dumps({{
+    'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+    'files': os.listdir('.'),
+    'root_handlers': len(logging.getLogger().handlers)
+}}))
+"""
+
+
+def time_import(code, runs, cwd):
+    """Her çalıştırma yeni süreç: duvar saati süreleri (sn)"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return sorted(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pagination_scraper import süresi benchmark'ı")
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    cwd = tempfile.mkdtemp(prefix="bench_import_")
+    setup = f"import sys; sys.path.insert(0, {ROOT!r}); "
+    cases = [
+        ("Boş yorumlayıcı", "pass"),
+        ("import pagination_scraper", setup + "import pagination_scraper"),
+    ]
+    try:
+        import pandas  # noqa: F401
+        eager = setup + "import pandas; import pagination_scraper"
+        try:
+            import playwright.async_api  # noqa: F401
+            eager += "; import playwright.async_api"
+        except ImportError:
+            pass
+        cases.append(("+ eager pandas/Playwright (eski)", eager))
+    except ImportError:
+        pass
+
+    print(f"⏱️ {args.runs} çalıştırma, medyan / en iyi:")
+    for name, code in cases:
+        times = time_import(code, args.runs, cwd)
+        print(f"  {name:<34} {times[len(times) // 2] * 1000:8.1f} ms  {times[0] * 1000:8.1f} ms")
+
+    result = json.loads(subprocess.run([sys.executable, '-c', CHECK_SCRIPT], cwd=cwd, check=True,
+                                       capture_output=True, text=True).stdout)
+    problems = []
+    if result['heavy']:
+        problems.append(f"import sırasında yüklenen ağır modüller: {', '.join(result['heavy'])}")
+    if result['files']:
+        problems.append(f"import sırasında oluşan dosyalar: {', '.join(result['files'])}")
+    if result['root_handlers']:
+        problems.append("import sırasında kök logger yapılandırıldı")
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ Import yan etkisiz: ağır modül, dosya veya log ayarı yok")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
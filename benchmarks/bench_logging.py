@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Loglama Maliyeti Benchmark'ı
+Path: benchmarks/bench_logging.py
+
+Log çağıran tarafın (olay döngüsünün) bir log satırı için harcadığı süreyi ölçer:
+- Eski: senkron FileHandler + StreamHandler (her satırda disk ve konsol yazımı çağıranda yapılır)
+- Yeni: structured_logging.configure_logging (QueueHandler; yazım arka plan iş parçacığında)
+--slow-disk-ms ile her yazıma yapay gecikme eklenerek yavaş disk / çok oturumlu durum taklit edilir.
+
+Kullanım:
+    python benchmarks/bench_logging.py --lines 20000 --slow-disk-ms 0.2
+"""
+
+import argparse
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from structured_logging import configure_logging, log_context, stop_logging  # noqa: E402
+
+
+class SlowStream(io.StringIO):
+    """Her yazımda gecikme ekleyen akış (yavaş disk/terminal)"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        return super().write(text)
+
+
+def run(logger, lines):
+    start = time.perf_counter()
+    with log_context(job_id=1, business_id="85454152633", phase='scroll'):
+        for i in range(lines):
+            logger.info("✅ %d yorum işlendi", i)
+    return (time.perf_counter() - start) / lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log çağrısı başına maliyet benchmark'ı")
+    parser.add_argument("--lines", type=int, default=20_000)
+    parser.add_argument("--slow-disk-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    delay = args.slow_disk_ms / 1000
+    log_file = os.path.join(tempfile.mkdtemp(prefix="bench_logging_"), "scraper.log")
+    logger = logging.getLogger("bench")
+
+    # Eski: senkron handler'lar
+    root = logging.getLogger()
+    file_handler = logging.FileHandler(log_file)
+    file_handler.stream = SlowStream(delay)
+    handlers = [file_handler, logging.StreamHandler(SlowStream(delay))]
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    sync_cost = run(logger, args.lines)
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    # Yeni: kuyruk + arka plan dinleyici (JSON)
+    listener = configure_logging(log_file, json_format=True, console=False)
+    for handler in listener.handlers:
+        handler.stream = SlowStream(delay)
+    queued_cost = run(logger, args.lines)
+    drain_start = time.perf_counter()
+    stop_logging()
+    drain = time.perf_counter() - drain_start
+
+    print(f"📝 {args.lines} log satırı (yazım gecikmesi {args.slow_disk_ms} ms), çağıran tarafta satır başına:")
+    print(f"  Senkron File+Stream handler   {sync_cost * 1e6:10.1f} µs")
+    print(f"  QueueHandler (JSON)           {queued_cost * 1e6:10.1f} µs")
+    print(f"  (Dinleyicinin kuyruğu boşaltması: {drain:.2f} sn, olay döngüsü dışında)")
+
+
+if __name__ == "__main__":
+    main()
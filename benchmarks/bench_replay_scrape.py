@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - HAR Tekrar Oynatma Benchmark'ı
+Path: benchmarks/bench_replay_scrape.py
+
+Kaydedilmiş bir kazıma oturumunu (HAR) canlı siteye gitmeden tekrar oynatır ve tam kazıma
+döngüsünün süresini ölçer. Ağ gecikmesi ve CAPTCHA olmadığı için sonuçlar tekrarlanabilirdir;
+çıkarıcı değişiklikleri ve kaydırma ayarları aynı arşiv üzerinde karşılaştırılabilir.
+--stream ile akış API'si (iter_reviews) kullanılır ve ilk yorumun gelme süresi de raporlanır.
+
+Kayıt:
+    python pagination_scraper.py <işletme URL> --record-har   (data/har/session_*.har.zip)
+Kullanım:
+    python benchmarks/bench_replay_scrape.py data/har/session_20250101_120000.har.zip --runs 3 --scroll-delay 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_discovery import ORG_URL_PATTERN  # noqa: E402
+
+
+def business_url_from_har(path):
+    """Arşivdeki ilk işletme sayfası (HTML) isteğinin URL'si"""
+    if path.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            har = json.loads(archive.read(next(n for n in archive.namelist() if n.endswith('.har'))))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            har = json.load(f)
+    for entry in har['log']['entries']:
+        mime = entry['response'].get('content', {}).get('mimeType', '')
+        if 'html' in mime and ORG_URL_PATTERN.search(entry['request']['url']):
+            return entry['request']['url']
+    raise SystemExit("❌ Arşivde işletme sayfası bulunamadı, --url verin")
+
+
+async def replay_once(har_path, url, max_reviews, scroll_delay, stream=False):
+    """(toplam süre, yorum sayısı, ilk yoruma kadar geçen süre veya None)"""
+    from pagination_scraper import ScraperConfig, YandexMapsScraper
+
+    scraper = YandexMapsScraper(ScraperConfig(replay_har_path=har_path, scroll_delay=scroll_delay,
+                                              aggregates_path=None, output_formats=[]))
+    start = time.perf_counter()
+    if not stream:
+        data = await scraper.scrape_all_reviews(url, max_reviews=max_reviews)
+        return time.perf_counter() - start, len(data.get('reviews') or []), None
+    count = 0
+    first = None
+    async for _ in scraper.iter_reviews(url, max_reviews=max_reviews):
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    return time.perf_counter() - start, count, first
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HAR arşivi üzerinde kazıma döngüsü benchmark'ı")
+    parser.add_argument("har", help="pagination_scraper ile kaydedilmiş .har veya .har.zip")
+    parser.add_argument("--url", default=None, help="İşletme URL'si (varsayılan: arşivden bulunur)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-reviews", type=int, default=None)
+    parser.add_argument("--scroll-delay", type=float, default=1.5)
+    parser.add_argument("--stream", action="store_true", help="iter_reviews ile kazı, ilk yorum süresini ölç")
+    args = parser.parse_args()
+
+    har_path = os.path.abspath(args.har)
+    url = args.url or business_url_from_har(har_path)
+    # Autosave/log dosyaları geçici klasöre yazılsın
+    os.chdir(tempfile.mkdtemp(prefix="bench_replay_"))
+
+    print(f"▶️ {url}")
+    print("⏱️ Sonuçlar:")
+    times = []
+    for run in range(1, args.runs + 1):
+        elapsed, count, first = asyncio.run(replay_once(har_path, url, args.max_reviews, args.scroll_delay,
+                                                        args.stream))
+        times.append(elapsed)
+        first_text = f"  ilk yorum: {first:.2f} sn" if first is not None else ""
+        print(f"  Çalıştırma {run}: {elapsed:8.2f} sn  {count:6d} yorum  ({count / elapsed:.1f} yorum/sn){first_text}")
+    times.sort()
+    print(f"📊 Medyan: {times[len(times) // 2]:.2f} sn, en iyi: {times[0]:.2f} sn")
+
+
+if __name__ == "__main__":
+    main()
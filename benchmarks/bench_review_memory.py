@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yorum Bellek Kullanımı Benchmark'ı
+Path: benchmarks/bench_review_memory.py
+
+Kazıma döngüsünde tutulan yorum başına belleği tracemalloc ile ölçer:
+- Eski: 7 alanlı sözlük + 32 karakter hex review_id + hex MD5 içerik hash'i seti ve deque'ler
+- Yeni: __slots__ ReviewRecord (16 baytlık özet, intern edilmiş yazar/tarih) + ReviewDedupeIndex
+
+Kullanım:
+    python benchmarks/bench_review_memory.py --reviews 50000
+"""
+
+import argparse
+import collections
+import gc
+import hashlib
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from review_records import ReviewDedupeIndex, ReviewRecord  # noqa: E402
+from text_normalization import normalize_review_text  # noqa: E402
+
+WORDS = ["harika", "yer", "çok", "güzel", "personel", "ilgili", "fiyatlar", "uygun",
+         "очень", "хорошо", "great", "service", "temiz", "kalabalık", "havalimanı"]
+DATES = ["bugün", "dün", "2 gün önce", "1 hafta önce", "15 Ocak 2024", "3 ay önce", "1 yıl önce"]
+
+
+def make_fields(count, seed=42):
+    """Her çalıştırmada aynı sentetik alanlar (yazarlar tekrar eder, metinler benzersizdir)"""
+    rng = random.Random(seed)
+    authors = [f"Kullanıcı {i}" for i in range(count // 5)]
+    for i in range(count):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(5, 60))) + f" #{i}"
+        reply = "Değerli yorumunuz için teşekkür ederiz." if rng.random() < 0.3 else None
+        # Her metin ayrı bir nesnedir (sayfadan okunan gibi); yazar adları da her seferinde yeniden oluşur
+        yield ("".join(rng.choice(authors)), float(rng.randint(1, 5)), text, "".join(rng.choice(DATES)),
+               rng.random() < 0.2, reply)
+
+
+def legacy_collect(count):
+    reviews = []
+    recent_ids = collections.deque(maxlen=30)
+    recent_hashes = collections.deque(maxlen=30)
+    content_hashes = set()
+    for author, rating, text, date, photos, reply in make_fields(count):
+        review_id = hashlib.md5(f"{author}_{text}_{date}".encode()).hexdigest()
+        content_hash = hashlib.md5(normalize_review_text(text).encode()).hexdigest()
+        recent_ids.append(review_id)
+        recent_hashes.append(content_hash)
+        content_hashes.add(content_hash)
+        reviews.append({'review_id': review_id, 'author_name': author, 'rating': rating, 'text_original': text,
+                        'date': date, 'has_photos': photos, 'business_reply': reply})
+    return reviews, content_hashes, recent_ids, recent_hashes
+
+
+def compact_collect(count):
+    reviews = []
+    index = ReviewDedupeIndex()
+    for fields in make_fields(count):
+        record = ReviewRecord.create(*fields)
+        if not index.is_duplicate(record):
+            reviews.append(record)
+    return reviews, index
+
+
+def text_bytes(count):
+    """Yorum metinlerinin kendisi (iki gösterimde de aynı) - karşılaştırmadan çıkarılır"""
+    return sum(sys.getsizeof(fields[2]) for fields in make_fields(count))
+
+
+def measure(func, count):
+    gc.collect()
+    tracemalloc.start()
+    result = func(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yorum başına bellek benchmark'ı")
+    parser.add_argument("--reviews", type=int, default=50_000)
+    args = parser.parse_args()
+
+    n = args.reviews
+    texts = text_bytes(n)
+    legacy = measure(legacy_collect, n)
+    compact = measure(compact_collect, n)
+
+    print(f"📦 {n} yorum (metinler hariç yorum başına / toplam):")
+    print(f"  Sözlük + hex hash'ler     {(legacy - texts) / n:8.1f} B   {legacy / 2**20:8.1f} MiB")
+    print(f"  ReviewRecord + özetler    {(compact - texts) / n:8.1f} B   {compact / 2**20:8.1f} MiB")
+    print(f"🚀 Metin dışı ek yük azalması: x{(legacy - texts) / (compact - texts):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yorum Arama Benchmark'ı
+Path: benchmarks/bench_search.py
+
+Sentetik bir yorum arşivinde anahtar kelime aramasını karşılaştırır:
+- Eski: CSV'yi pandas'a yükleyip str.contains (her sorguda tüm metinler taranır)
+- Yeni: review_search.ReviewSearchIndex (SQLite FTS5), filtreli ve filtresiz
+
+Kullanım:
+    python benchmarks/bench_search.py --rows 1000000 --businesses 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from review_search import ReviewSearchIndex  # noqa: E402
+
+WORDS = [
+    "harika", "yer", "çok", "güzel", "personel", "ilgili", "fiyatlar", "uygun", "kahve", "soğuk",
+    "kötü", "bekledik", "temiz", "kalabalık", "havalimanı", "очень", "хорошо", "кофе", "great",
+    "service", "otopark", "tuvalet", "lezzetli", "pahalı", "güler", "yüzlü", "sıra", "uzun"
+]
+SYLLABLES = ["ka", "le", "mi", "ro", "su", "ta", "ne", "di", "po", "za", "şe", "çı", "gü", "ön"]
+QUERIES = [("otopark", {}), ("soğuk kahve", {}), ("kötü", {'max_rating': 2}), ("pahalı", {'business_id': '1000'})]
+
+
+def make_vocabulary(rng, size=20_000):
+    """Sentetik kelimeler + orta sıklıkta sorgu kelimeleri; Zipf benzeri ağırlıklar (çoğu kelime nadir)"""
+    words = ["".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size - len(WORDS))]
+    words[100:100] = WORDS
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+
+def make_dataset(rows, businesses, seed=42):
+    rng = random.Random(seed)
+    words, weights = make_vocabulary(rng)
+    return pd.DataFrame({
+        'business_id': [str(1000 + rng.randrange(businesses)) for _ in range(rows)],
+        'review_id': [f"{i:032x}" for i in range(rows)],
+        'author_name': [f"Kullanıcı {rng.randrange(rows // 3 + 1)}" for _ in range(rows)],
+        'rating': [rng.randint(1, 5) for _ in range(rows)],
+        'review_date': [f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" for _ in range(rows)],
+        'text_original': [" ".join(rng.choices(words, weights, k=rng.randint(5, 40))) for _ in range(rows)]
+    })
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tam metin arama benchmark'ı")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--businesses", type=int, default=100)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_search_")
+    df = make_dataset(args.rows, args.businesses)
+    csv_path = os.path.join(workdir, "reviews.csv")
+    df.to_csv(csv_path, index=False)
+
+    index = ReviewSearchIndex(os.path.join(workdir, "search.sqlite"))
+    start = time.perf_counter()
+    for business_id, group in df.groupby('business_id'):
+        index.add(business_id, group)
+    index.optimize()
+    print(f"🔎 {args.rows} yorum indekslendi: {time.perf_counter() - start:.1f} sn")
+
+    load_seconds, frame = timed(lambda: pd.read_csv(csv_path, dtype={'business_id': str}), repeat=1)
+    print(f"📂 pandas CSV yükleme (eski yöntemde her araç/oturumda): {load_seconds:.2f} sn")
+    print(f"{'Sorgu':<28} {'str.contains':>14} {'FTS5':>12} {'sonuç':>8}")
+    for query, filters in QUERIES:
+        def contains():
+            mask = pd.Series(True, index=frame.index)
+            for word in query.split():
+                mask &= frame['text_original'].str.contains(word, case=False, regex=False)
+            if 'max_rating' in filters:
+                mask &= frame['rating'] <= filters['max_rating']
+            if 'business_id' in filters:
+                mask &= frame['business_id'] == filters['business_id']
+            return frame[mask].head(50)
+
+        pandas_seconds, _ = timed(contains, repeat=3)
+        fts_seconds, results = timed(lambda: index.search(query, limit=50, **filters))
+        label = query + (f" {filters}" if filters else "")
+        print(f"{label[:28]:<28} {pandas_seconds * 1000:11.1f} ms {fts_seconds * 1000:9.1f} ms {len(results):8d}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Artımlı Temizlik Durumu
+Path: clean_state.py
+
+Her işletme için kalıcı temizlik durumu tutar:
+1. Dosya bazlı watermark: her girdi dosyasından kaç yorumun işlendiği
+2. Tekrar durumu: işlenmiş review_id ve (yazar + metin) anahtarlarının 64-bit hash'leri
+3. Kümülatif veri kalitesi istatistikleri (analyze_data_quality çıktılarının toplamı)
+
+Dosya yapısı: <state_dir>/<business_id>/state.json, seen_review_ids.npy, seen_content.npy
+"""
+
+import os
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+CONTENT_COLUMNS = ['author_name', 'text_original']
+
+
+def review_id_hashes(df):
+    """review_id sütununun kararlı 64-bit hash'leri (sütun yoksa boş dizi)"""
+    if 'review_id' not in df.columns:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df['review_id'].astype(str), index=False).to_numpy()
+
+
+def content_hashes(df):
+    """(author_name, text_original) çiftinin kararlı 64-bit hash'leri"""
+    if not all(col in df.columns for col in CONTENT_COLUMNS):
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df[CONTENT_COLUMNS].fillna('').astype(str), index=False).to_numpy()
+
+
+def merge_quality_stats(total, delta):
+    """İki analyze_data_quality sonucunu birleştir (sayımlar toplanır, ortalama yeniden hesaplanır)"""
+    if not total:
+        return dict(delta)
+    merged = {
+        'record_count': total.get('record_count', 0) + delta.get('record_count', 0),
+        'text_length_sum': total.get('text_length_sum', 0) + delta.get('text_length_sum', 0),
+        'duplicate_ids': total.get('duplicate_ids', 0) + delta.get('duplicate_ids', 0),
+        'duplicate_content': total.get('duplicate_content', 0) + delta.get('duplicate_content', 0),
+        'empty_fields': dict(total.get('empty_fields', {})),
+        'rating_counts': dict(total.get('rating_counts', {}))
+    }
+    for field, count in delta.get('empty_fields', {}).items():
+        merged['empty_fields'][field] = merged['empty_fields'].get(field, 0) + count
+    for rating, count in delta.get('rating_counts', {}).items():
+        merged['rating_counts'][rating] = merged['rating_counts'].get(rating, 0) + count
+    merged['avg_text_length'] = (merged['text_length_sum'] / merged['record_count']
+                                 if merged['record_count'] else 0)
+    return merged
+
+
+class BusinessCleanState:
+    """Bir işletmenin artımlı temizlik durumu"""
+
+    def __init__(self, state_dir, business_id):
+        self.business_id = str(business_id)
+        self.path = os.path.join(state_dir, self.business_id)
+        self.watermarks = {}
+        self.quality = {}
+        self.cleaned_records = 0
+        self.updated_at = None
+        self.seen_review_ids = np.empty(0, dtype=np.uint64)
+        self.seen_content = np.empty(0, dtype=np.uint64)
+        self.load()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def load(self):
+        """Diskteki durumu yükle (yoksa boş durumla başla)"""
+        if os.path.exists(self._file('state.json')):
+            with open(self._file('state.json'), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.watermarks = data.get('watermarks', {})
+            self.quality = data.get('quality', {})
+            self.cleaned_records = data.get('cleaned_records', 0)
+            self.updated_at = data.get('updated_at')
+        for attr, name in (('seen_review_ids', 'seen_review_ids.npy'), ('seen_content', 'seen_content.npy')):
+            if os.path.exists(self._file(name)):
+                setattr(self, attr, np.load(self._file(name)))
+
+    def save(self):
+        """Durumu diske yaz (önce geçici dosyaya, sonra atomik olarak yerine)"""
+        os.makedirs(self.path, exist_ok=True)
+        self.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        data = {
+            'business_id': self.business_id,
+            'watermarks': self.watermarks,
+            'quality': self.quality,
+            'cleaned_records': self.cleaned_records,
+            'updated_at': self.updated_at
+        }
+        tmp = self._file('state.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=int)
+        os.replace(tmp, self._file('state.json'))
+        for attr, name in (('seen_review_ids', 'seen_review_ids.npy'), ('seen_content', 'seen_content.npy')):
+            tmp = self._file(name + '.tmp.npy')
+            np.save(tmp, getattr(self, attr))
+            os.replace(tmp, self._file(name))
+
+    def watermark(self, file_path):
+        """Dosyadan daha önce işlenmiş yorum sayısı. Dosya küçülmüşse (yeniden yazılmış) 0 döner."""
+        mark = self.watermarks.get(os.path.abspath(file_path))
+        if not mark:
+            return 0
+        if os.path.getsize(file_path) < mark.get('size', 0):
+            return 0
+        return mark.get('records', 0)
+
+    def file_unchanged(self, file_path):
+        """Dosya son işlemden beri hiç değişmemiş mi?"""
+        mark = self.watermarks.get(os.path.abspath(file_path))
+        stat = os.stat(file_path)
+        return bool(mark) and mark.get('size') == stat.st_size and mark.get('mtime') == stat.st_mtime
+
+    def set_watermark(self, file_path, records):
+        stat = os.stat(file_path)
+        self.watermarks[os.path.abspath(file_path)] = {
+            'records': int(records),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime
+        }
+
+    def known_mask(self, df):
+        """Daha önce temizlenmiş (review_id veya içerik olarak bilinen) satırların maskesi; aynı grupta
+        tekrar okunan review_id'ler de (ör. aynı çalıştırmanın autosave ve ham dosyası) ilk geçiş dışında işaretlenir"""
+        mask = np.zeros(len(df), dtype=bool)
+        ids = review_id_hashes(df)
+        if len(ids):
+            mask |= pd.Series(ids).duplicated().to_numpy() & df['review_id'].notna().to_numpy()
+        if len(ids) and len(self.seen_review_ids):
+            mask |= np.isin(ids, self.seen_review_ids)
+        content = content_hashes(df)
+        if len(content) and len(self.seen_content):
+            mask |= np.isin(content, self.seen_content)
+        return mask
+
+    def remember(self, df):
+        """Yeni satırların anahtarlarını tekrar durumuna ekle"""
+        self.seen_review_ids = np.union1d(self.seen_review_ids, review_id_hashes(df))
+        self.seen_content = np.union1d(self.seen_content, content_hashes(df))
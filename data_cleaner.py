@@ -10,21 +10,27 @@ Bu script, çekilen yorum verilerindeki sorunları temizler:
 """
 
 import os
+import glob
+import time
+import argparse
 import pandas as pd
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import logging
+from text_normalization import clean_review_texts, string_dtype
+from near_duplicates import merge_near_duplicates
+from clean_state import BusinessCleanState, merge_quality_stats
+from date_parser import parse_review_dates
+from review_aggregates import AggregateStore
+from review_schema import apply_review_schema
+from review_search import ReviewSearchIndex
+from review_storage import (is_jsonl_path, iter_jsonl_records, iter_review_batches, read_reviews_parquet,
+                            write_reviews_dataset, write_reviews_parquet, HEADER_TYPE, JSONL_EXTENSIONS)
+from structured_logging import configure_logging
 
-# Logging ayarları
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("data_cleaner.log"),
-        logging.StreamHandler()
-    ]
-)
+# Logging main() içinde (ve süreç havuzunda her worker'da) kurulur; import yan etkisizdir
 logger = logging.getLogger(__name__)
 
 class YandexDataCleaner:
@@ -32,23 +38,47 @@ class YandexDataCleaner:
         self.input_file = None
         self.output_file = None
         self.df = None
+        self.business_id = None
+        self.scrape_date = None
+        # Verilirse temiz veri ayrıca business_id/scrape_date bölümlü Parquet veri setine eklenir
+        self.parquet_dataset_dir = None
         self.total_records = 0
         self.duplicate_count = 0
+        self.near_duplicate_count = 0
+        # Yakın tekrar eşiği (MinHash Jaccard tahmini); None verilirse aşama atlanır
+        self.near_duplicate_threshold = 0.8
         self.empty_fields_count = {
             'author_name': 0,
             'text_original': 0,
             'date': 0,
             'rating': 0
         }
+        # Mümkünse metin sütunları pyarrow string dtype ile işlenir
+        self.prefer_arrow_strings = True
+        # Verilirse temizlenen yorumlar bu SQLite dosyasındaki işletme toplamlarına eklenir
+        self.aggregates_path = None
+        # Verilirse temizlenen yorumlar arama indeksine eklenir (kazıma metni temiz metinle güncellenir)
+        self.search_index_path = None
         
-    def load_data(self, file_path):
-        """CSV veya JSON dosyasından veri yükle"""
+    def load_data(self, file_path, columns=None):
+        """CSV, JSON, NDJSON (.jsonl[.gz|.zst]), Parquet dosyasından veya bölümlenmiş Parquet veri setinden veri yükle"""
         logger.info(f"📂 Dosya yükleniyor: {file_path}")
         self.input_file = file_path
         
         file_ext = os.path.splitext(file_path)[1].lower()
         
-        if file_ext == '.csv':
+        if os.path.isdir(file_path) or file_ext == '.parquet':
+            # Parquet: bellek eşlemeli okuma, sadece istenen sütunlar
+            self.df = read_reviews_parquet(file_path, columns=columns)
+        elif is_jsonl_path(file_path):
+            # NDJSON: yorumlar parça parça akıtılarak okunur, başlıktan işletme bilgisi alınır
+            header = {}
+            frames = [pd.DataFrame.from_records(batch, columns=columns)
+                      for batch in iter_review_batches(file_path, header=header)]
+            self.df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+            self.business_id = header.get('business_id')
+            self.scrape_date = header.get('scrape_date')
+        elif file_ext == '.csv':
             self.df = pd.read_csv(file_path, encoding='utf-8-sig')
         elif file_ext == '.json':
             # JSON dosyasını aç
@@ -58,6 +88,8 @@ class YandexDataCleaner:
             # JSON içinden reviews listesini al
             if isinstance(data, dict) and 'reviews' in data:
                 reviews = data['reviews']
+                self.business_id = data.get('business_id')
+                self.scrape_date = data.get('scrape_date')
             else:
                 reviews = data
                 
@@ -65,7 +97,9 @@ class YandexDataCleaner:
             self.df = pd.DataFrame(reviews)
         else:
             raise ValueError(f"Desteklenmeyen dosya formatı: {file_ext}")
-            
+        
+        # Object sütunlar yerine şema dtype'ları (pyarrow string, kategori, Int8, boolean)
+        self.df = apply_review_schema(self.df, prefer_arrow=self.prefer_arrow_strings)
         self.total_records = len(self.df)
         logger.info(f"✅ {self.total_records} kayıt yüklendi")
         logger.info(f"📊 Sütunlar: {', '.join(self.df.columns)}")
@@ -87,7 +121,7 @@ class YandexDataCleaner:
             if col in self.df.columns:
                 empty_count = self.df[col].isna().sum()
                 self.empty_fields_count[col] = empty_count
-                empty_percent = (empty_count / self.total_records) * 100
+                empty_percent = (empty_count / len(self.df)) * 100
                 logger.info(f"  - {col}: {empty_count} boş değer (%{empty_percent:.1f})")
         
         # Tekrarlanan kayıtlar
@@ -102,20 +136,27 @@ class YandexDataCleaner:
             
         # Ortalama metin uzunluğu
         if 'text_original' in self.df.columns:
-            self.df['text_length'] = self.df['text_original'].fillna('').apply(len)
+            self.df['text_length'] = self.df['text_original'].fillna('').astype(
+                string_dtype(self.prefer_arrow_strings)).str.len()
             avg_length = self.df['text_length'].mean()
             logger.info(f"  - Ortalama yorum uzunluğu: {avg_length:.1f} karakter")
             
         # Puanların dağılımı
+        rating_counts = {}
         if 'rating' in self.df.columns:
             rating_counts = self.df['rating'].value_counts(dropna=False)
             logger.info(f"  - Puan dağılımı:\n{rating_counts}")
+            # Int8 puanlarda eksik değer anahtarı önceki durum dosyalarıyla uyumlu kalsın ('nan')
+            rating_counts = {'nan' if pd.isna(k) else str(k): int(v) for k, v in rating_counts.items()}
             
         return {
-            'empty_fields': self.empty_fields_count,
-            'duplicate_ids': duplicate_ids if 'review_id' in self.df.columns else 0,
-            'duplicate_content': duplicate_content if 'author_name' in self.df.columns and 'text_original' in self.df.columns else 0,
-            'avg_text_length': avg_length if 'text_original' in self.df.columns else 0
+            'record_count': len(self.df),
+            'empty_fields': {k: int(v) for k, v in self.empty_fields_count.items()},
+            'duplicate_ids': int(duplicate_ids) if 'review_id' in self.df.columns else 0,
+            'duplicate_content': int(duplicate_content) if 'author_name' in self.df.columns and 'text_original' in self.df.columns else 0,
+            'avg_text_length': float(avg_length) if 'text_original' in self.df.columns else 0,
+            'text_length_sum': int(self.df['text_length'].sum()) if 'text_original' in self.df.columns else 0,
+            'rating_counts': rating_counts
         }
     
     def clean_data(self):
@@ -141,14 +182,22 @@ class YandexDataCleaner:
             if removed > 0:
                 logger.info(f"✓ {removed} içerik bazlı tekrar çıkarıldı")
                 self.duplicate_count += removed
+        
+        # 3. Yakın tekrarları birleştir (kesilmiş "...", açılmış spoiler, baştaki yazar adı)
+        if 'text_original' in self.df.columns and self.near_duplicate_threshold is not None:
+            self.df, removed = merge_near_duplicates(self.df, threshold=self.near_duplicate_threshold)
+            if removed > 0:
+                logger.info(f"✓ {removed} yakın tekrar birleştirildi (en eksiksiz metin korundu)")
+                self.duplicate_count += removed
+                self.near_duplicate_count += removed
                 
-        # 3. Boş kullanıcı adlarını düzelt
+        # 4. Boş kullanıcı adlarını düzelt
         if 'author_name' in self.df.columns:
             empty_authors = self.df['author_name'].isna() | (self.df['author_name'] == '')
             self.df.loc[empty_authors, 'author_name'] = "Anonim Kullanıcı"
             logger.info(f"✓ {empty_authors.sum()} boş kullanıcı adı 'Anonim Kullanıcı' olarak değiştirildi")
             
-        # 4. Boş yorumları filtrele veya işaretle
+        # 5. Boş yorumları filtrele veya işaretle
         if 'text_original' in self.df.columns:
             empty_text = self.df['text_original'].isna() | (self.df['text_original'] == '')
             # Seçenek 1: Boş yorumları çıkar
@@ -159,24 +208,19 @@ class YandexDataCleaner:
             self.df.loc[empty_text, 'text_original'] = "[Boş yorum]"
             logger.info(f"✓ {empty_text.sum()} boş yorum işaretlendi")
         
-        # 5. Metin içeriğini temizle
+        # 6. Metin içeriğini temizle
         if 'text_original' in self.df.columns:
-            # Fazla boşlukları temizle
-            self.df['text_original'] = self.df['text_original'].fillna('').apply(
-                lambda x: re.sub(r'\s+', ' ', x).strip()
+            # Fazla boşlukları ve yaygın gereksiz metinleri tek vektörel regex ile temizle
+            self.df['text_original'] = clean_review_texts(
+                self.df['text_original'], prefer_arrow=self.prefer_arrow_strings
             )
-            
-            # Yaygın olarak bulunan gereksiz metinleri temizle
-            common_texts = ["Abone ol", "Subscribe", "Varsayılan", "Default", "Deneyimini paylaş"]
-            for text in common_texts:
-                self.df['text_original'] = self.df['text_original'].str.replace(text, '', regex=False)
                 
             logger.info(f"✓ Yorum metinleri temizlendi, gereksiz içerikler çıkarıldı")
         
-        # 6. Puanları normalleştir
+        # 7. Puanları normalleştir
         if 'rating' in self.df.columns:
             # Mantıksız değerleri düzelt (örn. 66.0 gibi)
-            invalid_ratings = self.df['rating'] > 5
+            invalid_ratings = (self.df['rating'] > 5).fillna(False)
             if invalid_ratings.any():
                 logger.info(f"⚠️ {invalid_ratings.sum()} geçersiz puan değeri tespit edildi")
                 
@@ -184,8 +228,14 @@ class YandexDataCleaner:
                 self.df.loc[invalid_ratings, 'rating'] = None
                 logger.info(f"✓ Geçersiz puanlar temizlendi")
         
-        # 7. Tarih formatını normalize et
+        # 8. Tarih formatını normalize et
         if 'date' in self.df.columns:
+            # Ham tarih metinlerini (göreli tarihler kazıma tarihine göre) gerçek zaman damgasına çevir
+            scrape_dates = self.df['scrape_date'] if 'scrape_date' in self.df.columns else self.scrape_date
+            self.df['review_date'] = parse_review_dates(self.df['date'], scrape_dates)
+            parsed_count = self.df['review_date'].notna().sum()
+            logger.info(f"✓ {parsed_count}/{len(self.df)} tarih zaman damgasına çevrildi (review_date)")
+            
             # Tarih formatını düzelt veya eksik tarihleri işaretle
             empty_dates = self.df['date'].isna() | (self.df['date'] == '')
             self.df.loc[empty_dates, 'date'] = 'Tarih belirtilmemiş'
@@ -196,35 +246,450 @@ class YandexDataCleaner:
         return len(self.df)
     
     def export_clean_data(self, output_path=None):
-        """Temizlenmiş veriyi dışa aktar"""
+        """Temizlenmiş veriyi dışa aktar (uzantı .parquet ise Parquet, aksi halde CSV)"""
         if output_path:
             self.output_file = output_path
         else:
             # Varsayılan isim oluştur
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_base = os.path.splitext(os.path.basename(self.input_file))[0]
+            file_base = os.path.basename(os.path.normpath(self.input_file)).split('.')[0]
             self.output_file = f"{file_base}_clean_{timestamp}.csv"
             
         logger.info(f"💾 Temizlenmiş veri kaydediliyor: {self.output_file}")
-        self.df.to_csv(self.output_file, index=False, encoding='utf-8-sig')
+        self.df = apply_review_schema(self.df, prefer_arrow=self.prefer_arrow_strings)
+        if self.output_file.lower().endswith('.parquet'):
+            write_reviews_parquet(self.df, self.output_file)
+        else:
+            self.df.to_csv(self.output_file, index=False, encoding='utf-8-sig')
+        
+        if self.parquet_dataset_dir:
+            write_reviews_dataset(self.df, self.parquet_dataset_dir,
+                                  business_id=self.business_id, scrape_date=self.scrape_date)
+            logger.info(f"💾 Parquet veri setine eklendi: {self.parquet_dataset_dir}")
+        
+        # Özet logger'a yazılır (süreç havuzunda stdout'a basılan kutular birbirine karışıyordu)
+        logger.info(f"✅ Veri temizleme tamamlandı: ilk {self.total_records} kayıt, "
+                    f"{self.duplicate_count} tekrar çıkarıldı (yakın tekrar: {self.near_duplicate_count}), "
+                    f"kalan {len(self.df)} → {self.output_file}")
+        
+        return self.output_file
+
+    def read_new_reviews(self, file_path, skip=0):
+        """Dosyadan sadece ilk skip yorumdan sonrasını oku. Dönüş: (yeni kayıtlar, dosyadaki toplam yorum)
+
+        NDJSON dosyalarında atlanan satırlar ayrıştırılmaz; diğer formatlar okunup dilimlenir.
+        """
+        if is_jsonl_path(file_path):
+            header = {}
+            frames = [pd.DataFrame.from_records(batch)
+                      for batch in iter_review_batches(file_path, header=header, skip=skip)]
+            self.business_id = self.business_id or header.get('business_id')
+            self.scrape_date = header.get('scrape_date') or self.scrape_date
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            return apply_review_schema(df, prefer_arrow=self.prefer_arrow_strings), skip + len(df)
+        loader = YandexDataCleaner()
+        loader.load_data(file_path)
+        self.business_id = self.business_id or loader.business_id
+        self.scrape_date = loader.scrape_date or self.scrape_date
+        return loader.df.iloc[skip:].reset_index(drop=True), len(loader.df)
+    
+    def clean_incremental(self, file_paths, business_id, state_dir=os.path.join('data', 'clean_state'),
+                          output_dir=os.path.join('data', 'clean'), output_format='csv'):
+        """Sadece son temizlikten sonra eklenen yorumları temizleyip mevcut temiz veriye ekle.
+
+        Dosya bazlı watermark ve kalıcı tekrar durumu <state_dir>/<business_id>/ altında tutulur;
+        kalite istatistikleri her çalıştırmada sadece yeni kayıtlarla güncellenir.
+        """
+        state = BusinessCleanState(state_dir, business_id)
+        self.business_id = str(business_id)
+        self.input_file = file_paths[0] if file_paths else None
+        
+        frames = []
+        pending_marks = {}
+        for path in sorted(file_paths, key=os.path.getmtime):
+            if state.file_unchanged(path):
+                continue
+            skip = state.watermark(path)
+            df, total = self.read_new_reviews(path, skip)
+            pending_marks[path] = total
+            if len(df) and 'scrape_date' not in df.columns and self.scrape_date:
+                df = df.assign(scrape_date=self.scrape_date)
+            if len(df):
+                logger.info(f"➕ {os.path.basename(path)}: {len(df)} yeni kayıt (watermark: {skip})")
+                frames.append(df)
+        
+        # Dosyalar arasında farklı kategoriler birleşince object'e düşen sütunlar yeniden şemaya uyar
+        self.df = apply_review_schema(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(),
+                                      prefer_arrow=self.prefer_arrow_strings)
+        self.total_records = len(self.df)
         
-        # Özet bilgi yazdır
-        print("\n" + "=" * 40)
-        print(f"✅ Veri temizleme tamamlandı!")
-        print(f"📊 İlk kayıt sayısı: {self.total_records}")
-        print(f"🔍 Çıkarılan tekrar kayıt: {self.duplicate_count}")
-        print(f"📋 Kalan kayıt sayısı: {len(self.df)}")
-        print(f"💾 Temiz veri kaydedildi: {self.output_file}")
-        print("=" * 40)
+        if self.total_records:
+            # Önceki çalıştırmalarda temizlenmiş kayıtları çıkar
+            known = state.known_mask(self.df)
+            if known.any():
+                logger.info(f"✓ {int(known.sum())} kayıt önceki temizliklerden veya örtüşen girdilerden biliniyor, atlandı")
+                self.duplicate_count += int(known.sum())
+            self.df = self.df[~known]
+            state.remember(self.df)
+            
+            # Sadece gerçekten yeni kayıtların kalite istatistikleri kümülatif istatistiklere eklenir
+            # (örtüşen girdiler, ör. aynı çalıştırmanın autosave ve ham dosyası, iki kez sayılmaz)
+            if len(self.df):
+                state.quality = merge_quality_stats(state.quality, self.analyze_data_quality())
         
+        if len(self.df):
+            self.clean_data()
+            self.append_clean_data(output_dir, output_format)
+            self.update_aggregates()
+            self.update_search_index()
+            state.cleaned_records += len(self.df)
+        else:
+            logger.info(f"✅ {business_id}: temizlenecek yeni kayıt yok")
+        
+        for path, total in pending_marks.items():
+            state.set_watermark(path, total)
+        state.save()
+        return len(self.df)
+    
+    def update_aggregates(self):
+        """Temiz kayıtları işletme toplamlarına ekle (daha önce sayılmış yorumlar atlanır)"""
+        if not self.aggregates_path or not self.business_id or self.df is None or not len(self.df):
+            return 0
+        store = AggregateStore(self.aggregates_path)
+        try:
+            added = store.update(self.business_id, self.df, scrape_date=self.scrape_date)
+        finally:
+            store.close()
+        logger.info(f"📈 İşletme toplamları güncellendi: {added} yeni yorum")
+        return added
+    
+    def update_search_index(self):
+        """Temiz kayıtları arama indeksine ekle; indekste olan yorumların metni temiz metinle güncellenir"""
+        if not self.search_index_path or not self.business_id or self.df is None or not len(self.df):
+            return 0
+        index = ReviewSearchIndex(self.search_index_path)
+        try:
+            added, updated = index.add(self.business_id, self.df, scrape_date=self.scrape_date)
+        finally:
+            index.close()
+        logger.info(f"🔎 Arama indeksi güncellendi: {added} yeni, {updated} güncellenen yorum")
+        return added
+    
+    def append_clean_data(self, output_dir, output_format='csv'):
+        """Temiz yeni kayıtları işletmenin birleşik temiz çıktısına ekle"""
+        os.makedirs(output_dir, exist_ok=True)
+        self.df = apply_review_schema(self.df, prefer_arrow=self.prefer_arrow_strings)
+        if output_format == 'parquet':
+            # Parquet dosyaları yerinde genişletilemez; her delta klasöre yeni parça olarak yazılır
+            self.output_file = os.path.join(output_dir, f"yandex_reviews_{self.business_id}_clean")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            write_reviews_parquet(self.df, os.path.join(self.output_file, f"part_{timestamp}.parquet"))
+        else:
+            self.output_file = os.path.join(output_dir, f"yandex_reviews_{self.business_id}_clean.csv")
+            if os.path.exists(self.output_file):
+                # Mevcut başlıktaki sütun sırasına uy
+                columns = pd.read_csv(self.output_file, encoding='utf-8-sig', nrows=0).columns
+                self.df.reindex(columns=columns).to_csv(self.output_file, mode='a', header=False, index=False)
+            else:
+                self.df.to_csv(self.output_file, index=False, encoding='utf-8-sig')
+        logger.info(f"💾 {len(self.df)} yeni temiz kayıt eklendi: {self.output_file}")
         return self.output_file
 
-def main():
+SUPPORTED_EXTENSIONS = ('.csv', '.json', '.parquet') + JSONL_EXTENSIONS
+AUTOSAVE_PATTERN = re.compile(r'yandex_reviews_(\d+)_autosave_(\d{8}_\d{6})')
+# Scraper'ın yazdığı dosya adları: yandex_reviews_<business_id>_[<parça>_][autosave_]<zaman damgası>
+SCRAPER_FILE_PATTERN = re.compile(r'yandex_reviews_(\d+)_')
+# Ham dosya uzantıları (işlenmiş CSV/Parquet'in eşi aranırken)
+RAW_EXTENSIONS = JSONL_EXTENSIONS + ('.json',)
+TIMESTAMP_PATTERN = re.compile(r'(\d{8}_\d{6})')
+
+
+def collect_input_files(patterns):
+    """Glob desenleri ve klasörlerden desteklenen veri dosyalarını topla"""
+    files = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, names in os.walk(match):
+                    files.extend(os.path.join(root, name) for name in names
+                                 if name.lower().endswith(SUPPORTED_EXTENSIONS))
+            elif match.lower().endswith(SUPPORTED_EXTENSIONS):
+                files.append(match)
+    return sorted(set(os.path.abspath(f) for f in files))
+
+
+def file_timestamp(path):
+    """Dosya adındaki YYYYMMDD_HHMMSS damgası, yoksa değiştirilme zamanı (sıralama anahtarı)"""
+    match = TIMESTAMP_PATTERN.search(os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+    return os.path.getmtime(path)
+
+
+def file_stem(path):
+    """Uzantısız dosya adı (.jsonl.gz gibi çift uzantılar dahil)"""
+    name = os.path.basename(path)
+    for extension in sorted(SUPPORTED_EXTENSIONS, key=len, reverse=True):
+        if name.lower().endswith(extension):
+            return name[:-len(extension)]
+    return name.split('.')[0]
+
+
+def raw_companions(path):
+    """İşlenmiş CSV/Parquet dosyasının aynı adlı ham eşleri: scraper bunları <output_dir>/raw/ (veya aynı
+    klasöre) <ad>_<zaman damgası>.jsonl[.gz]/.json olarak yazar"""
+    stem = file_stem(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    for folder in (os.path.join(os.path.dirname(directory), 'raw'), directory):
+        for extension in RAW_EXTENSIONS:
+            candidate = os.path.join(folder, stem + extension)
+            if os.path.exists(candidate):
+                yield candidate
+
+
+def detect_business_id(path, companions=True):
+    """Dosyanın ait olduğu işletmeyi bul: dosya adı, NDJSON başlığı, JSON belge, business_id sütunu
+    veya (işlenmiş CSV/Parquet için) aynı adlı ham dosyanın başlığı"""
+    name = os.path.basename(path)
+    match = SCRAPER_FILE_PATTERN.search(name)
+    if match:
+        return match.group(1)
+    try:
+        if is_jsonl_path(path):
+            for record in iter_jsonl_records(path):
+                if record.get('_type') == HEADER_TYPE and record.get('business_id'):
+                    return str(record['business_id'])
+                break
+        elif path.lower().endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get('business_id'):
+                return str(data['business_id'])
+        elif path.lower().endswith('.csv'):
+            head = pd.read_csv(path, encoding='utf-8-sig', nrows=1)
+            if 'business_id' in head.columns and len(head):
+                return str(head['business_id'].iloc[0])
+        elif path.lower().endswith('.parquet'):
+            head = read_reviews_parquet(path, columns=['business_id'])
+            if 'business_id' in head.columns and len(head):
+                return str(head['business_id'].iloc[0])
+    except Exception as e:
+        logger.warning(f"⚠️ İşletme kimliği okunamadı ({name}): {e}")
+    if companions and path.lower().endswith(('.csv', '.parquet')):
+        # Scraper'ın işlenmiş çıktılarında business_id sütunu yok; kimlik ham eşin başlığındadır
+        for companion in raw_companions(path):
+            business_id = detect_business_id(companion, companions=False)
+            if not business_id.startswith('unknown-'):
+                return business_id
+    # Kimliği bilinmeyen dosyalar kendi başına bir grup oluşturur
+    return f"unknown-{file_stem(path)}"
+
+
+def clean_business_files(business_id, files, output_dir, output_format='csv', incremental=False, state_dir=None,
+                         aggregates_path=None, search_index_path=None):
+    """Bir işletmeye ait tüm dosyaları birleştirip temizle ve tek çıktı yaz (süreç havuzunda çalışır).
+
+    Autosave anlık görüntüleri yeniden eskiye okunur; review_id kümesi daha yeni dosyaların
+    alt kümesi olan anlık görüntüler atlanır, böylece sadece en güncel kapsayan veri kalır.
+    incremental=True ise sadece son temizlikten sonra eklenen kayıtlar işlenir (clean_incremental).
+    aggregates_path verilirse temiz kayıtlar işletme toplamlarına, search_index_path verilirse arama
+    indeksine eklenir.
+    """
+    started = time.time()
+    report = {
+        'business_id': business_id,
+        'input_files': files,
+        'skipped_files': [],
+        'loaded_records': 0,
+        'duplicates_removed': 0,
+        'near_duplicates_removed': 0,
+        'final_records': 0,
+        'output_file': None,
+        'error': None
+    }
+    try:
+        if incremental:
+            cleaner = YandexDataCleaner()
+            cleaner.aggregates_path = aggregates_path
+            cleaner.search_index_path = search_index_path
+            report['final_records'] = cleaner.clean_incremental(
+                files, business_id, state_dir=state_dir, output_dir=output_dir, output_format=output_format
+            )
+            report['loaded_records'] = cleaner.total_records
+            report['duplicates_removed'] = cleaner.duplicate_count
+            report['near_duplicates_removed'] = cleaner.near_duplicate_count
+            report['output_file'] = cleaner.output_file
+            report['seconds'] = round(time.time() - started, 3)
+            return report
+        
+        frames = []
+        seen_ids = set()
+        scrape_date = None
+        for path in sorted(files, key=file_timestamp, reverse=True):
+            loader = YandexDataCleaner()
+            loader.load_data(path)
+            df = loader.df
+            scrape_date = scrape_date or loader.scrape_date
+            if 'scrape_date' not in df.columns and loader.scrape_date:
+                # Göreli tarihler her dosyanın kendi kazıma tarihine göre çözülsün
+                df = df.assign(scrape_date=loader.scrape_date)
+            if AUTOSAVE_PATTERN.search(os.path.basename(path)) and 'review_id' in df.columns:
+                ids = set(df['review_id'].dropna())
+                if ids and ids <= seen_ids:
+                    logger.info(f"⏭️ Daha yeni bir dosyanın alt kümesi, atlandı: {os.path.basename(path)}")
+                    report['skipped_files'].append(path)
+                    continue
+            if 'review_id' in df.columns:
+                seen_ids.update(df['review_id'].dropna())
+            frames.append(df)
+
+        cleaner = YandexDataCleaner()
+        cleaner.aggregates_path = aggregates_path
+        cleaner.search_index_path = search_index_path
+        cleaner.input_file = files[0]
+        cleaner.business_id = None if business_id.startswith('unknown-') else business_id
+        cleaner.scrape_date = scrape_date
+        # En yeni dosya önce geldiği için tekrar çıkarımında en güncel kayıt korunur
+        cleaner.df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        cleaner.total_records = len(cleaner.df)
+        report['loaded_records'] = cleaner.total_records
+
+        if cleaner.total_records:
+            cleaner.analyze_data_quality()
+            cleaner.clean_data()
+            os.makedirs(output_dir, exist_ok=True)
+            extension = '.parquet' if output_format == 'parquet' else '.csv'
+            report['output_file'] = cleaner.export_clean_data(
+                os.path.join(output_dir, f"yandex_reviews_{business_id}_clean{extension}")
+            )
+            cleaner.update_aggregates()
+            cleaner.update_search_index()
+        report['duplicates_removed'] = cleaner.duplicate_count
+        report['near_duplicates_removed'] = cleaner.near_duplicate_count
+        report['final_records'] = len(cleaner.df)
+    except Exception as e:
+        logger.error(f"💥 {business_id} temizlenirken hata: {e}")
+        report['error'] = str(e)
+    report['seconds'] = round(time.time() - started, 3)
+    return report
+
+
+def _init_worker(log_options):
+    """Worker sürecinde logging'i kur: dosya adı {pid} içeriyorsa her süreç kendi dosyasına yazar,
+    içermiyorsa sadece konsola (aynı dosyaya birden fazla süreç eklemez)"""
+    log_options = dict(log_options or {'log_file': None})
+    log_file = log_options.get('log_file')
+    log_options['log_file'] = log_file.format(pid=os.getpid()) if log_file and '{pid}' in log_file else None
+    configure_logging(**log_options)
+
+
+def run_batch(patterns, output_dir, workers=None, output_format='csv', report_path=None,
+              incremental=False, state_dir=None, aggregates_path=None, search_index_path=None, log_options=None):
+    """Dosyaları işletmelere göre grupla ve süreç havuzunda paralel temizle; çalışma raporu yaz.
+
+    log_options: worker süreçlerinde configure_logging'e verilen ayarlar (log_file, json_format).
+    """
+    started_at = datetime.now()
+    files = collect_input_files(patterns)
+    if not files:
+        logger.error("❌ Temizlenecek dosya bulunamadı!")
+        return None
+
+    detected = {path: detect_business_id(path) for path in files}
+    # Ham eşi başka bir klasörde ama aynı çalıştırmada verilmiş işlenmiş dosyalar aynı adla eşleştirilir
+    stems = {file_stem(path): business_id for path, business_id in detected.items()
+             if not business_id.startswith('unknown-')}
+    groups = {}
+    for path, business_id in detected.items():
+        if business_id.startswith('unknown-'):
+            business_id = stems.get(file_stem(path), business_id)
+        groups.setdefault(business_id, []).append(path)
+    logger.info(f"📦 {len(files)} dosya, {len(groups)} işletme bulundu")
+
+    reports = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(log_options,)) as pool:
+        futures = {
+            pool.submit(clean_business_files, business_id, paths, output_dir, output_format,
+                        incremental, state_dir, aggregates_path, search_index_path): business_id
+            for business_id, paths in groups.items()
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            reports.append(result)
+            if result['error']:
+                logger.error(f"❌ {result['business_id']}: {result['error']} ({result['seconds']} sn)")
+            else:
+                logger.info(f"✅ {result['business_id']}: {result['final_records']} kayıt ({result['seconds']} sn)")
+
+    run_report = {
+        'started_at': started_at.strftime("%Y-%m-%d %H:%M:%S"),
+        'finished_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'workers': workers or os.cpu_count(),
+        'incremental': incremental,
+        'input_file_count': len(files),
+        'business_count': len(groups),
+        'failed_count': sum(1 for r in reports if r['error']),
+        'businesses': sorted(reports, key=lambda r: r['business_id'])
+    }
+    if report_path is None:
+        report_path = os.path.join(output_dir, f"clean_report_{started_at.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(run_report, f, ensure_ascii=False, indent=2)
+    logger.info(f"📝 Çalışma raporu: {report_path}")
+    return run_report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Yandex Maps yorum verilerini temizler. Yol verilmezse etkileşimli modda çalışır."
+    )
+    parser.add_argument('paths', nargs='*', help="Dosya, klasör veya glob deseni (ör. 'data/autosave/*.jsonl.gz')")
+    parser.add_argument('-o', '--output-dir', default=os.path.join('data', 'clean'),
+                        help="İşletme başına birleşik temiz çıktıların klasörü (varsayılan: data/clean)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Paralel süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument('-f', '--format', choices=['csv', 'parquet'], default='csv', help="Çıktı formatı")
+    parser.add_argument('--report', default=None, help="Çalışma raporu yolu (varsayılan: <output-dir>/clean_report_*.json)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Sadece son temizlikten sonra eklenen kayıtları işle ve mevcut temiz çıktıya ekle")
+    parser.add_argument('--state-dir', default=os.path.join('data', 'clean_state'),
+                        help="Artımlı temizlik durumu klasörü (varsayılan: data/clean_state)")
+    parser.add_argument('--aggregates', default=None, metavar='SQLITE',
+                        help="Temiz yorumları bu SQLite dosyasındaki işletme toplamlarına ekle (ör. data/aggregates.sqlite)")
+    parser.add_argument('--search-index', default=None, metavar='SQLITE',
+                        help="Temiz yorumları tam metin arama indeksine ekle (ör. data/search.sqlite)")
+    parser.add_argument('--log-file', default='data_cleaner.log',
+                        help="Log dosyası ('' ile kapatılır); worker süreçleri adında {pid} varsa kendi dosyalarına "
+                             "yazar (ör. data/logs/cleaner_{pid}.log), yoksa sadece konsola")
+    parser.add_argument('--log-json', action='store_true', help="Log dosyasına JSON satırları yaz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log_options = {'log_file': args.log_file or None, 'json_format': args.log_json}
+    configure_logging((args.log_file or '').format(pid=os.getpid()) or None, json_format=args.log_json)
+    if not args.paths:
+        interactive_main()
+        return
+    report = run_batch(args.paths, args.output_dir, workers=args.workers,
+                       output_format=args.format, report_path=args.report,
+                       incremental=args.incremental, state_dir=args.state_dir,
+                       aggregates_path=args.aggregates, search_index_path=args.search_index,
+                       log_options=log_options)
+    # Hiç dosya bulunamaması (ör. cron'da yanlış yazılmış glob) da başarısızlık sayılır
+    if report is None or report['failed_count']:
+        raise SystemExit(1)
+
+
+def interactive_main():
     print("\n🧹 Yandex Maps Veri Temizleyici")
     print("=" * 40)
     
     # Dosya seç
-    print("\n📁 Lütfen temizlenecek veri dosyasını seçin (CSV veya JSON):")
+    print("\n📁 Lütfen temizlenecek veri dosyasını seçin (CSV, JSON, NDJSON veya Parquet):")
     
     # Mevcut dizindeki CSV ve JSON dosyalarını listele
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -233,7 +698,7 @@ def main():
     if not os.path.exists(data_dir):
         data_dir = current_dir
     
-    files = [f for f in os.listdir(data_dir) if f.endswith(('.csv', '.json'))]
+    files = [f for f in os.listdir(data_dir) if f.endswith(('.csv', '.json', '.parquet') + JSONL_EXTENSIONS)]
     
     if not files:
         print("❌ Hiç CSV veya JSON dosyası bulunamadı!")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Çok Dilli Tarih Normalizasyonu
+Path: date_parser.py
+
+extract_date'in döndürdüğü ham tarih metinlerini (Türkçe, Rusça, İngilizce) toplu olarak
+gerçek zaman damgalarına çevirir:
+- Mutlak: "15 Ocak 2023", "15 января 2023", "January 15, 2023", "15.01.2023", "2023-01-15"
+- Yılsız: "15 Ocak" (kazıma tarihinden sonraya düşerse bir önceki yıl kabul edilir)
+- Göreli: "3 gün önce", "3 дня назад", "2 weeks ago", "dün", "вчера", "today"
+Göreli tarihler kazıma tarihine (scrape_date) göre çözülür. İmkânsız tarihler ("31 Şubat 2023")
+başka bir desenle yeniden yorumlanmaz, NaT kalır. Tüm işlemler pandas
+üzerinde vektöreldir; satır bazlı Python döngüsü yoktur.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Ay adlarının ilk üç harfi üç dilde de çakışmadan ay numarasına eşlenir
+MONTH_PREFIXES = {
+    # Türkçe
+    'oca': 1, 'şub': 2, 'mar': 3, 'nis': 4, 'may': 5, 'haz': 6,
+    'tem': 7, 'ağu': 8, 'eyl': 9, 'eki': 10, 'kas': 11, 'ara': 12,
+    # İngilizce
+    'jan': 1, 'feb': 2, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    # Rusça (yalın ve -a/-я halleri)
+    'янв': 1, 'фев': 2, 'мар': 3, 'апр': 4, 'мая': 5, 'май': 5, 'июн': 6,
+    'июл': 7, 'авг': 8, 'сен': 9, 'окт': 10, 'ноя': 11, 'дек': 12
+}
+
+_WORD = r'[^\W\d_]+'
+
+# Gün/ay grupları rakam sınırıyla kapatılır: yıldan ("Ocak 2023") gün ayıklanmaz
+_NUMERIC_DMY = r'(?<!\d)(?P<d>\d{1,2})[./](?P<m>\d{1,2})[./](?P<y>\d{4})'
+_NUMERIC_YMD = r'(?P<y>\d{4})-(?P<m>\d{1,2})-(?P<d>\d{1,2})(?!\d)'
+_TEXT_DMY = r'(?<!\d)(?P<d>\d{1,2})\s+(?P<mon>' + _WORD + r')\.?,?(?:\s+(?P<y>\d{4}))?'
+_TEXT_MDY = r'(?P<mon>' + _WORD + r')\.?\s+(?P<d>\d{1,2})(?!\d),?(?:\s+(?P<y>\d{4}))?'
+
+# Göreli birimler: birim grubu -> kelime kökleri
+_RELATIVE_UNITS = {
+    'minutes': r'dakika|dk|minutes?|mins?|минут\w*|мин',
+    'hours': r'saat|hours?|час\w*',
+    'days': r'gün|days?|дн\w*|день',
+    'weeks': r'hafta|weeks?|недел\w*',
+    'months': r'ay|months?|месяц\w*',
+    'years': r'yıl|sene|years?|год\w*|лет',
+}
+_RELATIVE = (
+    r'(?P<n>\d+|bir|an?|один|одну|одна)?\s*(?:'
+    + '|'.join(f'(?P<{unit}>{words})' for unit, words in _RELATIVE_UNITS.items())
+    + r')\s+(?:önce|evvel|ago|назад)'
+)
+_KEYWORDS = {
+    'bugün': 0, 'today': 0, 'сегодня': 0,
+    'dün': 1, 'yesterday': 1, 'вчера': 1,
+    'позавчера': 2, 'evvelsi gün': 2
+}
+
+
+def _broadcast_scrape_dates(scrape_date, index):
+    """scrape_date'i (tekil değer veya Series) satır bazlı datetime Series'e çevir"""
+    if isinstance(scrape_date, pd.Series):
+        values = pd.to_datetime(scrape_date, errors='coerce').reindex(index)
+        return values.fillna(pd.Timestamp.now().normalize())
+    if scrape_date is None:
+        scrape_date = pd.Timestamp.now()
+    return pd.Series(pd.Timestamp(scrape_date), index=index)
+
+
+def _compose(year, month, day):
+    """Yıl/ay/gün sütunlarından zaman damgası üret (geçersiz kombinasyonlar NaT)"""
+    parts = pd.DataFrame({'year': year, 'month': month, 'day': day})
+    valid = parts.notna().all(axis=1)
+    result = pd.Series(pd.NaT, index=parts.index, dtype='datetime64[ns]')
+    if valid.any():
+        result[valid] = pd.to_datetime(parts[valid].astype('int64'), errors='coerce')
+    return result
+
+
+def _subtract_months(base, months):
+    """Tarihlerden ay sayısı çıkar (gün, hedef ayın uzunluğuna kırpılır)"""
+    total = base.dt.year * 12 + (base.dt.month - 1) - months
+    year = total // 12
+    month = total % 12 + 1
+    first = _compose(year, month, pd.Series(1, index=base.index))
+    days_in_month = first.dt.days_in_month
+    day = np.minimum(base.dt.day, days_in_month)
+    return first + pd.to_timedelta(day - 1, unit='D') + (base - base.dt.normalize())
+
+
+def parse_review_dates(dates, scrape_date=None):
+    """Ham tarih metinlerini datetime64 Series'e çevir (çözülemeyenler NaT).
+
+    scrape_date: göreli ve yılsız tarihlerin çözüleceği kazıma zamanı; tek bir değer ya da
+    satır bazlı bir Series olabilir. Verilmezse şimdiki zaman kullanılır.
+    """
+    dates = pd.Series(dates, copy=False)
+    base = _broadcast_scrape_dates(scrape_date, dates.index)
+    # Tarih metinleri çok tekrar eder; her (metin, kazıma zamanı) çifti bir kez çözülür
+    frame = pd.DataFrame({'text': dates.astype('string').to_numpy(), 'base': base.to_numpy()})
+    unique = frame.drop_duplicates(ignore_index=True)
+    unique['parsed'] = _parse_unique(unique['text'], unique['base'])
+    parsed = frame.merge(unique, how='left', on=['text', 'base'])['parsed']
+    return pd.Series(parsed.to_numpy(), index=dates.index, name='review_date')
+
+
+def _parse_unique(text, base):
+    """parse_review_dates çekirdeği; RangeIndex'li metin ve kazıma zamanı Series'leri üzerinde çalışır"""
+    text = text.str.lower().str.strip()
+    result = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    # Tarih olarak tanınıp imkânsız çıkan metinler ("31 Şubat 2023") NaT kalır, sonraki desenlere düşmez
+    invalid = pd.Series(False, index=text.index)
+
+    # 1. Sayısal tarihler
+    for pattern in (_NUMERIC_DMY, _NUMERIC_YMD):
+        pending = result.isna() & ~invalid
+        parts = text.str.extract(pattern)
+        parsed = _compose(pd.to_numeric(parts['y']), pd.to_numeric(parts['m']), pd.to_numeric(parts['d']))
+        invalid |= pending & parts['d'].notna() & parsed.isna()
+        result = result.fillna(parsed)
+
+    # 2. Ay adıyla yazılmış tarihler (gün-ay-yıl ve ay-gün-yıl)
+    for pattern in (_TEXT_DMY, _TEXT_MDY):
+        pending = result.isna() & ~invalid
+        if not pending.any():
+            break
+        parts = text[pending].str.extract(pattern)
+        month = parts['mon'].str.slice(0, 3).map(MONTH_PREFIXES)
+        pending_base = base[pending]
+        year = pd.to_numeric(parts['y']).fillna(pending_base.dt.year)
+        parsed = _compose(year, month, pd.to_numeric(parts['d']))
+        # Yılsız tarih kazıma tarihinden sonraya düşüyorsa geçen yıla aittir
+        future = parts['y'].isna() & (parsed > pending_base)
+        if future.any():
+            parsed[future] = _compose(year[future] - 1, month[future], pd.to_numeric(parts['d'][future]))
+        result[pending] = parsed
+        invalid[pending] = (month.notna() & parts['d'].notna() & parsed.isna()).to_numpy()
+
+    # 3. Göreli tarihler ("3 gün önce", "2 weeks ago", "месяц назад")
+    pending = result.isna() & ~invalid
+    if pending.any():
+        parts = text[pending].str.extract(_RELATIVE)
+        # Sayı yerine "bir", "a", "один" yazılmışsa miktar 1'dir
+        amount = pd.to_numeric(parts['n'], errors='coerce').fillna(1)
+        pending_base = base[pending]
+        parsed = pd.Series(pd.NaT, index=parts.index, dtype='datetime64[ns]')
+        for unit, code in (('minutes', 'min'), ('hours', 'h'), ('days', 'D'), ('weeks', 'W')):
+            mask = parts[unit].notna()
+            if mask.any():
+                parsed[mask] = pending_base[mask] - pd.to_timedelta(amount[mask], unit=code)
+        for unit, factor in (('months', 1), ('years', 12)):
+            mask = parts[unit].notna()
+            if mask.any():
+                parsed[mask] = _subtract_months(pending_base[mask], (amount[mask] * factor).astype('int64'))
+        result[pending] = parsed
+
+    # 4. Anahtar kelimeler (bugün, dün, вчера, ...)
+    pending = result.isna() & ~invalid
+    if pending.any():
+        keyword = text[pending].str.extract('(' + '|'.join(sorted(_KEYWORDS, key=len, reverse=True)) + ')')[0]
+        offsets = keyword.map(_KEYWORDS).dropna().astype('int64')
+        if len(offsets):
+            result[offsets.index] = base[offsets.index].dt.normalize() - pd.to_timedelta(offsets, unit='D')
+
+    return result
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Arama Sonucu Ayrıştırma Kontrolü (tarayıcısız)
+Path: fixtures/check_search_results.py
+
+search_discovery'deki saf fonksiyonları (parse_count, parse_rating, parse_search_results,
+merge_results, order_by_cost) Playwright olmadan doğrular:
+1. Sayı/puan metni örnekleri
+2. search_results.html kartları EXTRACT_RESULTS_JS ile aynı kurallarla html.parser üzerinden okunur,
+   sonuç search_results.expected.json ile karşılaştırılır
+
+Tarayıcıdaki çıkarımı (JS seçicileri) `python search_discovery.py --fixture fixtures/search_results.html`
+doğrular; bu betik sadece Python tarafını kapsar.
+
+Kullanım:
+    python fixtures/check_search_results.py
+"""
+
+import json
+import os
+import sys
+from html.parser import HTMLParser
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(FIXTURE_DIR))
+from search_discovery import (merge_results, order_by_cost, parse_count, parse_rating,  # noqa: E402
+                              parse_search_results)
+
+COUNT_CASES = {
+    '1 245 değerlendirme': 1245, '(8 312)': 8312, '2,4 тыс. оценок': 2400, '1.2K reviews': 1200,
+    '37 reviews': 37, '3 bin yorum': 3000, '': None, None: None, 'değerlendirme yok': None
+}
+RATING_CASES = {'4,6': 4.6, '4.8': 4.8, '5': 5.0, '': None, None: None}
+# EXTRACT_RESULTS_JS'teki seçicilerin sınıf karşılıkları (ilk eşleşen eleman kullanılır)
+TEXT_FIELDS = {
+    'name': ('search-business-snippet-view__title', 'search-snippet-view__title'),
+    'category': ('search-business-snippet-view__category',),
+    'address': ('search-business-snippet-view__address',),
+    'rating_text': ('business-rating-badge-view__rating-text',),
+    'count_text': ('business-rating-amount-view',),
+}
+VOID_TAGS = {'br', 'img', 'input', 'meta', 'link', 'hr'}
+
+
+class CardParser(HTMLParser):
+    """.search-snippet-view kartlarını EXTRACT_RESULTS_JS çıktısıyla aynı biçimde topla"""
+
+    def __init__(self):
+        super().__init__()
+        self.cards = []
+        self.card = None
+        self.depth = 0
+        self.capture = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if self.card is None:
+            if 'search-snippet-view' in classes:
+                self.card = {'href': None, 'advert': False, **{field: None for field in TEXT_FIELDS}}
+                self.depth = 1
+            return
+        if tag not in VOID_TAGS:
+            self.depth += 1
+        if tag == 'a' and self.card['href'] is None and '/org/' in (attrs.get('href') or ''):
+            self.card['href'] = attrs['href']
+        if '_advert' in classes:
+            self.card['advert'] = True
+        for field, names in TEXT_FIELDS.items():
+            if self.card[field] is None and any(name in classes for name in names):
+                self.card[field] = ''
+                self.capture.append((field, self.depth))
+
+    def handle_data(self, data):
+        for field, _ in self.capture:
+            self.card[field] += data
+
+    def handle_endtag(self, tag):
+        if self.card is None or tag in VOID_TAGS:
+            return
+        self.capture = [(field, depth) for field, depth in self.capture if depth != self.depth]
+        self.depth -= 1
+        if self.depth == 0:
+            self.cards.append({key: value.strip() if isinstance(value, str) else value
+                               for key, value in self.card.items()})
+            self.card = None
+
+
+def check(name, actual, expected):
+    if actual != expected:
+        print(f"❌ {name}: {actual!r} != {expected!r}")
+        return False
+    return True
+
+
+def main():
+    ok = all([check(f"parse_count({text!r})", parse_count(text), value) for text, value in COUNT_CASES.items()])
+    ok &= all([check(f"parse_rating({text!r})", parse_rating(text), value) for text, value in RATING_CASES.items()])
+    ok &= check("order_by_cost (max_reviews=100)",
+                [r['business_id'] for r in order_by_cost(
+                    [{'business_id': 'a', 'review_count': 50}, {'business_id': 'b', 'review_count': 5000},
+                     {'business_id': 'c', 'review_count': None}], max_reviews=100)],
+                ['b', 'c', 'a'])
+
+    parser = CardParser()
+    with open(os.path.join(FIXTURE_DIR, 'search_results.html'), 'r', encoding='utf-8') as f:
+        parser.feed(f.read())
+    results = order_by_cost(list(merge_results({}, parse_search_results(parser.cards)).values()))
+    with open(os.path.join(FIXTURE_DIR, 'search_results.expected.json'), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    ok &= check("search_results.html", results, expected)
+
+    print("✅ Arama sonucu ayrıştırma kontrolleri geçti" if ok else "❌ Arama sonucu ayrıştırma kontrolleri başarısız")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - HAR Kayıt/Tekrar Oynatma Yardımcıları
+Path: har_replay.py
+
+Kazıma oturumları Playwright'ın HAR kaydıyla (record_har_path) arşivlenir ve daha sonra
+context.route_from_har ile çevrimdışı tekrar oynatılır. Kaydırmayla tetiklenen yorum sayfası
+istekleri her çalıştırmada değişen parametreler (csrfToken, reqId, ...) taşıdığı için birebir
+URL eşleşmesi tutmaz; HarArchive bu parametreleri atarak normalize edilmiş URL ile eşleştirir
+ve route_from_har'ın bulamadığı istekleri arşivden cevaplar.
+"""
+
+import json
+import base64
+import zipfile
+import logging
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Her oturumda farklı olan, eşleştirmede yok sayılan sorgu parametreleri
+VOLATILE_PARAMS = {'csrfToken', 'reqId', 'sessionId', 's', '_', 'ts', 'timestamp', 'callback', 'yu'}
+# Gövde çözülmüş olarak verildiği için aktarılmayan başlıklar
+_SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+def normalize_url(url):
+    """Değişken parametreleri atıp kalanları sıralayarak eşleştirme anahtarı üret"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}"
+
+
+class HarArchive:
+    """HAR (.har veya ekli içerikli .zip) arşivinden normalize URL ile yanıt veren yönlendirici"""
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path) if str(path).endswith('.zip') else None
+        if self.zip:
+            har_name = next(name for name in self.zip.namelist() if name.endswith('.har'))
+            har = json.loads(self.zip.read(har_name))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                har = json.load(f)
+        self.index = {}
+        self.served = {}
+        for entry in har['log']['entries']:
+            key = (entry['request']['method'], normalize_url(entry['request']['url']))
+            self.index.setdefault(key, []).append(entry)
+        self.misses = 0
+
+    def _body(self, content):
+        if content.get('_file') and self.zip:
+            return self.zip.read(content['_file'])
+        text = content.get('text') or ''
+        if content.get('encoding') == 'base64':
+            return base64.b64decode(text)
+        return text.encode('utf-8')
+
+    def lookup(self, method, url):
+        """Aynı anahtarlı kayıtlar sırayla verilir (aynı istek tekrarlanırsa son kayıt tekrar kullanılır)"""
+        key = (method, normalize_url(url))
+        entries = self.index.get(key)
+        if not entries:
+            return None
+        position = self.served.get(key, 0)
+        self.served[key] = position + 1
+        return entries[min(position, len(entries) - 1)]
+
+    async def handle(self, route):
+        """Playwright route işleyicisi: arşivde varsa cevapla, yoksa isteği kes (çevrimdışı)"""
+        request = route.request
+        entry = self.lookup(request.method, request.url)
+        if entry is None:
+            self.misses += 1
+            logger.debug(f"HAR'da bulunamadı: {request.method} {request.url}")
+            await route.abort()
+            return
+        response = entry['response']
+        headers = {h['name']: h['value'] for h in response.get('headers', [])
+                   if h['name'].lower() not in _SKIPPED_HEADERS}
+        await route.fulfill(status=response['status'], headers=headers, body=self._body(response['content']))
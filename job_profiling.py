@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - İş Başına Profil Yakalama
+Path: job_profiling.py
+
+Yavaş bir işletmede zamanın nereye gittiğini kod değiştirmeden görmek için (--profile):
+1. Python profili (cProfile): kaydırma ve çıkarım aşamaları boyunca; .prof dosyası snakeviz,
+   `python -m pstats` veya flameprof ile incelenebilir
+2. Playwright izi (context.tracing): aynı aralıkta ekran görüntüleri + DOM anlık görüntüleri +
+   ağ/CDP çağrıları; `playwright show-trace <dosya>` ile açılır
+3. Özet: en çok süre harcayan fonksiyonlar ve kategori dağılımı (regex, Playwright/CDP,
+   olay döngüsü beklemesi, scraper kodu) iş raporuna eklenir
+
+Not: cProfile iş parçacığı başına tek profil tutar; aynı süreçte eşzamanlı işler (parçalı kazıma)
+varsa sadece ilk işin Python profili alınır, diğerleri sadece Playwright izi kaydeder.
+"""
+
+import os
+import json
+import time
+import pstats
+import cProfile
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Dosya yolu / fonksiyon adı parçasına göre kaba kategoriler (ilk eşleşen kazanır)
+PROFILE_CATEGORIES = (
+    ('olay döngüsü beklemesi (ağ, render)', ("method 'select' of", "method 'poll' of", "method 'control' of")),
+    ('regex', ("of 're.Pattern' objects", f'{os.sep}re{os.sep}')),
+    ('playwright/CDP', ('playwright',)),
+    ('json', ('json',)),
+    ('asyncio', ('asyncio',)),
+    ('scraper', ('pagination_scraper', 'review_', 'text_normalization', 'date_parser')),
+)
+
+_active_profiler = None
+
+
+def _function_label(function):
+    filename, line, name = function
+    if filename == '~':
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def _category(function):
+    filename, _, name = function
+    text = f"{filename} {name}"
+    for category, markers in PROFILE_CATEGORIES:
+        if any(marker in text for marker in markers):
+            return category
+    return 'diğer'
+
+
+def summarize_profile(stats, top=15):
+    """pstats.Stats → en çok öz süre (tottime) harcayan fonksiyonlar + kategori dağılımı"""
+    rows = []
+    categories = {}
+    total = 0.0
+    for function, (_, calls, tottime, cumtime, _) in stats.stats.items():
+        total += tottime
+        category = _category(function)
+        categories[category] = categories.get(category, 0.0) + tottime
+        rows.append((tottime, cumtime, calls, function))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    return {
+        'total_seconds': round(total, 3),
+        'categories': {name: round(seconds, 3)
+                       for name, seconds in sorted(categories.items(), key=lambda item: item[1], reverse=True)},
+        'hotspots': [
+            {'function': _function_label(function), 'calls': calls,
+             'tottime': round(tottime, 4), 'cumtime': round(cumtime, 4)}
+            for tottime, cumtime, calls, function in rows[:top]
+        ]
+    }
+
+
+class JobProfiler:
+    """Bir işin kaydırma/çıkarım aşaması için cProfile + Playwright izi"""
+
+    def __init__(self, directory, name, trace=True, top=15):
+        self.directory = directory
+        self.name = name
+        self.trace = trace
+        self.top = top
+        self.profile = None
+        self.context = None
+        self.started = None
+        self.running = False
+
+    def _path(self, suffix):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{self.name}{suffix}")
+
+    async def start(self, context=None):
+        global _active_profiler
+        self.started = time.perf_counter()
+        self.running = True
+        if _active_profiler is None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            _active_profiler = self
+        else:
+            logger.warning("⚠️ Süreçte başka bir Python profili açık; bu iş için sadece Playwright izi alınıyor")
+        if self.trace and context is not None:
+            await context.tracing.start(title=self.name, screenshots=True, snapshots=True)
+            self.context = context
+        logger.info(f"🩺 Profil yakalama başladı: {self.name}")
+
+    async def stop(self):
+        """Profili ve izi diske yaz; özet raporu döndür (birden fazla çağrılabilir)"""
+        global _active_profiler
+        if not self.running:
+            return None
+        self.running = False
+        report = {'name': self.name, 'seconds': round(time.perf_counter() - self.started, 2)}
+        if self.profile is not None:
+            self.profile.disable()
+            _active_profiler = None
+            report['profile_file'] = self._path('.prof')
+            self.profile.dump_stats(report['profile_file'])
+            report.update(summarize_profile(pstats.Stats(self.profile), self.top))
+        if self.context is not None:
+            report['trace_file'] = self._path('.trace.zip')
+            try:
+                await self.context.tracing.stop(path=report['trace_file'])
+            except Exception as e:
+                logger.warning(f"⚠️ Playwright izi kaydedilemedi: {e}")
+                report['trace_file'] = None
+            self.context = None
+        with open(self._path('.report.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        log_profile_report(report)
+        return report
+
+
+def log_profile_report(report, top=5):
+    """Özetin okunabilir kısmını logla"""
+    logger.info(f"🩺 Profil: {report['name']} ({report['seconds']} sn)")
+    for name, seconds in list(report.get('categories', {}).items())[:top]:
+        logger.info(f"   {name}: {seconds:.2f} sn")
+    for hotspot in report.get('hotspots', [])[:top]:
+        logger.info(f"   🔥 {hotspot['function']}: {hotspot['tottime']:.3f} sn öz, "
+                    f"{hotspot['cumtime']:.3f} sn toplam, {hotspot['calls']} çağrı")
+    for key in ('profile_file', 'trace_file'):
+        if report.get(key):
+            logger.info(f"   📁 {report[key]}")
+
+
+def profile_name(business_id, shard=None):
+    """Profil dosyalarının ortak adı: <business_id>[_<parça>]_<zaman damgası>"""
+    parts = [str(business_id or 'unknown')] + ([shard] if shard else [])
+    return "_".join(parts + [datetime.now().strftime("%Y%m%d_%H%M%S")])
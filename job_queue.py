@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Kalıcı Kazıma İş Kuyruğu
+Path: job_queue.py
+
+SQLite tabanlı, birden fazla worker sürecinin güvenle paylaşabildiği iş kuyruğu:
+1. İşler business_id (+ iş türü) ile tekildir; aynı işletme iki kez kuyruğa girmez
+2. Öncelik, deneme sayısı, kira (lease) / heartbeat ve son başarı zamanı tutulur
+3. Başarısız işler üstel geri çekilme (exponential backoff) ile yeniden denenir
+4. Çöken worker'ın kirası süresi dolunca iş başka bir worker'a geçer; süresi dolmuş kiranın
+   sahibi işi tamamlayamaz, böylece aynı iş iki kez sonuçlanmaz
+
+Örnek:
+    python job_queue.py enqueue https://yandex.com.tr/maps/org/ornek/123/ --priority 10
+    python job_queue.py enqueue --from-discovery data/discovery/discovery_kafe_istanbul_*.json
+    python job_queue.py work --workers 4
+    python job_queue.py status
+"""
+
+import os
+import json
+import time
+import socket
+import random
+import sqlite3
+import asyncio
+import logging
+import argparse
+import dataclasses
+import multiprocessing
+
+from search_discovery import ORG_URL_PATTERN
+from structured_logging import configure_logging, log_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = os.path.join('data', 'jobs.sqlite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    business_id TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'scrape',
+    url TEXT NOT NULL,
+    payload TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    heartbeat_at REAL,
+    last_error TEXT,
+    last_success_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (business_id, kind)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, available_at);
+"""
+
+# Durumlar: queued (bekliyor), leased (bir worker'da), done (tamamlandı), failed (deneme hakkı bitti)
+QUEUED, LEASED, DONE, FAILED = 'queued', 'leased', 'done', 'failed'
+
+
+def business_id_from_url(url):
+    """İşletme URL'sinden org kimliğini çıkar"""
+    match = ORG_URL_PATTERN.search(url or '')
+    return match.group(2) if match else None
+
+
+def next_run_at(job, now=None):
+    """Başarılı yenileme işinin bir sonraki çalışma zamanı (payload'daki planlanan aralıktan); diğer işler için None"""
+    interval_days = (job.get('payload') or {}).get('interval_days')
+    if job.get('kind') != 'refresh' or not interval_days:
+        return None
+    return (now or time.time()) + interval_days * 86400
+
+
+def backoff_delay(attempts, base=60.0, cap=6 * 3600.0):
+    """attempts. başarısızlıktan sonra bekleme süresi (saniye): base * 2^(attempts-1), ±%20 jitter"""
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class JobQueue:
+    """SQLite tabanlı kalıcı iş kuyruğu"""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, backoff_base=60.0, backoff_cap=6 * 3600.0):
+        self.path = path
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Otomatik commit modu; yazma işlemleri açık BEGIN IMMEDIATE transaction'larıyla yapılır
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _write(self, sql, params=()):
+        """Tek bir yazma ifadesini kendi transaction'ında çalıştır; etkilenen satır sayısını döndür"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(sql, params)
+            self.conn.execute("COMMIT")
+            return cursor.rowcount
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, url, business_id=None, kind='scrape', priority=0, payload=None,
+                available_at=None, max_attempts=5):
+        """İşi kuyruğa ekle. İşletmenin aynı türde işi varsa yeniden kuyruğa alınır (kiradaki iş bozulmaz)."""
+        business_id = str(business_id or business_id_from_url(url) or '')
+        if not business_id:
+            raise ValueError(f"URL'den business_id çıkarılamadı: {url}")
+        now = time.time()
+        available_at = now if available_at is None else available_at
+        self._write(
+            """
+            INSERT INTO jobs (business_id, kind, url, payload, priority, max_attempts, available_at,
+                              created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(business_id, kind) DO UPDATE SET
+                url = excluded.url,
+                payload = COALESCE(excluded.payload, payload),
+                priority = MAX(priority, excluded.priority),
+                max_attempts = excluded.max_attempts,
+                status = CASE WHEN status = 'leased' THEN status ELSE 'queued' END,
+                attempts = CASE WHEN status = 'leased' THEN attempts ELSE 0 END,
+                available_at = CASE WHEN status = 'queued' THEN MIN(available_at, excluded.available_at)
+                                    WHEN status = 'leased' THEN available_at
+                                    ELSE excluded.available_at END,
+                updated_at = excluded.updated_at
+            """,
+            (business_id, kind, url, json.dumps(payload, ensure_ascii=False) if payload is not None else None,
+             int(priority), int(max_attempts), available_at, now, now)
+        )
+        return business_id
+
+    def lease(self, worker_id, lease_seconds=900, kinds=None):
+        """Hazır olan en yüksek öncelikli işi atomik olarak kirala (yoksa None).
+
+        Süresi dolmuş kiralar (çöken worker'lar) da yeniden kiralanabilir; deneme hakkı bitmiş olanlar
+        (ör. worker'ı her seferinde çökerten iş) yeniden kiralanmaz, başarısız olarak işaretlenir.
+        """
+        now = time.time()
+        kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            exhausted = self.conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', lease_owner = NULL, lease_expires_at = NULL,
+                                last_error = 'Kira süresi doldu (worker çöktü?), deneme hakkı bitti', updated_at = ?
+                WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts
+                """,
+                (now, now)
+            ).rowcount
+            if exhausted:
+                logger.error(f"❌ {exhausted} iş kira süresi dolup deneme hakkı bittiği için başarısız sayıldı")
+            row = self.conn.execute(
+                f"""
+                SELECT * FROM jobs
+                WHERE ((status = 'queued' AND available_at <= ?)
+                       OR (status = 'leased' AND lease_expires_at < ? AND attempts < max_attempts)) {kind_filter}
+                ORDER BY priority DESC, available_at ASC
+                LIMIT 1
+                """,
+                (now, now, *(kinds or []))
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                """
+                UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires_at = ?, heartbeat_at = ?,
+                                attempts = attempts + 1, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (worker_id, now + lease_seconds, now, now, row['job_id'])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        job = dict(row)
+        job.update(status=LEASED, lease_owner=worker_id, lease_expires_at=now + lease_seconds,
+                   attempts=row['attempts'] + 1)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else {}
+        if row['status'] == LEASED:
+            logger.warning(f"♻️ Süresi dolmuş kira devralındı: {row['business_id']} (önceki: {row['lease_owner']})")
+        return job
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=900):
+        """Kirayı uzat. Kira başka bir worker'a geçtiyse False döner (iş bırakılmalı)."""
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET lease_expires_at = ?, heartbeat_at = ?, updated_at = ? "
+            "WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + lease_seconds, now, now, job_id, worker_id)
+        ) == 1
+
+    def complete(self, job_id, worker_id, next_run_at=None):
+        """İşi başarıyla tamamla. next_run_at verilirse iş o zamana yeniden planlanır (yenileme işleri)."""
+        now = time.time()
+        return self._write(
+            """
+            UPDATE jobs SET status = ?, available_at = COALESCE(?, available_at), attempts = 0,
+                            lease_owner = NULL, lease_expires_at = NULL, last_error = NULL,
+                            last_success_at = ?, updated_at = ?
+            WHERE job_id = ? AND status = 'leased' AND lease_owner = ?
+            """,
+            (QUEUED if next_run_at is not None else DONE, next_run_at, now, now, job_id, worker_id)
+        ) == 1
+
+    def fail(self, job_id, worker_id, error):
+        """Başarısız denemeyi kaydet; deneme hakkı kaldıysa üstel geri çekilmeyle yeniden kuyruğa al"""
+        now = time.time()
+        row = self.conn.execute("SELECT attempts, max_attempts FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return False
+        exhausted = row['attempts'] >= row['max_attempts']
+        retry_at = now + backoff_delay(row['attempts'], self.backoff_base, self.backoff_cap)
+        return self._write(
+            """
+            UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL, lease_expires_at = NULL,
+                            last_error = ?, updated_at = ?
+            WHERE job_id = ? AND status = 'leased' AND lease_owner = ?
+            """,
+            (FAILED if exhausted else QUEUED, retry_at, str(error)[:2000], now, job_id, worker_id)
+        ) == 1
+
+    def stats(self):
+        """Durum bazında iş sayıları"""
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def pending_count(self, now=None):
+        """Bu çalıştırmada bitirilmesi gereken iş sayısı: kirada olanlar, zamanı gelmiş bekleyenler ve geri
+        çekilmedeki yeniden denemeler. İleri tarihe planlanmış işler (ör. yenilemeler) sayılmaz."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'leased' "
+            "OR (status = 'queued' AND (available_at <= ? OR attempts > 0))",
+            (now or time.time(),)
+        ).fetchone()[0]
+
+    def jobs(self, status=None):
+        """İşleri listele (isteğe bağlı durum filtresiyle)"""
+        if status:
+            rows = self.conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY priority DESC", (status,))
+        else:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY priority DESC")
+        return [dict(row) for row in rows]
+
+
+async def run_job(job):
+    """Tek bir kazıma işini çalıştır ve dosyalara kaydet. Hata durumunda istisna fırlatır."""
+    from pagination_scraper import YandexMapsScraper, scrape_sharded
+
+    payload = job.get('payload') or {}
+    scraper = YandexMapsScraper()
+    if payload.get('profile'):
+        # Profil dosyaları işe özel klasöre yazılır; özet iş raporuna eklenir
+        scraper.profile_dir = os.path.join(payload['profile'] if isinstance(payload['profile'], str)
+                                           else os.path.join(scraper.output_dir, 'profiles'), f"job_{job['job_id']}")
+    if job.get('kind') == 'refresh':
+        # Yenileme işleri önce yorum sayısını yoklar; değişiklik yoksa kazıma yapılmaz
+        data = await scraper.scrape_if_changed(job['url'], max_reviews=payload.get('max_reviews'))
+        if data.get('unchanged'):
+            return {'scraped_reviews': 0, 'unchanged': True}
+    elif payload.get('shards'):
+        # Büyük işletmeler: aynı işletme farklı sıralama/filtre parçalarıyla eşzamanlı kazınır
+        config = dataclasses.replace(scraper.config, profile_dir=scraper.profile_dir)
+        data = await scrape_sharded(job['url'], payload['shards'], max_reviews=payload.get('max_reviews'),
+                                    config=config)
+    else:
+        data = await scraper.scrape_all_reviews(job['url'], max_reviews=payload.get('max_reviews'))
+    if data.get('error') or not data.get('business_id'):
+        raise RuntimeError(data.get('error') or "İşletme bilgileri alınamadı")
+    raw_filename, _ = await scraper.save_to_files(data, f"yandex_reviews_{job['business_id']}")
+    report = {'scraped_reviews': len(data.get('reviews') or []), 'raw_file': raw_filename}
+    if data.get('profile'):
+        profile = data['profile']
+        report['profile'] = {
+            'trace_file': profile.get('trace_file'),
+            'profile_file': profile.get('profile_file'),
+            'categories': profile.get('categories'),
+            'hotspots': [h['function'] for h in profile.get('hotspots', [])[:5]]
+        }
+    return report
+
+
+async def worker_loop(queue_path=DEFAULT_QUEUE_PATH, worker_id=None, lease_seconds=900, poll_interval=5.0,
+                      stop_when_empty=True, job_runner=run_job):
+    """Kuyruktan iş kirala, çalıştırırken heartbeat gönder, sonucu kaydet"""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = JobQueue(queue_path)
+    processed = 0
+    try:
+        while True:
+            job = queue.lease(worker_id, lease_seconds)
+            if job is None:
+                if stop_when_empty and queue.pending_count() == 0:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+
+            # İşin tüm logları (görev bağlamı kopyalandığı için scraper dahil) job_id/business_id taşır
+            with log_context(job_id=job['job_id'], business_id=job['business_id'], phase='job'):
+                logger.info(f"🔧 [{worker_id}] İş alındı: {job['business_id']} "
+                            f"(öncelik {job['priority']}, deneme {job['attempts']}/{job['max_attempts']})")
+                task = asyncio.create_task(job_runner(job))
+                lost_lease = False
+                while not task.done():
+                    await asyncio.wait({task}, timeout=lease_seconds / 3)
+                    if not task.done() and not queue.heartbeat(job['job_id'], worker_id, lease_seconds):
+                        logger.warning(f"⚠️ [{worker_id}] Kira kaybedildi, iş bırakılıyor: {job['business_id']}")
+                        task.cancel()
+                        # Tarayıcı bir sonraki kiradan önce kapansın diye iptalin bitmesi beklenir
+                        try:
+                            await task
+                        except asyncio.CancelledError:
+                            pass
+                        except Exception as e:
+                            logger.warning(f"⚠️ [{worker_id}] Bırakılan iş iptal edilirken hata: {e}")
+                        lost_lease = True
+                if lost_lease:
+                    continue
+
+                try:
+                    result = task.result()
+                except Exception as e:
+                    queue.fail(job['job_id'], worker_id, e)
+                    logger.error(f"❌ [{worker_id}] {job['business_id']} başarısız: {e}")
+                else:
+                    # Yenileme işleri bitince planlanan aralık kadar sonrasına yeniden kuyruğa alınır
+                    rerun_at = next_run_at(job)
+                    queue.complete(job['job_id'], worker_id, next_run_at=rerun_at)
+                    logger.info(f"✅ [{worker_id}] {job['business_id']} tamamlandı: {result}"
+                                + (f" (sonraki yenileme: {time.strftime('%Y-%m-%d %H:%M', time.localtime(rerun_at))})"
+                                   if rerun_at else ""))
+            processed += 1
+    finally:
+        queue.close()
+    return processed
+
+
+def _worker_process(queue_path, lease_seconds, poll_interval, log_options):
+    log_options = dict(log_options or {'log_file': None})
+    if log_options.get('log_file'):
+        log_options['log_file'] = log_options['log_file'].format(pid=os.getpid())
+    configure_logging(**log_options)
+    asyncio.run(worker_loop(queue_path, lease_seconds=lease_seconds, poll_interval=poll_interval))
+
+
+def run_workers(queue_path=DEFAULT_QUEUE_PATH, workers=2, lease_seconds=900, poll_interval=5.0, log_options=None):
+    """Zamanı gelmiş işler bitene kadar paralel worker süreçleri çalıştır.
+
+    log_options: her süreçte configure_logging'e verilen ayarlar (log_file, json_format, job_log_dir).
+    """
+    processes = [
+        multiprocessing.Process(target=_worker_process,
+                                args=(queue_path, lease_seconds, poll_interval, log_options))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return sum(1 for p in processes if p.exitcode != 0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Yandex Maps kazıma iş kuyruğu")
+    parser.add_argument('--queue', default=DEFAULT_QUEUE_PATH, help="Kuyruk veritabanı (varsayılan: data/jobs.sqlite)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = sub.add_parser('enqueue', help="İşletme URL'lerini kuyruğa ekle")
+    enqueue.add_argument('urls', nargs='*', help="İşletme URL'leri")
+    enqueue.add_argument('--from-discovery', nargs='*', default=[],
+                         help="search_discovery.py çıktıları (öncelik = beklenen yorum sayısı)")
+    enqueue.add_argument('--priority', type=int, default=0)
+    enqueue.add_argument('--max-reviews', type=int, default=None)
+    enqueue.add_argument('--max-attempts', type=int, default=5)
+    enqueue.add_argument('--profile', nargs='?', const=True, default=None, metavar='DIR',
+                         help="İş için cProfile + Playwright izi yakala (varsayılan klasör: <output_dir>/profiles/job_<id>)")
+    enqueue.add_argument('--shards', default=None,
+                         help="Virgülle ayrılmış parçalar (ör. relevance,newest,rating_asc); işletme içi paralel kazıma")
+
+    work = sub.add_parser('work', help="Zamanı gelmiş işler bitene kadar worker süreçleri çalıştır")
+    work.add_argument('-w', '--workers', type=int, default=2)
+    work.add_argument('--lease-seconds', type=int, default=900)
+    work.add_argument('--poll-interval', type=float, default=5.0)
+    work.add_argument('--log-dir', default=None,
+                      help="Süreç başına log dosyaları bu klasöre yazılır (worker_<pid>.log)")
+    work.add_argument('--log-json', action='store_true', help="Log dosyalarını JSON satırları olarak yaz")
+    work.add_argument('--job-logs', default=None, help="İş başına log dosyaları klasörü (job_<id>.log)")
+
+    sub.add_parser('status', help="Kuyruk durumunu göster")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+
+    if args.command == 'enqueue':
+        from search_discovery import expected_cost
+        queue = JobQueue(args.queue)
+        payload = {}
+        if args.max_reviews:
+            payload['max_reviews'] = args.max_reviews
+        if args.shards:
+            payload['shards'] = args.shards.split(',')
+        if args.profile:
+            payload['profile'] = args.profile
+        payload = payload or None
+        count = 0
+        for url in args.urls:
+            queue.enqueue(url, priority=args.priority, payload=payload, max_attempts=args.max_attempts)
+            count += 1
+        for path in args.from_discovery:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f).get('results', [])
+            for result in results:
+                # En çok yorumlu işletmeler önce: uzun işler erken başlar
+                queue.enqueue(result['url'], business_id=result['business_id'],
+                              priority=args.priority + expected_cost(result, args.max_reviews),
+                              payload=payload, max_attempts=args.max_attempts)
+                count += 1
+        logger.info(f"📥 {count} iş kuyruğa alındı: {queue.stats()}")
+        queue.close()
+    elif args.command == 'work':
+        log_options = {'log_file': None, 'json_format': args.log_json, 'job_log_dir': args.job_logs}
+        if args.log_dir:
+            log_options['log_file'] = os.path.join(args.log_dir, 'worker_{pid}.log')
+        failed = run_workers(args.queue, args.workers, args.lease_seconds, args.poll_interval, log_options)
+        if failed:
+            raise SystemExit(1)
+    else:
+        queue = JobQueue(args.queue)
+        print(json.dumps(queue.stats(), ensure_ascii=False, indent=2))
+        for job in queue.jobs(FAILED):
+            print(f"❌ {job['business_id']}: {job['last_error']}")
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yakın Tekrar (Near-Duplicate) Tespiti
+Path: near_duplicates.py
+
+Birebir aynı olmayan ama aynı yorumu temsil eden kayıtları (aynı işletme ve yazar içinde) bulur:
+1. Kesilmiş ("...") ve tam metinler: önek (prefix) bloklama
+2. Açılmış/kapalı spoiler, baştaki yazar adı vb. farklar: MinHash + LSH
+Tüm imzalar numpy ile toplu hesaplanır; ikili (O(n²)) karşılaştırma yapılmaz.
+"""
+
+import numpy as np
+import pandas as pd
+
+from text_normalization import normalize_review_texts
+
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+
+def _mix64(values):
+    """splitmix64 son karıştırma adımı (uint64 dizisi üzerinde)"""
+    with np.errstate(over='ignore'):
+        values = values ^ (values >> np.uint64(30))
+        values = values * np.uint64(0xBF58476D1CE4E5B9)
+        values = values ^ (values >> np.uint64(27))
+        values = values * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def shingle_hashes(texts, k=5):
+    """Metinlerin k karakterlik shingle hash'lerini toplu hesapla.
+
+    Dönüş: (hashes, offsets) - hashes tüm shingle'lar (belge sırasıyla),
+    offsets her belgenin hashes içindeki başlangıç indeksi.
+    """
+    texts = [t.ljust(k, '\x00') for t in texts]
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype='<u4').astype(np.uint64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    window_count = len(codes) - k + 1
+    hashes = np.zeros(window_count, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(k):
+            hashes = hashes * _SHINGLE_BASE + codes[j:j + window_count]
+    hashes = _mix64(hashes)
+
+    # Belge sınırını aşan pencereleri at
+    per_doc = lengths - k + 1
+    doc_of_window = np.repeat(np.arange(len(texts)), lengths)[:window_count]
+    position = np.arange(window_count) - starts[doc_of_window]
+    valid = position < per_doc[doc_of_window]
+    offsets = np.concatenate(([0], np.cumsum(per_doc)[:-1]))
+    return hashes[valid], offsets
+
+
+class MinHasher:
+    """Toplu MinHash imzası üretici.
+
+    Tek-permütasyonlu MinHash (one permutation hashing) kullanır: her shingle bir kez
+    hash'lenir ve num_perm kovadan birine düşer; boş kovalar rotasyonla doldurulur.
+    Böylece maliyet num_perm ile değil, toplam shingle sayısıyla doğrusal büyür.
+    """
+
+    _EMPTY = np.uint64(0xFFFFFFFFFFFFFFFF)
+    _ROTATION_OFFSET = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, num_perm=64, seed=1):
+        if num_perm & (num_perm - 1):
+            raise ValueError("num_perm 2'nin kuvveti olmalı")
+        self.num_perm = num_perm
+        self.seed = np.uint64(np.random.default_rng(seed).integers(0, 1 << 63))
+        self.shift = np.uint64(64 - (num_perm.bit_length() - 1))
+        self.value_mask = np.uint64((1 << (64 - (num_perm.bit_length() - 1))) - 1)
+
+    def _densify(self, signatures):
+        """Boş kovaları sağdaki ilk dolu kovanın değeriyle (dairesel) doldur"""
+        empty = signatures == self._EMPTY
+        if not empty.any():
+            return signatures
+        p = self.num_perm
+        columns = np.arange(2 * p)
+        doubled_empty = np.concatenate([empty, empty], axis=1)
+        positions = np.where(doubled_empty, 4 * p, columns)
+        next_full = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1][:, :p]
+        distance = (next_full - columns[:p]).astype(np.uint64)
+        rows = np.arange(signatures.shape[0])[:, None]
+        with np.errstate(over='ignore'):
+            filled = signatures[rows, next_full % p] + distance * self._ROTATION_OFFSET
+        return np.where(empty, filled, signatures)
+
+    def signatures(self, texts, k=5, chunk_shingles=2_000_000):
+        """Her metin için num_perm uzunluğunda MinHash imzası döndür (n x num_perm)"""
+        n = len(texts)
+        p = self.num_perm
+        result = np.empty((n, p), dtype=np.uint64)
+        start_doc = 0
+        while start_doc < n:
+            # Shingle sayısı chunk_shingles'ı aşmayacak şekilde belge grubu seç
+            end_doc = start_doc
+            total = 0
+            while end_doc < n and (end_doc == start_doc or total + max(len(texts[end_doc]), k) <= chunk_shingles):
+                total += max(len(texts[end_doc]), k)
+                end_doc += 1
+            hashes, offsets = shingle_hashes(texts[start_doc:end_doc], k)
+            counts = np.diff(np.append(offsets, len(hashes)))
+            docs = np.repeat(np.arange(end_doc - start_doc), counts)
+            mixed = _mix64(hashes ^ self.seed)
+            slots = docs * p + (mixed >> self.shift).astype(np.int64)
+            chunk = np.full((end_doc - start_doc) * p, self._EMPTY, dtype=np.uint64)
+            np.minimum.at(chunk, slots, mixed & self.value_mask)
+            result[start_doc:end_doc] = self._densify(chunk.reshape(-1, p))
+            start_doc = end_doc
+        return result
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = np.arange(n)
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+    def roots(self):
+        return np.array([self.find(i) for i in range(len(self.parent))])
+
+
+def _band_keys(signatures, bands):
+    """İmzaları LSH bantlarına böl ve her bant için tek bir 64-bit anahtar üret"""
+    rows = signatures.shape[1] // bands
+    keys = np.empty((signatures.shape[0], bands), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for band in range(bands):
+            key = np.zeros(signatures.shape[0], dtype=np.uint64)
+            for col in signatures[:, band * rows:(band + 1) * rows].T:
+                key = _mix64(key * _SHINGLE_BASE + col)
+            keys[:, band] = key
+    return keys
+
+
+def _prepare_texts(df, text_column, author_column):
+    """Karşılaştırma için metni hazırla: sondaki '...' ve baştaki yazar adını at, normalize et"""
+    texts = df[text_column].fillna('').astype(str).str.replace(r'\s*(?:\.\.\.|…)\s*$', '', regex=True)
+    if author_column in df.columns:
+        authors = df[author_column].fillna('').astype(str)
+        texts = pd.Series(
+            [t[len(a):] if a and t.startswith(a) else t for t, a in zip(texts, authors)],
+            index=df.index
+        )
+    return normalize_review_texts(texts).astype(object).tolist()
+
+
+def find_near_duplicate_clusters(df, text_column='text_original', author_column='author_name',
+                                 group_column='business_id', threshold=0.8, num_perm=64, bands=16,
+                                 shingle_size=5, min_length=30, prefix_length=48):
+    """Yakın tekrar kümelerini bul.
+
+    Dönüş: (roots, lengths) - roots her satırın küme temsilcisinin konum indeksi
+    (tekil kayıtlar kendilerini gösterir), lengths normalize edilmiş metin uzunlukları.
+    """
+    n = len(df)
+    uf = _UnionFind(n)
+    if n < 2:
+        return uf.roots(), np.zeros(n, dtype=np.int64)
+
+    texts = _prepare_texts(df, text_column, author_column)
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=n)
+    eligible = np.flatnonzero(lengths >= min_length)
+    if len(eligible) < 2:
+        return uf.roots(), lengths
+
+    # Bloklar işletme + normalize yazar: farklı kişilerin benzer (genel) yorumları birleştirilmez
+    block = pd.Series('', index=df.index)
+    if group_column in df.columns:
+        block = df[group_column].astype(str)
+    if author_column in df.columns:
+        authors = normalize_review_texts(df[author_column].astype(object).fillna('').astype(str))
+        block = block.astype(str) + '\x1f' + authors.astype(str)
+    groups = pd.factorize(block)[0].astype(np.uint64)
+
+    # 1. Önek bloklama: kesilmiş metin, tam metnin önekidir
+    prefix_frame = pd.DataFrame({
+        'group': groups[eligible],
+        'prefix': [texts[i][:prefix_length] for i in eligible],
+        'length': lengths[eligible],
+        'pos': eligible
+    }).sort_values(['group', 'prefix', 'length'], ascending=[True, True, False])
+    prefix_frame = prefix_frame[prefix_frame.duplicated(['group', 'prefix'], keep=False)]
+    if len(prefix_frame):
+        heads = prefix_frame.groupby(['group', 'prefix'], sort=False)['pos'].transform('first').to_numpy()
+        for head, pos in zip(heads, prefix_frame['pos'].to_numpy()):
+            if head != pos and texts[head].startswith(texts[pos]):
+                uf.union(head, pos)
+
+    # 2. MinHash + LSH
+    hasher = MinHasher(num_perm=num_perm)
+    signatures = hasher.signatures([texts[i] for i in eligible], k=shingle_size)
+    keys = _band_keys(signatures, bands)
+    with np.errstate(over='ignore'):
+        keys = _mix64(keys + groups[eligible][:, None])
+
+    for band in range(bands):
+        order = np.argsort(keys[:, band], kind='stable')
+        sorted_keys = keys[order, band]
+        same = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+        if len(same) == 0:
+            continue
+        left, right = order[same], order[same + 1]
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        for i, j in zip(left[similarity >= threshold], right[similarity >= threshold]):
+            uf.union(eligible[i], eligible[j])
+
+    return uf.roots(), lengths
+
+
+def merge_near_duplicates(df, text_column='text_original', **kwargs):
+    """Yakın tekrar kümelerini birleştir; her kümeden en eksiksiz (normalize edilmiş hali en uzun) metnin satırı
+    temsilci olarak korunur, sadece temsilcide boş kalan alanlar kümenin diğer kayıtlarından doldurulur.
+
+    Dönüş: (birleştirilmiş DataFrame, çıkarılan kayıt sayısı)
+    """
+    roots, lengths = find_near_duplicate_clusters(df, text_column=text_column, **kwargs)
+    cluster_sizes = np.bincount(roots, minlength=len(df))
+    in_cluster = cluster_sizes[roots] > 1
+    if not in_cluster.any():
+        return df, 0
+
+    singles = df[~in_cluster]
+    members = df[in_cluster].assign(
+        _cluster=roots[in_cluster],
+        _length=lengths[in_cluster]
+    ).sort_values(['_cluster', '_length'], ascending=[True, False], kind='stable')
+    representatives = members.drop_duplicates('_cluster')
+    # Farklı kayıtların alanları karışmasın: temsilci satır korunur, sadece boş alanları doldurulur
+    fallback = members.groupby('_cluster', sort=False).first().reindex(representatives['_cluster'])
+    fallback.index = representatives.index
+    merged = representatives.drop(columns=['_cluster', '_length'])
+    merged = merged.fillna(fallback[merged.columns])
+
+    result = pd.concat([singles, merged]).sort_index()
+    return result, len(df) - len(result)
@@ -7,73 +7,343 @@ Veri kalitesi iyileştirilmiş, tekrarlar azaltılmış ve daha fazla veri eleme
 """
 
 import asyncio
+import argparse
+import contextlib
 import json
 import os
 import re
-import hashlib
-from playwright.async_api import async_playwright, TimeoutError
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
-import pandas as pd
 import logging
 import time
+from text_normalization import SCRAPER_NOISE_RE, normalize_review_text
+from search_discovery import parse_count
+from review_storage import jsonl_extension, write_reviews_dataset, write_reviews_jsonl, write_reviews_parquet
+from review_aggregates import AggregateStore
+from review_search import ReviewSearchIndex
+from job_profiling import JobProfiler, profile_name
+from har_replay import HarArchive
+from review_records import ReviewDedupeIndex, ReviewRecord, records_to_dicts, records_to_frame
+from review_identity import REVIEW_NATIVE_IDS_JS, NativeReviewIds, native_review_digest
+from structured_logging import LogSampler, configure_logging, log_context, reset_log_context, set_log_context
 
-# Klasörleri oluştur
-os.makedirs('data/raw', exist_ok=True)
-os.makedirs('data/processed', exist_ok=True)
-os.makedirs('data/autosave', exist_ok=True)  # Otomatik kayıtlar için yeni klasör
-
-# Logging ayarları
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler()
-    ]
-)
+# Import sırasında yan etki yok: klasörler ilk yazmada, log ayarları sadece CLI'da
+# (structured_logging.configure_logging: kuyruk tabanlı, bloklamayan) yapılır.
+# pandas (review_records/review_storage) ve Playwright (start_browser) ilk kullanımda yüklenir.
 logger = logging.getLogger(__name__)
 
+try:
+    from contextlib import aclosing
+except ImportError:  # Python 3.9: contextlib.aclosing 3.10'da geldi
+    @contextlib.asynccontextmanager
+    async def aclosing(thing):
+        try:
+            yield thing
+        finally:
+            await thing.aclose()
+
+DEFAULT_URL = ("https://yandex.com.tr/maps/org/istanbul_havalimani/85454152633/?ll=28.752054%2C41.279299"
+               "&utm_campaign=desktop&utm_medium=search&utm_source=maps&z=13.65")
+
+# Ağ yanıtlarındaki (JSON) toplam yorum sayısı alanları
+REVIEW_COUNT_KEYS = ('reviewCount', 'reviewsCount', 'totalReviewCount', 'totalReviews')
+# JSON nesnelerinde işletme kimliği taşıyan alanlar (yoklamada sayının hangi işletmeye ait olduğu)
+BUSINESS_ID_KEYS = ('id', 'oid', 'businessId', 'orgId')
+# Yoklama (probe) sırasında yüklenmeyen ağır kaynaklar
+PROBE_BLOCKED_RESOURCES = ('image', 'media', 'font', 'stylesheet')
+# Kazıma sırasında yüklenmeyen kaynaklar (fotoğraflar gerekirse photo_downloader ile tarayıcı dışında indirilir)
+SCRAPE_BLOCKED_RESOURCES = ('image', 'media')
+BROWSER_ARGS = ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
+
+# Parçalı kazıma: aynı işletme farklı sıralama/yıldız filtresiyle ayrı context'lerde eşzamanlı kazınır.
+# Yandex listeyi her sıralamada sınırlı sayıda yorumla gösterdiğinden farklı parçalar farklı yorumlara ulaşır.
+REVIEW_SHARDS = {
+    'relevance': {},  # Varsayılan sıralama (hiçbir şey seçilmez)
+    'newest': {'sort': 'newest'},
+    'rating_desc': {'sort': 'rating_desc'},
+    'rating_asc': {'sort': 'rating_asc'},
+    **{f'stars_{star}': {'stars': star} for star in range(1, 6)}
+}
+DEFAULT_SHARDS = ('relevance', 'newest', 'rating_desc', 'rating_asc')
+# Sıralama menüsündeki seçeneklerin etiketleri (tr/ru/en arayüz)
+REVIEW_SORT_LABELS = {
+    'relevance': r'(varsayılan|по умолчанию|default|relevan)',
+    'newest': r'(yeniye göre|en yeni|по новизне|newest)',
+    'rating_desc': r'(önce olumlu|yüksek puan|сначала положительные|positive first)',
+    'rating_asc': r'(önce olumsuz|düşük puan|сначала отрицательные|negative first)'
+}
+REVIEW_SORT_CONTROL_SELECTORS = ('.rating-ranking-view', '[class*="ranking"]', '[class*="reviews-sort"]',
+                                 '[class*="sort"]')
+
+# Toplam yorum sayısı çözücüsü: önce yapısal veri (schema.org, JSON-LD, gömülü sayfa durumu),
+# sonra hedefli başlık/sekme elementleri, en son sınırlı bir metin düğümü yürüyücüsü.
+# Tüm DOM'un textContent'i hiçbir zaman taranmaz.
+REVIEW_COUNT_RESOLVER_JS = r"""
+({textWalk, maxNodes}) => {
+    const number = /\d[\d\s ,.]*\d|\d/;
+    const meta = document.querySelector('meta[itemprop="reviewCount"], [itemprop="reviewCount"]');
+    if (meta) {
+        const match = (meta.getAttribute('content') || meta.textContent || '').match(number);
+        if (match) return {text: match[0], source: 'meta'};
+    }
+    for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+        const match = (script.textContent || '').match(/"reviewCount"\s*:\s*"?(\d+)/);
+        if (match) return {text: match[1], source: 'json_ld'};
+    }
+    for (const script of document.querySelectorAll('script.state-view, script[type="application/json"]')) {
+        const match = (script.textContent || '').match(/"(?:reviewCount|reviewsCount|totalReviewCount)"\s*:\s*(\d+)/);
+        if (match) return {text: match[1], source: 'state'};
+    }
+    const targeted = [
+        ['h2.card-section-header__title._wide', 'header'],
+        ['[data-tab-name="reviews"]', 'tab'],
+        ['.tabs-select-view__counter', 'tab']
+    ];
+    for (const [selector, source] of targeted) {
+        const el = document.querySelector(selector);
+        const match = el && (el.textContent || '').match(number);
+        if (match) return {text: match[0], source};
+    }
+    if (!textWalk) return null;
+    // Sadece kısa metin düğümlerine bakılır; sayı ile etiket ayrı düğümdeyse küçük ebeveyn birlikte okunur
+    const pattern = /(\d[\d\s ,.]*\d|\d)\s*(?:тыс\.?\s*)?(?:yorum|değerlendirme|отзыв|review)/i;
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    let visited = 0;
+    for (let node = walker.nextNode(); node && visited < maxNodes; node = walker.nextNode()) {
+        const value = node.nodeValue;
+        if (!value || value.length > 200 || !/\d/.test(value)) continue;
+        visited++;
+        let match = value.match(pattern);
+        const parent = node.parentElement;
+        if (!match && parent && parent.childElementCount <= 3) {
+            match = (parent.textContent || '').slice(0, 200).match(pattern);
+        }
+        if (match) return {text: match[0], source: 'text'};
+    }
+    return null;
+}
+"""
+# Çözücü kaynaklarının güven düzeyleri
+REVIEW_COUNT_CONFIDENCE = {
+    'network': 'high', 'meta': 'high', 'json_ld': 'high', 'state': 'high',
+    'header': 'medium', 'tab': 'medium',
+    'text': 'low'
+}
+
+# Yorum kartındaki fotoğraflar (URL + boyut). Tarayıcıda görseller engellendiği için naturalWidth
+# çoğunlukla 0'dır; boyut width/height özniteliklerinden veya URL'deki "WxH" kısmından okunur.
+REVIEW_PHOTOS_JS = r"""
+(element) => {
+    const card = element.closest('[data-review-id], .business-review-view, .business-reviews-card-view__review')
+        || element;
+    const photos = [];
+    const seen = new Set();
+    const sizeFromUrl = (url) => {
+        const match = url.match(/\/(\d{2,5})x(\d{2,5})(?:[\/?#]|$)/);
+        return match ? [Number(match[1]), Number(match[2])] : [null, null];
+    };
+    const add = (raw, el) => {
+        if (!raw || raw.startsWith('data:')) return;
+        let url;
+        try { url = new URL(raw, document.baseURI).href; } catch (e) { return; }
+        if (seen.has(url)) return;
+        seen.add(url);
+        let width = el.naturalWidth || Number(el.getAttribute('width')) || null;
+        let height = el.naturalHeight || Number(el.getAttribute('height')) || null;
+        if (!width || !height) [width, height] = sizeFromUrl(url);
+        photos.push({url, width, height});
+    };
+    const nodes = card.querySelectorAll('[class*="photo"], [class*="gallery"], [class*="media"], img[src*="review"]');
+    for (const node of nodes) {
+        // Yazar avatarı yorum fotoğrafı değildir
+        if (node.closest('[class*="avatar"], [class*="user-icon"]')) continue;
+        const images = node.tagName === 'IMG' ? [node] : node.querySelectorAll('img');
+        for (const img of images) add(img.getAttribute('src') || img.getAttribute('data-src'), img);
+        const background = (node.getAttribute('style') || '').match(/url\(["']?([^"')]+)["']?\)/);
+        if (background) add(background[1], node);
+    }
+    return photos;
+}
+"""
+# Kart başına tek evaluate: yerel kimlikler + fotoğraflar
+REVIEW_CARD_META_JS = (f"(element) => ({{ids: ({REVIEW_NATIVE_IDS_JS.strip()})(element), "
+                       f"photos: ({REVIEW_PHOTOS_JS.strip()})(element)}})")
+
+
+def find_review_count(data, business_id=None, depth=0, matched=False):
+    """JSON yanıtı içinde toplam yorum sayısı alanını ara (ilk bulunan değer).
+
+    business_id verilirse sadece kimliği bu işletmeye eşit nesnenin (veya onun kimliksiz alt
+    nesnelerinin) sayısı kabul edilir; "benzer yerler" gibi başka işletmelerin sayıları atlanır.
+    """
+    if depth > 8:
+        return None
+    if isinstance(data, dict):
+        if business_id is not None:
+            object_id = next((data[key] for key in BUSINESS_ID_KEYS if data.get(key) is not None), None)
+            if object_id is not None:
+                matched = str(object_id) == str(business_id)
+        if business_id is None or matched:
+            for key in REVIEW_COUNT_KEYS:
+                value = data.get(key)
+                if isinstance(value, int) and value >= 0:
+                    return value
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    else:
+        return None
+    for value in values:
+        if isinstance(value, (dict, list)):
+            found = find_review_count(value, business_id, depth + 1, matched)
+            if found is not None:
+                return found
+    return None
+
+@dataclass
+class ScraperConfig:
+    """YandexMapsScraper ayarları (varsayılanlar eski davranışla aynı)"""
+    base_url: str = "https://yandex.com.tr/maps"
+    headless: bool = True
+    # False ise input() ile beklenmez: CAPTCHA'da hata fırlatılır, yorum sekmesi bulunamazsa kazıma durur
+    interactive: bool = False
+    # raw/, processed/ ve autosave/ alt klasörleri ilk yazmada oluşturulur
+    output_dir: str = 'data'
+    # Kayıt formatları: 'jsonl' (kanonik ham format), 'json' (eski tek belge), 'csv', 'parquet'
+    output_formats: list = field(default_factory=lambda: ['jsonl', 'csv'])
+    # NDJSON sıkıştırması: 'gz', 'zst' (zstandard paketi gerekir) veya None
+    jsonl_compression: str = 'gz'
+    auto_save_interval: int = 50
+    # Verilirse yorumlar ayrıca business_id/scrape_date bölümlü Parquet veri setine eklenir
+    parquet_dataset_dir: str = None
+    # İşletme toplamları (puan histogramı, yanıt oranı, ...) yeni yorumlarla artımlı güncellenir; None ise kapalı,
+    # 'auto' ise <output_dir>/aggregates.sqlite kullanılır
+    aggregates_path: str = 'auto'
+    # Verilirse yorumlar yazıldıkça tam metin arama indeksine (SQLite FTS5) eklenir; 'auto' ise
+    # <output_dir>/search.sqlite kullanılır
+    search_index_path: str = None
+    # Verilirse kaydırma/çıkarım aşaması için cProfile + Playwright izi bu klasöre yazılır (job_profiling);
+    # 'auto' ise <output_dir>/profiles kullanılır
+    profile_dir: str = None
+    # HAR kaydı (oturumu arşivle) veya tekrar oynatma (canlı siteye gitmeden arşivden çalış)
+    record_har_path: str = None
+    replay_har_path: str = None
+    # Kaydırma adımları arası bekleme (tekrar oynatmada performans denemeleri için ayarlanabilir)
+    scroll_delay: float = 1.5
+    # Artımlı kazıma: toplamlarda zaten bulunan yorumlar tam çıkarım yapılmadan atlanır
+    skip_known_reviews: bool = False
+    # Görseller tarayıcıda yüklenmez; fotoğraf URL'leri yine de kayda yazılır
+    block_images: bool = True
+
+    def __post_init__(self):
+        if self.aggregates_path == 'auto':
+            self.aggregates_path = os.path.join(self.output_dir, 'aggregates.sqlite')
+        if self.search_index_path == 'auto':
+            self.search_index_path = os.path.join(self.output_dir, 'search.sqlite')
+        if self.profile_dir == 'auto':
+            self.profile_dir = os.path.join(self.output_dir, 'profiles')
+
+
 class YandexMapsScraper:
-    def __init__(self):
-        import collections
-        self.base_url = "https://yandex.com.tr/maps"
+    def __init__(self, config=None):
+        config = config or ScraperConfig()
+        self.config = config
+        self.base_url = config.base_url
+        self.headless = config.headless
+        self.interactive = config.interactive
+        self.output_dir = config.output_dir
         self.session_cookies = None
         self.page = None
         self.browser = None
+        self.owns_browser = True
+        self.context = None
+        self.record_har_path = config.record_har_path
+        self.replay_har_path = config.replay_har_path
+        self.scroll_delay = config.scroll_delay
         self.total_reviews = 0
-        # Sadece son 30 yorumu kontrol etmek için collections.deque kullan
-        self.recent_review_ids = collections.deque(maxlen=30)
-        self.recent_content_hashes = collections.deque(maxlen=30)
+        # Toplam yorum sayısının nereden okunduğu ve güven düzeyi (high/medium/low/none)
+        self.total_reviews_source = None
+        self.total_reviews_confidence = 'none'
+        # Tekrar kontrolü: son 30 yorum kimliği + tüm yorumlar boyunca 64-bit içerik özetleri
+        self.dedupe_index = ReviewDedupeIndex(recent_size=30)
         self.duplicate_count = 0  # Tekrar sayısını izlet()
-        # Gelişmiş tekrar kontrolü için tüm yorumlar boyunca hash seti
-        self.global_content_hashes = set()
+        # Ağ yanıtlarından öğrenilen Yandex yorum/yazar kimlikleri (DOM'da kimlik yoksa metinle eşleştirilir)
+        self.native_ids = NativeReviewIds()
+        # Yorum başına tekrarlanabilen mesajlar anahtar başına en fazla 5 saniyede bir yazılır
+        self.log_sampler = LogSampler(interval=5.0)
+        self.skip_known_reviews = config.skip_known_reviews
+        self.block_images = config.block_images
+        self.skipped_known_count = 0
         # Otomatik kaydetme için değişkenler
-        self.auto_save_interval = 50  # Her 50 yorumda bir otomatik kaydetme yapılacak
+        self.auto_save_interval = config.auto_save_interval  # Her N yorumda bir otomatik kaydetme yapılacak
         self.last_auto_save_count = 0
         self.business_id = None
         self.business_name = None
+        self.output_formats = list(config.output_formats)
+        self.jsonl_compression = config.jsonl_compression
+        # NDJSON autosave bu çalıştırma boyunca tek dosyaya eklenir
+        self.autosave_path = None
+        self.parquet_dataset_dir = config.parquet_dataset_dir
+        self.aggregates_path = config.aggregates_path
+        self.aggregate_store = None
+        self.last_aggregated_count = 0
+        self.search_index_path = config.search_index_path
+        self.search_index = None
+        self.last_indexed_count = 0
+        self.profile_dir = config.profile_dir
+        # Parçalı kazımada: parça adı (autosave dosya adına eklenir) ve paylaşılan dedupe için tekil hedef
+        self.shard_name = None
+        self.stop_at_unique = None
+
+    def output_path(self, subdir, filename):
+        """output_dir/subdir/filename yolu (klasör yoksa oluşturulur)"""
+        directory = os.path.join(self.output_dir, subdir)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+            
+    async def start_browser(self, browser=None):
+        """Browser'ı başlat ve session kur. browser verilirse (parçalı kazıma) onun içinde yeni context açılır."""
+        if browser is not None:
+            self.browser = browser
+            self.owns_browser = False
+        else:
+            from playwright.async_api import async_playwright
+
+            self.playwright = await async_playwright().start()
             
-    async def start_browser(self):
-        """Browser'ı başlat ve session kur"""
-        self.playwright = await async_playwright().start()
+            # Browser'ı yükle (headless=False olursa görünür olur)
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.headless,  # Varsayılan: performans için headless
+                args=BROWSER_ARGS
+            )
+            self.owns_browser = True
         
-        # Browser'ı yükle (headless=False olursa görünür olur)
-        self.browser = await self.playwright.chromium.launch(
-            headless=True,  # Performans için headless modda çalıştır
-            args=[
-                '--no-sandbox', 
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-gpu'
-            ]
-        )
+        context_options = {
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36',
+            'viewport': {'width': 1920, 'height': 1080}
+        }
+        if self.record_har_path:
+            # .zip uzantısında yanıt gövdeleri ayrı dosyalar olarak arşive eklenir
+            os.makedirs(os.path.dirname(self.record_har_path) or '.', exist_ok=True)
+            context_options.update(
+                record_har_path=self.record_har_path,
+                record_har_mode='full',
+                record_har_content='attach' if self.record_har_path.endswith('.zip') else 'embed'
+            )
+            logger.info(f"📼 Oturum HAR olarak kaydediliyor: {self.record_har_path}")
+        self.context = await self.browser.new_context(**context_options)
         
-        context = await self.browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
-        )
+        if self.replay_har_path:
+            # Önce birebir eşleşme (route_from_har), bulunamazsa değişken parametreleri atılmış eşleşme
+            await self.context.route('**/*', HarArchive(self.replay_har_path).handle)
+            await self.context.route_from_har(self.replay_har_path, not_found='fallback')
+            logger.info(f"▶️ Oturum HAR arşivinden tekrar oynatılıyor: {self.replay_har_path}")
+        if self.block_images:
+            # Son eklenen yönlendirici önce çalışır; görsel olmayan istekler HAR yönlendiricilerine devredilir
+            await self.context.route('**/*', self._block_images)
         
-        self.page = await context.new_page()
+        self.page = await self.context.new_page()
         
     async def navigate_to_place(self, business_url):
         """Yandex Maps'teki işletme sayfasına git"""
@@ -87,6 +357,9 @@ class YandexMapsScraper:
         if await self.check_and_handle_captcha():
             logger.info("✅ CAPTCHA işlemi tamamlandı, devam ediliyor...")
             
+        # Yorum sayfası istekleri sekme açılınca başlar; yerel yorum kimlikleri bu yanıtlardan toplanır
+        self.page.on('response', self._collect_native_ids)
+        
         # Yorumlar sekmesine geç
         if not await self.navigate_to_reviews_tab():
             logger.error("❌ Yorumlar sekmesine geçilemedi!")
@@ -117,6 +390,10 @@ class YandexMapsScraper:
                       'Are you not a robot' in page_title)
         
         if is_captcha:
+            if not self.interactive or not self.owns_browser:
+                # Kuyruk işçileri gibi gözetimsiz çalışmalarda input() ile sonsuza kadar beklenmez;
+                # paylaşılan tarayıcı da CAPTCHA için kapatılıp yeniden açılamaz
+                raise RuntimeError(f"CAPTCHA tespit edildi (etkileşimsiz mod veya paylaşılan tarayıcı): {current_url}")
             logger.warning("⚠️ CAPTCHA tespit edildi! Lütfen tarayıcıda CAPTCHA'yı çözün.")
             logger.warning("⚠️ CAPTCHA çözüldükten sonra entere basın...")
             
@@ -126,8 +403,8 @@ class YandexMapsScraper:
                 
             logger.info("🔄 CAPTCHA çözümü için görünür tarayıcı açılıyor...")
             self.browser = await self.playwright.chromium.launch(headless=False)
-            context = await self.browser.new_context()
-            self.page = await context.new_page()
+            self.context = await self.browser.new_context()
+            self.page = await self.context.new_page()
             
             # CAPTCHA sayfasına git
             await self.page.goto(current_url)
@@ -160,61 +437,154 @@ class YandexMapsScraper:
         except:
             return "Bilinmeyen İşletme"
     
+    async def resolve_review_count(self, text_walk=True, max_text_nodes=5000):
+        """Toplam yorum sayısını çöz. Dönüş: (sayı, kaynak, güven); bulunamazsa (None, None, 'none')"""
+        result = await self.page.evaluate(REVIEW_COUNT_RESOLVER_JS,
+                                          {'textWalk': text_walk, 'maxNodes': max_text_nodes})
+        count = parse_count(result['text']) if result else None
+        if count is None:
+            return None, None, 'none'
+        return count, result['source'], REVIEW_COUNT_CONFIDENCE[result['source']]
+
     async def get_total_review_count(self):
-        """Toplam yorum sayısını sayfadan çıkar"""
+        """Toplam yorum sayısını sayfadan çıkar (bulunamazsa None; varsayılan bir sayı uydurulmaz)"""
         try:
-            # Yorum sayısını içeren metni bul
-            review_count_text = await self.page.evaluate("""
-                () => {
-                    {
-                    // 0. H2 özel başlık
-                    const h2Review = document.querySelector('h2.card-section-header__title._wide');
-                    if (h2Review) {
-                        const text = h2Review.textContent || '';
-                        const match = text.match(/(\d[\d\s,.]*\d+)/);
-                        if (match) return match[0];
-                    }                                     
-                    
-                    // 1. Yorumlar sekmesi üzerindeki sayı
-                    const reviewTab = document.querySelector('[data-tab-name="reviews"], [role="tab"]:has-text("Yorumlar"), [role="tab"]:has-text("Reviews"), [role="tab"]:has-text("Отзывы")');
-                    if (reviewTab) {
-                        const text = reviewTab.textContent || '';
-                        const match = text.match(/(\\d[\\d\\s,.]*\\d+)/);
-                        if (match) return match[0];
-                    }
-                    
-                    // 2. Yorumlar başlığındaki sayı
-                    const headers = document.querySelectorAll('h1, h2, h3, .header, .title');
-                    for (const header of headers) {
-                        const text = header.textContent || '';
-                        const match = text.match(/(\\d[\\d\\s,.]*\\d+)\\s*(yorum|отзыв|reviews)/i);
-                        if (match) return match[1];
-                    }
-                    
-                    // 3. Sayfa üzerinde herhangi bir yerdeki yorum sayısı
-                    const elements = document.querySelectorAll('*');
-                    for (const elem of elements) {
-                        const text = elem.textContent || '';
-                        const match = text.match(/(\\d[\\d\\s,.]*\\d+)\\s*(yorum|отзыв|reviews)/i);
-                        if (match) return match[1];
-                    }
-                    
-                    return null;
-                }
-            """)
-            
-            if review_count_text:
-                # Sayıyı temizle (boşluklar, noktalama işaretleri vs.)
-                count_str = re.sub(r'\D', '', review_count_text)
-                if count_str.isdigit():
-                    return int(count_str)
-            
-            logger.warning("⚠️ Toplam yorum sayısı belirlenemedi, varsayılan değer kullanılacak")
-            return 1000  # Varsayılan bir değer
-            
+            count, source, confidence = await self.resolve_review_count()
         except Exception as e:
             logger.error(f"❌ Yorum sayısı alınırken hata: {e}")
-            return 1000  # Hata durumunda varsayılan bir değer
+            count, source, confidence = None, None, 'none'
+        self.total_reviews_source = source
+        self.total_reviews_confidence = confidence
+        if count is None:
+            logger.warning("⚠️ Toplam yorum sayısı belirlenemedi; yeni yorum gelmeyene kadar kaydırılacak")
+        else:
+            logger.info(f"🔢 Yorum sayısı kaynağı: {source} (güven: {confidence})")
+        return count
+    
+    async def _collect_native_ids(self, response):
+        """JSON yanıtlarındaki yorumlardan Yandex yorum/yazar kimliklerini topla"""
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return
+        if 'json' not in (response.headers.get('content-type') or ''):
+            return
+        try:
+            self.native_ids.add_payload(await response.json())
+        except Exception:
+            return
+
+    async def _block_images(self, route):
+        if route.request.resource_type in SCRAPE_BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            await route.fallback()
+
+    async def _block_heavy_resources(self, route):
+        if route.request.resource_type in PROBE_BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            # Diğer yönlendiricilere (ör. HAR tekrar oynatma) devret
+            await route.fallback()
+
+    async def probe_review_count(self, business_url, timeout=10000):
+        """Sayfayı minimal yükleyip sadece toplam yorum sayısını oku (tam kazıma yapmadan).
+
+        Önce ağdan gelen JSON yanıtlarında bu işletmeye ait nesnedeki sayı, yoksa yapısal veri ve
+        başlık/sekme elementleri kullanılır. Dönüş: (sayı, kaynak); okunamazsa (None, None).
+        """
+        # Playwright kendi TimeoutError'ını fırlatır (yerleşik TimeoutError ile yakalanmaz); eşleşme
+        # bulunamazsa yoklama tam kazımaya düşmeden eleman/metin yollarına devam eder
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        business_id = self.extract_business_id(business_url)
+        captured = []
+
+        async def on_response(response):
+            if response.request.resource_type not in ('xhr', 'fetch'):
+                return
+            if 'json' not in (response.headers.get('content-type') or ''):
+                return
+            try:
+                count = find_review_count(await response.json(), business_id)
+            except Exception:
+                return
+            if count is not None:
+                captured.append(count)
+
+        await self.page.route('**/*', self._block_heavy_resources)
+        self.page.on('response', on_response)
+        try:
+            await self.page.goto(business_url, wait_until='domcontentloaded', timeout=timeout)
+            await self.check_and_handle_captcha()
+            if captured:
+                return captured[-1], 'network'
+            try:
+                await self.page.wait_for_selector(
+                    'h2.card-section-header__title, [data-tab-name="reviews"]', timeout=timeout)
+            except PlaywrightTimeoutError:
+                pass
+            if captured:
+                return captured[-1], 'network'
+            # Yoklamada metin yürüyücüsü kullanılmaz: sadece yapısal veri ve hedefli elementler
+            count, source, _ = await self.resolve_review_count(text_walk=False)
+            return count, source
+        finally:
+            self.page.remove_listener('response', on_response)
+            await self.page.unroute('**/*', self._block_heavy_resources)
+
+    async def scrape_if_changed(self, business_url, max_reviews=None):
+        """Önce yorum sayısını yokla; sadece kayıtlı sayıdan farklıysa (veya bilinmiyorsa) tam kazıma yap.
+
+        Değişiklik yoksa 'unchanged': True ve boş yorum listesiyle döner.
+        """
+        started = time.time()
+        business_id = self.extract_business_id(business_url)
+        if self.aggregate_store is None and self.aggregates_path:
+            self.aggregate_store = AggregateStore(self.aggregates_path)
+        stored_count = self.aggregate_store.last_total_count(business_id) if self.aggregate_store else None
+
+        current_count = count_source = None
+        if stored_count is not None:
+            with log_context(business_id=business_id, phase='probe'):
+                await self.start_browser()
+                try:
+                    current_count, count_source = await self.probe_review_count(business_url)
+                except Exception as e:
+                    logger.warning(f"⚠️ Yorum sayısı yoklanamadı, tam kazıma yapılacak: {e}")
+                finally:
+                    await self.close()
+
+        unchanged = False
+        if current_count is not None:
+            # Farklı kaynaklardan okunan sayılar (ör. ağ yanıtı ve sekme başlığı) karşılaştırılmaz
+            previous_count = self.aggregate_store.last_total_count(business_id, count_source)
+            unchanged = current_count == previous_count
+            # Yoklama da bir gözlemdir: yenileme planlayıcısı sayıyı öğrenir, sonraki yoklama aynı kaynakla karşılaştırır
+            self.aggregate_store.record_scrape(business_id, current_count, 0 if unchanged else None, None,
+                                               business_url, count_source=count_source)
+
+        if unchanged:
+            seconds = time.time() - started
+            logger.info(f"💤 {business_id}: yorum sayısı değişmedi ({current_count}), kazıma atlandı "
+                        f"({seconds:.1f} sn)")
+            return {
+                'business_id': business_id,
+                'reviews': [],
+                'total_review_count': current_count,
+                'scraped_review_count': 0,
+                'scrape_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'scrape_url': business_url,
+                'unchanged': True
+            }
+
+        if current_count is not None:
+            logger.info(f"🔔 {business_id}: yorum sayısı değişti ({previous_count} → {current_count}, "
+                        f"kaynak: {count_source}), kazınıyor")
+        # Daha önce kazınmış işletmede sadece yeni yorumlar çıkarılır
+        incremental = stored_count is not None
+        data = await self.scrape_all_reviews(business_url, max_reviews=max_reviews, incremental=incremental)
+        # Sadece yeni yorumlar döndüyse çağıran (ör. servis önbelleği) bunu tam sonuç sanmasın
+        data['incremental'] = incremental
+        return data
     
     async def navigate_to_reviews_tab(self):
         """Yorumlar sekmesine git"""
@@ -250,6 +620,8 @@ class YandexMapsScraper:
             
             # 4. Kullanıcıdan manuel geçiş iste
             logger.warning("⚠️ Yorumlar sekmesi otomatik olarak bulunamadı.")
+            if not self.interactive:
+                return False
             logger.warning("ℹ️ Lütfen tarayıcıda 'Yorumlar' sekmesine manuel olarak tıklayın")
             input("Yorumlar sekmesine geçtikten sonra Enter tuşuna basın...")
             await asyncio.sleep(2)
@@ -259,6 +631,61 @@ class YandexMapsScraper:
             logger.error(f"❌ Yorumlar sekmesine geçerken hata: {e}")
             return False
     
+    async def apply_review_sort(self, sort):
+        """Yorum listesini verilen sıralamaya geçir (REVIEW_SORT_LABELS). Uygulanamazsa False."""
+        label = re.compile(REVIEW_SORT_LABELS[sort], re.IGNORECASE)
+        try:
+            for selector in REVIEW_SORT_CONTROL_SELECTORS:
+                control = await self.page.query_selector(selector)
+                if not control:
+                    continue
+                current = await control.text_content() or ''
+                if label.search(current):
+                    # Zaten bu sıralamadayız
+                    return True
+                await control.click()
+                await asyncio.sleep(1)
+                options = await self.page.query_selector_all(
+                    '[role="menuitem"], [role="option"], [class*="popup"] li, [class*="menu-item"], '
+                    '[class*="rating-ranking-view__popup-line"]')
+                for option in options:
+                    if label.search(await option.text_content() or ''):
+                        await option.click()
+                        await asyncio.sleep(2)
+                        logger.info(f"🔀 Yorum sıralaması uygulandı: {sort}")
+                        return True
+                # Menü açıldı ama seçenek yok: kapat ve sonraki kontrolü dene
+                await self.page.keyboard.press('Escape')
+        except Exception as e:
+            logger.warning(f"⚠️ Sıralama uygulanırken hata ({sort}): {e}")
+        return False
+
+    async def apply_star_filter(self, stars):
+        """Sadece verilen yıldız sayısındaki yorumları göster. Uygulanamazsa False."""
+        label = re.compile(rf'^\s*{stars}\s*(★|⭐|yıldız|звезд\w*|stars?)?\s*$', re.IGNORECASE)
+        try:
+            candidates = await self.page.query_selector_all(
+                '[class*="rating-filter"] [role="button"], [class*="rating-filter"] button, '
+                '[class*="filter"] [role="checkbox"], [class*="filter"] button, [class*="chip"]')
+            for candidate in candidates:
+                if label.search(await candidate.text_content() or ''):
+                    await candidate.click()
+                    await asyncio.sleep(2)
+                    logger.info(f"⭐ Yıldız filtresi uygulandı: {stars}")
+                    return True
+        except Exception as e:
+            logger.warning(f"⚠️ Yıldız filtresi uygulanırken hata ({stars}): {e}")
+        return False
+
+    async def apply_shard(self, shard):
+        """REVIEW_SHARDS'daki parçanın sıralama/filtresini uygula; varsayılan parça için işlem yok"""
+        options = REVIEW_SHARDS[shard]
+        if 'sort' in options and not await self.apply_review_sort(options['sort']):
+            return False
+        if 'stars' in options and not await self.apply_star_filter(options['stars']):
+            return False
+        return True
+
     async def expand_review_texts(self):
         """Yorumlardaki 'Diğer' butonlarına tıklayarak uzun yorumları tamamen genişletir (tüm butonlar bitene kadar)."""
         try:
@@ -294,7 +721,8 @@ class YandexMapsScraper:
                     break  # Artık açılacak buton kalmadı
                 await asyncio.sleep(0.3)
             if total_expanded > 0:
-                logger.info(f"✅ {total_expanded} adet 'Diğer' butonu tıklandı, tüm uzun yorumlar genişletildi")
+                self.log_sampler.log(logger, logging.INFO, 'expand',
+                                     f"✅ {total_expanded} adet 'Diğer' butonu tıklandı, tüm uzun yorumlar genişletildi")
             return total_expanded
         except Exception as e:
             logger.error(f"❌ Yorum genişletme işlemi sırasında hata: {e}")
@@ -315,59 +743,151 @@ class YandexMapsScraper:
                     'business_name': self.business_name,
                     'reviews': all_reviews,
                     'total_review_count': self.total_reviews,
+                    'total_review_count_confidence': self.total_reviews_confidence,
                     'scraped_review_count': len(all_reviews),
                     'scrape_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     'auto_save': True
                 }
                 
-                # JSON dosyası olarak kaydet
-                autosave_filename = f"data/autosave/yandex_reviews_{self.business_id}_autosave_{timestamp}.json"
-                with open(autosave_filename, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                
-                # CSV dosyası olarak kaydet
-                df = pd.DataFrame(all_reviews)
-                csv_filename = f"data/autosave/yandex_reviews_{self.business_id}_autosave_{timestamp}.csv"
-                df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
+                if 'jsonl' in self.output_formats:
+                    # NDJSON: sadece son kayıttan bu yana eklenen yorumlar dosyanın sonuna yazılır
+                    is_new_file = self.autosave_path is None
+                    if is_new_file:
+                        self.autosave_path = self.output_path(
+                            'autosave', f"{self.autosave_prefix()}_autosave_{timestamp}"
+                                        f"{jsonl_extension(self.jsonl_compression)}")
+                    # Her eklemede güncel sayıları taşıyan başlık da yazılır (okuyucuda son başlık geçerlidir)
+                    write_reviews_jsonl(self.autosave_path, records_to_dicts(all_reviews[self.last_auto_save_count:]),
+                                        header=data, append=not is_new_file)
+                else:
+                    # JSON dosyası olarak kaydet
+                    autosave_filename = self.output_path(
+                        'autosave', f"{self.autosave_prefix()}_autosave_{timestamp}.json")
+                    with open(autosave_filename, 'w', encoding='utf-8') as f:
+                        json.dump(dict(data, reviews=list(records_to_dicts(all_reviews))), f, ensure_ascii=False, indent=2)
+                    
+                    # CSV dosyası olarak kaydet
+                    df = records_to_frame(all_reviews)
+                    csv_filename = self.output_path(
+                        'autosave', f"{self.autosave_prefix()}_autosave_{timestamp}.csv")
+                    df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
                 
                 logger.info(f"💾 Otomatik kayıt: {len(all_reviews)} yorum kaydedildi (her {self.auto_save_interval} yorumda bir)")
                 
                 # Son kayıt sayısını güncelle
                 self.last_auto_save_count = len(all_reviews)
                 
+                # Aynı yeni yorum grubuyla işletme toplamlarını ve arama indeksini güncelle
+                self.update_aggregates(all_reviews)
+                self.update_search_index(all_reviews)
+                
             except Exception as e:
                 logger.error(f"❌ Otomatik kayıt sırasında hata: {e}")
 
+    def autosave_prefix(self):
+        """Autosave dosya adı öneki (eşzamanlı parçalar aynı dosyaya yazmasın diye parça adı eklenir)"""
+        prefix = f"yandex_reviews_{self.business_id}"
+        return f"{prefix}_{self.shard_name}" if self.shard_name else prefix
+
+    def record_scrape_observation(self, business_url, scraped_count, seconds):
+        """Sitedeki toplam yorum sayısını ve kazıma süresini kaydet (yenileme planlayıcısı kullanır)"""
+        if not self.aggregates_path or not self.business_id:
+            return
+        try:
+            if self.aggregate_store is None:
+                self.aggregate_store = AggregateStore(self.aggregates_path)
+            self.aggregate_store.record_scrape(self.business_id, self.total_reviews, scraped_count,
+                                               round(seconds, 1), business_url,
+                                               count_source=self.total_reviews_source)
+        except Exception as e:
+            logger.error(f"❌ Kazıma gözlemi kaydedilirken hata: {e}")
+
+    def update_aggregates(self, all_reviews):
+        """Son güncellemeden bu yana eklenen yorumları işletme toplamlarına ekle"""
+        if not self.aggregates_path or not self.business_id:
+            return
+        new_reviews = all_reviews[self.last_aggregated_count:]
+        if not new_reviews:
+            return
+        try:
+            if self.aggregate_store is None:
+                self.aggregate_store = AggregateStore(self.aggregates_path)
+            self.aggregate_store.update(self.business_id, new_reviews,
+                                        scrape_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            self.last_aggregated_count = len(all_reviews)
+        except Exception as e:
+            logger.error(f"❌ İşletme toplamları güncellenirken hata: {e}")
+
+    def update_search_index(self, all_reviews):
+        """Son güncellemeden bu yana eklenen yorumları arama indeksine ekle"""
+        if not self.search_index_path or not self.business_id:
+            return
+        new_reviews = all_reviews[self.last_indexed_count:]
+        if not new_reviews:
+            return
+        try:
+            if self.search_index is None:
+                self.search_index = ReviewSearchIndex(self.search_index_path)
+            self.search_index.add(self.business_id, new_reviews,
+                                  scrape_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            self.last_indexed_count = len(all_reviews)
+        except Exception as e:
+            logger.error(f"❌ Arama indeksi güncellenirken hata: {e}")
+
     async def scrape_reviews_with_continuous_scroll(self, max_reviews=None):
         """Sürekli kaydırma ile yorumları çek (daha fazla scroll ve daha agresif 'Diğer' açma ile)."""
+        all_reviews = []
+        async for review in self.stream_reviews_with_continuous_scroll(max_reviews):
+            all_reviews.append(review)
+            if len(all_reviews) % 25 == 0:
+                logger.info(f"✅ {len(all_reviews)} yorum işlendi")
+            await self.auto_save_reviews(all_reviews)
+
+        # Son autosave'den sonra kalan yorumları da toplamlara ve arama indeksine ekle
+        self.update_aggregates(all_reviews)
+        self.update_search_index(all_reviews)
+        logger.info(f"🎉 Toplam {len(all_reviews)} yorum başarıyla çekildi!")
+        return all_reviews
+
+    async def stream_reviews_with_continuous_scroll(self, max_reviews=None):
+        """Kaydırma döngüsü: her yeni tekil yorumu çıkarıldığı anda üretir (liste tutulmaz)."""
         if max_reviews is None:
             max_reviews = self.total_reviews
+        elif self.total_reviews:
+            # Sitede daha az yorum varsa kaydırma bütçesi gerçek sayıya göre belirlenir
+            max_reviews = min(max_reviews, self.total_reviews)
 
-        logger.info(f"🔍 Yorumlar çekiliyor (hedef: {max_reviews})...")
+        logger.info(f"🔍 Yorumlar çekiliyor (hedef: {max_reviews or 'bilinmiyor'})...")
 
-        all_reviews = []
+        yielded = 0
+        processed_elements = 0  # Atlanan (bilinen/geçersiz) kartlar da sayılır; sonraki tur buradan devam eder
         last_height = 0
         no_new_content_count = 0
 
         best_selector = await self.find_best_review_selector()
         if not best_selector:
             logger.error("❌ Hiçbir yorum elementi bulunamadı!")
-            return []
+            return
 
         logger.info(f"✅ En uygun selektör: {best_selector}")
 
         page_size_estimate = 15
-        scroll_count = max(5, min(max_reviews // page_size_estimate, 20))  # Daha fazla scroll
-        max_attempts = min(max_reviews // 5, 300)  # Daha fazla deneme
+        if max_reviews:
+            scroll_count = max(5, min(max_reviews // page_size_estimate, 20))  # Daha fazla scroll
+            max_attempts = max(3, min(max_reviews // 5, 300))  # Daha fazla deneme
+        else:
+            # Toplam bilinmiyor: en geniş bütçe; döngü yeni yorum gelmeyince kendiliğinden durur
+            max_reviews = float('inf')
+            scroll_count, max_attempts = 20, 300
 
         attempts = 0
-        while len(all_reviews) < max_reviews and attempts < max_attempts:
+        while yielded + self.skipped_known_count < max_reviews and attempts < max_attempts:
             # Scroll öncesi ve sonrası agresif şekilde tüm 'Diğer' butonlarını aç
             await self.expand_review_texts()
 
             for _ in range(scroll_count):
                 await self.try_multiple_scroll_methods()
-                await asyncio.sleep(1.5)
+                await asyncio.sleep(self.scroll_delay)
                 await self.expand_review_texts()
 
             # Scroll sonrası tekrar tüm 'Diğer' butonlarını aç
@@ -379,20 +899,25 @@ class YandexMapsScraper:
 
             logger.info(f"📜 Şu ana kadar bulunan yorum sayısı: {current_element_count}")
 
-            start_index = len(all_reviews)
+            start_index = processed_elements
             if start_index < current_element_count:
                 logger.info(f"✨ {current_element_count - start_index} yeni yorum bulundu")
                 for i in range(start_index, current_element_count):
                     try:
-                        review_data = await self.extract_review_data(elements[i])
+                        # Tek evaluate ile yerel kimlik; bilinen yorumlarda tam çıkarım yapılmaz
+                        native_ids, photos = await self.extract_card_meta(elements[i])
+                        if native_ids[0] and self.is_known_review(native_review_digest(native_ids[0])):
+                            continue
+                        review_data = await self.extract_review_data(elements[i], native_ids, photos)
+                        if review_data and self.is_known_review(review_data.review_digest):
+                            continue
                         if review_data and self.is_valid_review(review_data):
                             if not self.is_duplicate_review(review_data):
-                                all_reviews.append(review_data)
-                                if len(all_reviews) % 25 == 0:
-                                    logger.info(f"✅ {len(all_reviews)} yorum işlendi")
-                                await self.auto_save_reviews(all_reviews)
+                                yielded += 1
+                                yield review_data
                     except Exception as e:
-                        logger.error(f"❌ Yorum çıkarma hatası: {e}")
+                        self.log_sampler.log(logger, logging.ERROR, 'review_error', f"❌ Yorum çıkarma hatası: {e}")
+                processed_elements = current_element_count
                 no_new_content_count = 0
             else:
                 no_new_content_count += 1
@@ -410,14 +935,18 @@ class YandexMapsScraper:
 
             last_height = current_height
 
-            if len(all_reviews) >= max_reviews:
+            if yielded + self.skipped_known_count >= max_reviews:
                 logger.info(f"🎯 Hedef yorum sayısına ulaşıldı: {max_reviews}")
                 break
+            if self.stop_at_unique and len(self.dedupe_index) >= self.stop_at_unique:
+                # Paylaşılan dedupe: diğer parçalarla birlikte hedeflenen tekil yoruma ulaşıldı
+                logger.info(f"🧩 Parçaların birleşimi hedefe ulaştı: {self.stop_at_unique} tekil yorum")
+                break
 
             attempts += 1
 
-        logger.info(f"🎉 Toplam {len(all_reviews)} yorum başarıyla çekildi!")
-        return all_reviews
+        if self.skipped_known_count:
+            logger.info(f"⏭️ {self.skipped_known_count} bilinen yorum atlandı")
     
     async def find_best_review_selector(self):
         """Sayfadaki en iyi yorum selektörünü bul"""
@@ -546,64 +1075,55 @@ class YandexMapsScraper:
     def is_valid_review(self, review_data):
         """Yorumun geçerli olup olmadığını kontrol et"""
         # Minimum metin uzunluğu kontrolü
-        if 'text_original' not in review_data or not review_data['text_original']:
+        text = review_data.get('text_original')
+        if not text:
             return False
             
         # Çok kısa yorumları filtrele 
-        if len(review_data['text_original']) <= 1:
+        if len(text) <= 1:
             return False
             
         # Yazar adı kontrolü
-        if 'author_name' not in review_data or not review_data['author_name']:
+        if not review_data.get('author_name'):
             return False
             
         return True
     
-    def is_duplicate_review(self, review_data):
-        """Bir yorumu hem son 30 yorumda hem de tüm veri boyunca normalize edilmiş metin hash'iyle tekrar kontrol eder"""
-        # Review ID'yi kontrol et (kısa vadeli tekrarlar için)
-        if 'review_id' in review_data and review_data['review_id'] in self.recent_review_ids:
-            self.duplicate_count += 1
-            return True
-
-        # Gelişmiş tekrar kontrolü: normalize edilmiş metin hash'i
-        text = review_data.get('text_original', '')
-        norm_text = self.normalize_review_text(text)
-        content_hash = hashlib.md5(norm_text.encode()).hexdigest()
-
-        # Tüm veri boyunca tekrar kontrolü
-        if content_hash in self.global_content_hashes:
-            self.duplicate_count += 1
+    def is_known_review(self, digest):
+        """Yorum önceki çalıştırmalardan biliniyorsa (artımlı kazıma) True"""
+        if self.dedupe_index.is_known(digest):
+            self.skipped_known_count += 1
             return True
-
-        # Son 30 için de tutmaya devam et
-        if 'review_id' in review_data:
-            self.recent_review_ids.append(review_data['review_id'])
-        self.recent_content_hashes.append(content_hash)
-        self.global_content_hashes.add(content_hash)
-
         return False
 
+    def is_duplicate_review(self, review_data):
+        """Bir yorumu hem son 30 yorumda hem de tüm veri boyunca normalize edilmiş metin özetiyle tekrar kontrol eder"""
+        if not isinstance(review_data, ReviewRecord):
+            review_data = ReviewRecord.from_dict(review_data)
+        is_duplicate = self.dedupe_index.is_duplicate(review_data)
+        self.duplicate_count = self.dedupe_index.duplicate_count
+        return is_duplicate
+
     def normalize_review_text(self, text):
         """Yorum metnini normalize ederek tekrar kontrolünü iyileştirir (küçük harf, noktalama, gereksiz boşluk, baştaki/sondaki tarih/seviye/isim temizliği)."""
-        import re
-        if not text:
-            return ''
-        # Küçük harfe çevir
-        text = text.lower()
-        # Başta/sonda tarih, seviye, isim gibi tekrar eden yapıları temizle
-        text = re.sub(r'^[^a-zA-Z0-9а-яА-Яçğıöşü]+', '', text)
-        text = re.sub(r'\d+\.\s*şehir uzmanı', '', text)
-        text = re.sub(r'\d+\.\s*level local guide', '', text)
-        text = re.sub(r'\d+\s*(temmuz|nisan|mart|ocak|şubat|mayıs|haziran|temmuz|ağustos|eylül|ekim|kasım|aralık|january|february|march|april|may|june|july|august|september|october|november|december)\s*', '', text)
-        text = re.sub(r'\d{1,2}\.\d{1,2}\.\d{4}', '', text)
-        text = re.sub(r'\d{1,2}/\d{1,2}/\d{4}', '', text)
-        # Noktalama ve fazla boşlukları kaldır
-        text = re.sub(r'[\W_]+', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        return normalize_review_text(text)
 
-    async def extract_review_data(self, review_element):
+    async def extract_card_meta(self, review_element):
+        """Tek evaluate ile ((yorum kimliği, yazar kimliği), fotoğraflar); okunamazsa ((None, None), None)"""
+        try:
+            meta = await self.page.evaluate(REVIEW_CARD_META_JS, review_element)
+            return (meta['ids']['reviewId'], meta['ids']['authorId']), meta['photos']
+        except Exception:
+            return (None, None), None
+
+    async def extract_photos(self, review_element):
+        """Yorum fotoğrafları [{'url', 'width', 'height'}, ...]"""
+        try:
+            return await self.page.evaluate(REVIEW_PHOTOS_JS, review_element)
+        except Exception:
+            return []
+
+    async def extract_review_data(self, review_element, native_ids=(None, None), photos=None):
         """Bir yorum elementinden veri çıkar - GELİŞTİRİLMİŞ VERSİYON"""
         try:
             # Element HTML ve metnini al (debug için)
@@ -623,26 +1143,25 @@ class YandexMapsScraper:
             date = await self.extract_date(review_element)
             
             # ---- FOTOĞRAFLAR ----
-            has_photos = await self.has_photos(review_element)
+            # Kart meta verisiyle aynı evaluate'te okunduysa tekrar sorgulanmaz
+            if photos is None:
+                photos = await self.extract_photos(review_element)
+            has_photos = bool(photos)
             
             # ---- İŞLETME YANITI ----
             business_reply = await self.extract_business_reply(review_element)
             
-            # ID oluştur
-            review_id = hashlib.md5(f"{author_name}_{text}_{date}".encode()).hexdigest()
-            
-            return {
-                'review_id': review_id,
-                'author_name': author_name,
-                'rating': rating,
-                'text_original': text,
-                'date': date,
-                'has_photos': has_photos,
-                'business_reply': business_reply
-            }
+            # ---- KİMLİK ----
+            # DOM'da yoksa ağdan gelen yorumlarla metin üzerinden eşleştir; o da yoksa içerik özeti kullanılır
+            native_review_id, author_id = native_ids
+            if not native_review_id:
+                native_review_id, network_author_id = self.native_ids.lookup(text)
+                author_id = author_id or network_author_id
+            return ReviewRecord.create(author_name, rating, text, date, has_photos, business_reply,
+                                       native_review_id=native_review_id, author_id=author_id, photos=photos)
             
         except Exception as e:
-            logger.error(f"❌ Yorum veri çıkarma hatası: {e}")
+            self.log_sampler.log(logger, logging.ERROR, 'extract_error', f"❌ Yorum veri çıkarma hatası: {e}")
             return None
     
     async def extract_author_name(self, review_element, element_text=None):
@@ -796,14 +1315,7 @@ class YandexMapsScraper:
                 if author_name:
                     full_text = full_text.replace(author_name, "")
                 
-                common_texts = [
-                    "Varsayılan", "Default", "Abone ol", "Subscribe", "Follow",
-                    "seviye şehir uzmanı", "level local guide", "yerel rehber",
-                    "Yanıtla", "Reply", "Beğen", "Like", "Share", "Paylaş"
-                ]
-                
-                for common in common_texts:
-                    full_text = full_text.replace(common, "")
+                full_text = SCRAPER_NOISE_RE.sub("", full_text)
                 
                 # Fazla boşlukları temizle
                 text = re.sub(r'\s+', ' ', full_text).strip()
@@ -875,33 +1387,8 @@ class YandexMapsScraper:
         return date
     
     async def has_photos(self, review_element):
-        """Yorum elementinde fotoğraf olup olmadığını kontrol et"""
-        # Fotoğraf göstergeleri
-        photo_selectors = [
-            "img[src*='review']",
-            "img[class*='photo']", 
-            "[class*='gallery']",
-            "[class*='photo']",
-            "[class*='image']",
-            "[class*='media']"
-        ]
-        
-        for selector in photo_selectors:
-            try:
-                photos = await review_element.query_selector_all(selector)
-                if len(photos) > 0:
-                    return True
-            except:
-                pass
-        
-        # HTML içinde fotoğraf göstergeleri ara
-        element_html = await self.page.evaluate('(element) => element.outerHTML', review_element)
-        
-        # İçerikte fotoğraf referansı var mı?
-        if re.search(r'(photo|image|picture|gallery|фото|resim)', element_html, re.IGNORECASE):
-            return True
-            
-        return False
+        """Yorum elementinde fotoğraf olup olmadığını kontrol et (tek evaluate)"""
+        return bool(await self.extract_photos(review_element))
     
     async def extract_business_reply(self, review_element):
         """İşletme yanıtını çıkar"""
@@ -932,31 +1419,130 @@ class YandexMapsScraper:
         
         return None
     
-    async def scrape_all_reviews(self, business_url, max_reviews=None):
-        """Tüm yorumları çek"""
+    async def prepare_business(self, business_url, shard=None, incremental=None):
+        """İşletme sayfasını aç, bilinen yorum kimliklerini yükle ve (varsa) parçayı uygula.
+        incremental: bu çalıştırmada bilinen yorumlar atlanır mı (None: config.skip_known_reviews).
+        Dönüş: (business_id, business_name, shard_applied); işletme bulunamazsa business_id None."""
+        business_id, business_name = await self.navigate_to_place(business_url)
+        
+        # İş yeri bilgilerini kaydet (otomatik kaydetme için)
+        self.business_id = business_id
+        self.business_name = business_name
+        
+        if not business_id:
+            logger.error("❌ İşletme bilgileri alınamadı!")
+            return None, None, None
+            
+        # Bilinen kimlikler çalıştırmaya özeldir: önceki işletmenin/çalıştırmanın kimlikleri taşınmaz
+        if incremental is None:
+            incremental = self.skip_known_reviews
+        if not (incremental and self.aggregates_path):
+            self.dedupe_index.reset_known()
+        else:
+            if self.aggregate_store is None:
+                self.aggregate_store = AggregateStore(self.aggregates_path)
+            self.dedupe_index.reset_known(self.aggregate_store.known_review_ids(business_id))
+            logger.info(f"📚 {len(self.dedupe_index.known_digests)} bilinen yorum kimliği yüklendi")
+        
+        shard_applied = None
+        if shard:
+            set_log_context(phase=f'shard:{shard}')
+            shard_applied = await self.apply_shard(shard)
+            if not shard_applied:
+                logger.warning(f"⚠️ Parça uygulanamadı, atlanıyor: {shard}")
+        return business_id, business_name, shard_applied
+
+    async def iter_reviews(self, business_url, max_reviews=None, shard=None, browser=None, incremental=None):
+        """Yorumları çıkarıldıkları anda tek tek üret: `async for review in scraper.iter_reviews(url)`.
+
+        Liste tutulmaz, autosave ve toplam güncellemesi yapılmaz; saklama tüketicinin işidir.
+        Erken durdurma (bilinen yoruma gelince, belli yaştan eski yorumda...) tüketicide `break` ile
+        yapılır; tarayıcının hemen kapanması için üreticiyi `aclosing` ile kullanın.
+        İşletme bulunamazsa RuntimeError fırlatır.
+        """
+        self.skipped_known_count = 0
+        started = time.time()
+        count = 0
+        
+        await self.start_browser(browser)
+        log_tokens = set_log_context(business_id=self.extract_business_id(business_url), phase='navigate')
+        try:
+            business_id, _, shard_applied = await self.prepare_business(business_url, shard, incremental)
+            if not business_id:
+                raise RuntimeError("İşletme bilgileri alınamadı")
+            if shard_applied is False:
+                return
+            
+            set_log_context(phase='scroll')
+            async with aclosing(self.stream_reviews_with_continuous_scroll(max_reviews)) as reviews:
+                async for review in reviews:
+                    count += 1
+                    yield review
+            if not shard:
+                self.record_scrape_observation(business_url, count, time.time() - started)
+        
+        finally:
+            await self.close()
+            try:
+                reset_log_context(log_tokens)
+            except ValueError:
+                # Üretici başka bir görevde (ör. çöp toplayıcıda) kapatıldı; bağlam o görevle birlikte gider
+                pass
+
+    async def iter_review_batches(self, business_url, batch_size=100, max_delay=None, **kwargs):
+        """iter_reviews'u en fazla batch_size yorumluk listeler halinde üret.
+        max_delay (sn) verilirse bir grubun ilk yorumu bu kadar bekletilince grup erken gönderilir."""
+        batch = []
+        first_at = None
+        async with aclosing(self.iter_reviews(business_url, **kwargs)) as reviews:
+            async for review in reviews:
+                if not batch:
+                    first_at = time.monotonic()
+                batch.append(review)
+                if len(batch) >= batch_size or (max_delay is not None and time.monotonic() - first_at >= max_delay):
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    async def scrape_all_reviews(self, business_url, max_reviews=None, shard=None, browser=None, incremental=None):
+        """Tüm yorumları çek. shard verilirse (REVIEW_SHARDS) önce o sıralama/filtre uygulanır;
+        browser verilirse paylaşılan tarayıcıda ayrı bir context açılır (scrape_sharded).
+        incremental=True ise toplamlarda bilinen yorumlar atlanır (None: config.skip_known_reviews)."""
+        
+        # Bu çalıştırmanın autosave durumunu sıfırla
+        self.autosave_path = None
+        self.last_auto_save_count = 0
+        self.last_aggregated_count = 0
+        self.last_indexed_count = 0
+        self.skipped_known_count = 0
+        started = time.time()
         
         # Browser başlat
-        await self.start_browser()
+        await self.start_browser(browser)
+        # Bu görevdeki tüm loglar işletme ve aşama bilgisini taşır (finally'de eski değerlere dönülür)
+        log_tokens = set_log_context(business_id=self.extract_business_id(business_url), phase='navigate')
+        profiler = None
         
         try:
             # İşletme sayfasına git ve bilgileri al
-            business_id, business_name = await self.navigate_to_place(business_url)
-            
-            # İş yeri bilgilerini kaydet (otomatik kaydetme için)
-            self.business_id = business_id
-            self.business_name = business_name
-            
+            business_id, business_name, shard_applied = await self.prepare_business(business_url, shard, incremental)
             if not business_id:
-                logger.error("❌ İşletme bilgileri alınamadı!")
                 return {
                     'business_id': None,
                     'business_name': None,
                     'reviews': [],
                     'scrape_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 }
-                
+            
             # Yorumları çek
-            reviews = await self.scrape_reviews_with_continuous_scroll(max_reviews)
+            set_log_context(phase='scroll')
+            profiler = await self.start_profiling(shard)
+            reviews = await self.scrape_reviews_with_continuous_scroll(max_reviews) if shard_applied is not False else []
+            profile = await profiler.stop() if profiler else None
+            if not shard:
+                # Parçalı kazımada gözlem birleştirilmiş sonuç için bir kez kaydedilir
+                self.record_scrape_observation(business_url, len(reviews), time.time() - started)
             
             # Sonuçları döndür
             return {
@@ -964,9 +1550,15 @@ class YandexMapsScraper:
                 'business_name': business_name,
                 'reviews': reviews,
                 'total_review_count': self.total_reviews,
+                'total_review_count_source': self.total_reviews_source,
+                'total_review_count_confidence': self.total_reviews_confidence,
                 'scraped_review_count': len(reviews),
+                'skipped_known_count': self.skipped_known_count,
                 'scrape_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'scrape_url': business_url
+                'scrape_url': business_url,
+                'shard': shard,
+                'shard_applied': shard_applied,
+                'profile': profile
             }
             
         except Exception as e:
@@ -980,93 +1572,358 @@ class YandexMapsScraper:
             }
         
         finally:
+            if profiler:
+                # Hata durumunda da profil ve iz (context kapanmadan önce) diske yazılır
+                await profiler.stop()
             await self.close()
+            reset_log_context(log_tokens)
+    
+    async def start_profiling(self, shard=None):
+        """profile_dir verilmişse kaydırma/çıkarım aşaması için profil yakalamayı başlat"""
+        if not self.profile_dir:
+            return None
+        profiler = JobProfiler(self.profile_dir, profile_name(self.business_id, shard))
+        await profiler.start(self.context)
+        return profiler
     
     async def save_to_files(self, data, filename_base):
         """Verileri dosyalara kaydet"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        raw_filename = None
+        csv_filename = None
         
-        # JSON kaydet
-        json_filename = f"data/raw/{filename_base}_{timestamp}.json"
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Ham veriyi kaydet: NDJSON (başlık + satır başına bir yorum) veya eski tek JSON belge
+        if 'jsonl' in self.output_formats:
+            raw_filename = self.output_path(
+                'raw', f"{filename_base}_{timestamp}{jsonl_extension(self.jsonl_compression)}")
+            write_reviews_jsonl(raw_filename, records_to_dicts(data.get('reviews') or []), header=data)
+        elif 'json' in self.output_formats:
+            raw_filename = self.output_path('raw', f"{filename_base}_{timestamp}.json")
+            with open(raw_filename, 'w', encoding='utf-8') as f:
+                json.dump(dict(data, reviews=list(records_to_dicts(data.get('reviews') or []))),
+                          f, ensure_ascii=False, indent=2)
         
-        # CSV kaydet
         if data and 'reviews' in data and data['reviews']:
-            df = pd.DataFrame(data['reviews'])
-            csv_filename = f"data/processed/{filename_base}_{timestamp}.csv"
-            df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-            
+            # Kompakt kayıtlar sadece burada, sütun sütun DataFrame'e çevrilir
+            df = records_to_frame(data['reviews'])
             logger.info(f"💾 Veriler kaydedildi:")
-            logger.info(f"   JSON: {json_filename}")
-            logger.info(f"   CSV:  {csv_filename}")
+            if raw_filename:
+                logger.info(f"   Ham: {raw_filename}")
+            
+            # CSV kaydet
+            if 'csv' in self.output_formats:
+                csv_filename = self.output_path('processed', f"{filename_base}_{timestamp}.csv")
+                df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
+                logger.info(f"   CSV:  {csv_filename}")
             
-            return json_filename, csv_filename
+            # Parquet kaydet
+            if 'parquet' in self.output_formats:
+                parquet_filename = write_reviews_parquet(
+                    df, self.output_path('processed', f"{filename_base}_{timestamp}.parquet"))
+                logger.info(f"   Parquet: {parquet_filename}")
+            
+            if self.parquet_dataset_dir:
+                write_reviews_dataset(df, self.parquet_dataset_dir,
+                                      business_id=data.get('business_id'), scrape_date=data.get('scrape_date'))
+                logger.info(f"   Parquet veri seti: {self.parquet_dataset_dir}")
+            
+            return raw_filename, csv_filename
         else:
             logger.warning("⚠️ Kaydedilecek yorum verisi bulunamadı")
             return None, None
     
     async def close(self):
         """Browser'ı kapat"""
+        if self.context:
+            # HAR kaydı context kapanırken diske yazılır
+            await self.context.close()
+            self.context = None
         if self.browser:
-            await self.browser.close()
+            # Paylaşılan tarayıcıyı sahibi kapatır
+            if self.owns_browser:
+                await self.browser.close()
+            self.browser = None
         if hasattr(self, 'playwright'):
             await self.playwright.stop()
+            del self.playwright
 
-# Ana fonksiyon
-async def main():
-    """Ana scraping fonksiyonu"""
-    
-    # Kullanıcı tercihlerini sor
+async def scrape_multiple_businesses(targets, max_reviews=None, concurrency=2):
+    """Birden fazla işletmeyi sınırlı eşzamanlılıkla kazı.
+
+    targets: URL listesi veya search_discovery sonuçları ({'url', 'business_id', 'review_count', ...}).
+    İşler beklenen maliyete göre (en çok yorumlu önce) başlatılır; her işletme kendi tarayıcısında çalışır.
+    """
+    from search_discovery import order_by_cost
+
+    targets = [{'url': t} if isinstance(t, str) else t for t in targets]
+    ordered = order_by_cost(targets, max_reviews)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    logger.info(f"🚀 {len(ordered)} işletme kuyruğa alındı (eşzamanlılık: {concurrency})")
+
+    async def run(target):
+        async with semaphore:
+            scraper = YandexMapsScraper()
+            started = time.time()
+            data = await scraper.scrape_all_reviews(target['url'], max_reviews=max_reviews)
+            business_id = data.get('business_id') or target.get('business_id')
+            raw_filename, csv_filename = await scraper.save_to_files(data, f"yandex_reviews_{business_id}")
+            summary = {
+                'business_id': business_id,
+                'url': target['url'],
+                'expected_reviews': target.get('review_count'),
+                'scraped_reviews': len(data.get('reviews') or []),
+                'raw_file': raw_filename,
+                'csv_file': csv_filename,
+                'seconds': round(time.time() - started, 1),
+                'error': data.get('error')
+            }
+            logger.info(f"🏁 {business_id}: {summary['scraped_reviews']} yorum ({summary['seconds']} sn)")
+            return summary
+
+    # Semafor beklemesi FIFO olduğundan görevler sıralama düzeninde başlar
+    results = await asyncio.gather(*(run(t) for t in ordered), return_exceptions=True)
+    summaries = []
+    for target, result in zip(ordered, results):
+        if isinstance(result, Exception):
+            logger.error(f"💥 {target['url']} kazınırken hata: {result}")
+            result = {'business_id': target.get('business_id'), 'url': target['url'], 'error': str(result)}
+        summaries.append(result)
+    return summaries
+
+async def scrape_sharded(business_url, shards=DEFAULT_SHARDS, max_reviews=None, config=None, concurrency=None):
+    """Tek işletmeyi parçalara bölerek (sıralama/yıldız filtresi) eşzamanlı kazı.
+
+    Tek tarayıcıda parça başına ayrı context açılır; parçalar ortak bir ReviewDedupeIndex paylaşır,
+    böylece her yorum sadece ilk bulan parçanın listesine girer. Uygulanamayan parçalar atlanır.
+    Dönüş: scrape_all_reviews ile aynı yapı + 'coverage' (parça başına katkı ve toplam kapsama).
+    """
+    from playwright.async_api import async_playwright
+
+    config = config or ScraperConfig()
+    unknown = [name for name in shards if name not in REVIEW_SHARDS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen parça: {', '.join(unknown)} (geçerli: {', '.join(REVIEW_SHARDS)})")
+    dedupe_index = ReviewDedupeIndex(recent_size=30)
+    semaphore = asyncio.Semaphore(max(1, concurrency or len(shards)))
+    started = time.time()
+    logger.info(f"🧩 {len(shards)} parça ile kazınıyor: {', '.join(shards)}")
+
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(headless=config.headless, args=BROWSER_ARGS)
+
+    async def run(name):
+        async with semaphore:
+            scraper = YandexMapsScraper(config)
+            scraper.dedupe_index = dedupe_index
+            scraper.shard_name = name
+            scraper.stop_at_unique = max_reviews
+            if config.record_har_path:
+                # Her context kendi HAR dosyasına yazar
+                scraper.record_har_path = re.sub(r'(\.har(\.zip)?)?$', rf'_{name}\1', config.record_har_path, count=1)
+            shard_started = time.time()
+            data = await scraper.scrape_all_reviews(business_url, max_reviews, shard=name, browser=browser)
+            data['seconds'] = round(time.time() - shard_started, 1)
+            return data
+
+    try:
+        results = await asyncio.gather(*(run(name) for name in shards), return_exceptions=True)
+    finally:
+        await browser.close()
+        await playwright.stop()
+
+    reviews = []
+    shard_reports = []
+    business_id = business_name = None
+    total_review_count = 0
+    count_source, confidence = None, 'none'
+    for name, result in zip(shards, results):
+        if isinstance(result, Exception):
+            logger.error(f"💥 Parça {name} kazınırken hata: {result}")
+            result = {'reviews': [], 'error': str(result)}
+        business_id = business_id or result.get('business_id')
+        business_name = business_name or result.get('business_name')
+        if (result.get('total_review_count') or 0) > total_review_count:
+            total_review_count = result['total_review_count']
+            count_source = result.get('total_review_count_source')
+            confidence = result.get('total_review_count_confidence', confidence)
+        reviews.extend(result['reviews'])
+        shard_reports.append({
+            'shard': name,
+            'applied': result.get('shard_applied'),
+            'new_reviews': len(result['reviews']),
+            'seconds': result.get('seconds'),
+            'error': result.get('error'),
+            'trace_file': (result.get('profile') or {}).get('trace_file')
+        })
+
+    coverage = {
+        'total_review_count': total_review_count or None,
+        'unique_reviews': len(reviews),
+        'coverage': round(len(reviews) / total_review_count, 4) if total_review_count else None,
+        'duplicates_across_shards': dedupe_index.duplicate_count,
+        'shards': shard_reports
+    }
+    for report in shard_reports:
+        logger.info(f"🧩 {report['shard']}: {report['new_reviews']} yeni tekil yorum "
+                    f"({'uygulandı' if report['applied'] else 'atlandı'}, {report['seconds']} sn)")
+    logger.info(f"📊 Parçalı kazıma: {len(reviews)} tekil yorum / sitede {total_review_count or 'belirsiz'}"
+                + (f" (kapsama %{coverage['coverage'] * 100:.1f})" if coverage['coverage'] is not None else ""))
+
+    # Kazıma gözlemi birleştirilmiş sonuç için bir kez kaydedilir
+    recorder = YandexMapsScraper(config)
+    recorder.business_id = business_id
+    recorder.total_reviews = total_review_count
+    recorder.total_reviews_source = count_source
+    recorder.record_scrape_observation(business_url, len(reviews), time.time() - started)
+    if recorder.aggregate_store:
+        recorder.aggregate_store.close()
+
+    return {
+        'business_id': business_id,
+        'business_name': business_name,
+        'reviews': reviews,
+        'total_review_count': total_review_count or None,
+        'total_review_count_confidence': confidence,
+        'scraped_review_count': len(reviews),
+        'scrape_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'scrape_url': business_url,
+        'coverage': coverage,
+        # Süreçte tek Python profili alınabildiğinden özet, profili olan ilk parçadan gelir
+        'profile': next((r['profile'] for r in results if isinstance(r, dict) and (r.get('profile') or {}).get('hotspots')),
+                        None)
+    }
+
+def parse_max_reviews(value):
+    """'all'/'tüm'/'hepsi' → None (tüm yorumlar), aksi halde pozitif tam sayı"""
+    if str(value).lower() in ("all", "tüm", "hepsi"):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"geçersiz yorum sayısı: {value}")
+
+
+def prompt_args(args):
+    """URL verilmeden terminalden çalıştırıldığında eski soru-cevap akışıyla seçenekleri doldur"""
     print("\n🚀 Yandex Maps Geliştirilmiş Yorum Scraper")
     print("=" * 50)
     print("Bu script, Yandex Maps yorumlarını yüksek kalitede çeker")
     
-    # URL bilgisi
-    default_url = "https://yandex.com.tr/maps/org/istanbul_havalimani/85454152633/?ll=28.752054%2C41.279299&utm_campaign=desktop&utm_medium=search&utm_source=maps&z=13.65"
     print(f"\n📍 Hangi mekanın yorumlarını çekmek istiyorsunuz?")
-    print(f"   Varsayılan: {default_url}")
-    business_url = input("URL: ").strip() or default_url
+    print(f"   Varsayılan: {DEFAULT_URL}")
+    args.url = input("URL: ").strip() or DEFAULT_URL
     
-    # Maksimum yorum sayısı
     print("\n📊 Maksimum kaç yorum çekilsin?")
     print("   (Varsayılan: 2000, 'all' tüm yorumlar için)")
-    max_reviews_input = input("Maksimum yorum sayısı: ").strip() or "2000"
-    
-    if max_reviews_input.lower() in ["all", "tüm", "hepsi"]:
-        max_reviews = None  # Tüm yorumlar
-    else:
-        try:
-            max_reviews = int(max_reviews_input)
-        except ValueError:
-            print("⚠️ Geçersiz sayı, varsayılan değer (2000) kullanılıyor.")
-            max_reviews = 2000
+    try:
+        args.max_reviews = parse_max_reviews(input("Maksimum yorum sayısı: ").strip() or "2000")
+    except argparse.ArgumentTypeError:
+        print("⚠️ Geçersiz sayı, varsayılan değer (2000) kullanılıyor.")
+        args.max_reviews = 2000
     
-    # Headless mod ayarı
     print("\n🖥️ Tarayıcı görünürlüğü:")
     print("   [1] Görünmez mod (daha hızlı, arka planda çalışır)")
     print("   [2] Görünür mod (daha yavaş, tarayıcıyı görebilirsiniz)")
-    headless_choice = input("Seçiminiz (1/2): ").strip() or "1"
+    args.visible = (input("Seçiminiz (1/2): ").strip() or "1") == "2"
     
-    # Scraper'ı başlat
-    scraper = YandexMapsScraper()
+    print("\n📼 Oturum modu:")
+    print("   [1] Canlı (varsayılan)")
+    print("   [2] Canlı + HAR kaydı (data/har/ altına)")
+    print("   [3] HAR arşivinden çevrimdışı tekrar oynat")
+    session_choice = input("Seçiminiz (1/2/3): ").strip() or "1"
+    if session_choice == "2":
+        args.record_har = 'auto'
+    elif session_choice == "3":
+        args.replay_har = input("HAR dosyası: ").strip()
+    return args
+
+
+def config_from_args(args):
+    """Komut satırı seçeneklerinden ScraperConfig oluştur"""
+    record_har = args.record_har
+    if record_har == 'auto':
+        record_har = os.path.join(args.output_dir, 'har',
+                                  f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.har.zip")
+    return ScraperConfig(
+        headless=not args.visible,
+        interactive=args.interactive,
+        output_dir=args.output_dir,
+        output_formats=[f.strip() for f in args.formats.split(',') if f.strip()],
+        jsonl_compression=None if args.compression == 'none' else args.compression,
+        parquet_dataset_dir=args.parquet_dataset,
+        aggregates_path=None if args.aggregates == 'none' else args.aggregates,
+        search_index_path=args.search_index,
+        profile_dir=args.profile,
+        record_har_path=record_har,
+        replay_har_path=args.replay_har,
+        skip_known_reviews=args.incremental,
+        block_images=not args.load_images
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Yandex Haritalar işletme yorumlarını çek")
+    parser.add_argument('url', nargs='?', default=None,
+                        help="İşletme URL'si (verilmezse ve terminalden çalışıyorsa sorulur)")
+    parser.add_argument('--max-reviews', type=parse_max_reviews, default=2000,
+                        help="En fazla yorum sayısı veya tümü için 'all' (varsayılan: 2000)")
+    parser.add_argument('--visible', action='store_true', help="Tarayıcıyı görünür modda aç")
+    parser.add_argument('--output-dir', default='data', help="Çıktı kök klasörü (raw/, processed/, autosave/)")
+    parser.add_argument('--formats', default='jsonl,csv', help="Virgülle ayrılmış: jsonl, json, csv, parquet")
+    parser.add_argument('--compression', choices=['gz', 'zst', 'none'], default='gz', help="NDJSON sıkıştırması")
+    parser.add_argument('--parquet-dataset', default=None, help="Bölümlenmiş Parquet veri seti klasörü")
+    parser.add_argument('--aggregates', default='auto',
+                        help="İşletme toplamları veritabanı (varsayılan: <output-dir>/aggregates.sqlite, "
+                             "'none' ile kapatılır)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Toplamlarda bulunan (daha önce çekilmiş) yorumları atla")
+    parser.add_argument('--search-index', nargs='?', const='auto', default=None,
+                        help="Yorumları tam metin arama indeksine ekle (varsayılan yol: <output-dir>/search.sqlite)")
+    parser.add_argument('--record-har', nargs='?', const='auto', default=None,
+                        help="Oturumu HAR olarak kaydet (yol verilmezse <output-dir>/har/session_*.har.zip)")
+    parser.add_argument('--replay-har', default=None, help="HAR arşivinden çevrimdışı tekrar oynat")
+    parser.add_argument('--load-images', action='store_true', help="Görselleri tarayıcıda yükle (varsayılan: engelli)")
+    parser.add_argument('--shards', default=None,
+                        help=f"İşletmeyi parçalara bölerek eşzamanlı kazı; virgülle ayrılmış ({', '.join(REVIEW_SHARDS)}) "
+                             f"veya 'default' ({','.join(DEFAULT_SHARDS)})")
+    parser.add_argument('--non-interactive', dest='interactive', action='store_false', default=None,
+                        help="Hiçbir zaman input() ile bekleme (CAPTCHA'da hata ver)")
+    parser.add_argument('--profile', nargs='?', const='auto', default=None,
+                        help="cProfile + Playwright izi yakala (varsayılan klasör: <output-dir>/profiles)")
+    parser.add_argument('--log-file', default='scraper.log', help="Log dosyası ('' ile kapatılır)")
+    parser.add_argument('--log-json', action='store_true', help="Log dosyasına JSON satırları yaz")
+    args = parser.parse_args(argv)
+    if args.interactive is None:
+        # Terminalden çalıştırılıyorsa CAPTCHA çözümü için beklenebilir
+        args.interactive = sys.stdin.isatty()
+    if not args.url:
+        if not args.interactive:
+            parser.error("etkileşimsiz modda işletme URL'si gerekli")
+        prompt_args(args)
+    return args
+
+
+async def run_scrape(args):
+    """Komut satırı seçenekleriyle tek bir işletmeyi kazı, dosyalara kaydet ve özet yazdır"""
+    scraper = YandexMapsScraper(config_from_args(args))
     
     try:
         # Başlangıç zamanını kaydet
         start_time = time.time()
         
-        # Tarayıcı görünürlük ayarını güncelle
-        if headless_choice == "2":
+        if not scraper.headless:
             print("✅ Görünür mod seçildi, tarayıcı penceresi açılacak.")
-            # start_browser fonksiyonu çağrılmadan önce browser nesnesini güncelle
-            scraper.browser = None  # İlk browser nesnesini temizle
             
         # Yorumları çek
-        logger.info(f"🚀 Yorum toplama işlemi başlatılıyor: {business_url}")
-        data = await scraper.scrape_all_reviews(
-            business_url=business_url,
-            max_reviews=max_reviews
-        )
+        logger.info(f"🚀 Yorum toplama işlemi başlatılıyor: {args.url}")
+        if args.shards:
+            shards = DEFAULT_SHARDS if args.shards == 'default' else args.shards.split(',')
+            data = await scrape_sharded(args.url, shards, max_reviews=args.max_reviews, config=scraper.config)
+        else:
+            data = await scraper.scrape_all_reviews(
+                business_url=args.url,
+                max_reviews=args.max_reviews
+            )
         
         # Bitiş zamanını kaydet ve süreyi hesapla
         end_time = time.time()
@@ -1082,21 +1939,27 @@ async def main():
             logger.info(f"\n📊 ÖZET:")
             logger.info(f"   İşletme: {data['business_name']}")
             logger.info(f"   ID: {data['business_id']}")
-            logger.info(f"   Sitede gösterilen toplam yorum sayısı: {data.get('total_review_count', 'Belirsiz')}")
+            logger.info(f"   Sitede gösterilen toplam yorum sayısı: {data.get('total_review_count') or 'Belirsiz'}")
             logger.info(f"   Çekilen yorum sayısı: {len(reviews)}")
             logger.info(f"   Tekrar kontrolünden geçirilmiş veri")
+            if data.get('coverage'):
+                logger.info(f"   Parçalar: " + ", ".join(f"{r['shard']}={r['new_reviews']}"
+                                                        for r in data['coverage']['shards']))
             logger.info(f"   Geçen süre: {elapsed_time:.2f} saniye")
             
-            valid_ratings = [r.get('rating') for r in reviews if r.get('rating') is not None]
-            if valid_ratings:
-                avg_rating = sum(valid_ratings) / len(valid_ratings)
-                logger.info(f"   Ortalama puan: {avg_rating:.1f}⭐")
+            # Ortalama puan ve diğer göstergeler artımlı toplamlardan okunur
+            aggregates = scraper.aggregate_store.get(data['business_id']) if scraper.aggregate_store else None
+            if aggregates and aggregates['average_rating'] is not None:
+                logger.info(f"   Ortalama puan: {aggregates['average_rating']:.1f}⭐ "
+                            f"({aggregates['review_count']} yorum üzerinden)")
+                logger.info(f"   Fotoğraflı yorum oranı: %{aggregates['photo_share'] * 100:.1f}")
+                logger.info(f"   İşletme yanıt oranı: %{aggregates['reply_rate'] * 100:.1f}")
             
             print("\n" + "=" * 40)
             print(f"✅ İşlem tamamlandı!")
-            print(f"📊 Toplam {len(reviews)} yorum çekildi (sitede gösterilen: {data.get('total_review_count', 'Belirsiz')})")
+            print(f"📊 Toplam {len(reviews)} yorum çekildi (sitede gösterilen: {data.get('total_review_count') or 'Belirsiz'})")
             print(f"⏱️ Geçen süre: {elapsed_time:.2f} saniye")
-            print(f"💾 Veriler data/ klasörüne kaydedildi")
+            print(f"💾 Veriler {scraper.output_dir}/ klasörüne kaydedildi")
             print("=" * 40)
         else:
             logger.warning("⚠️ Hiç yorum bulunamadı!")
@@ -1111,7 +1974,12 @@ async def main():
         await scraper.close()
         print("\n👋 Yandex Maps Scraper kapatılıyor...")
 
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(args.log_file or None, json_format=args.log_json)
+    asyncio.run(run_scrape(args))
+
+
 if __name__ == "__main__":
-    # Scripti çalıştır
-    print("🚀 Yandex Maps Geliştirilmiş Yorum Scraper başlatılıyor...")
-    asyncio.run(main())
\ No newline at end of file
+    main()
\ No newline at end of file
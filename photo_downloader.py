@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yorum Fotoğrafı İndirici (opsiyonel)
+Path: photo_downloader.py
+
+Kazıma sırasında fotoğraflar tarayıcıda engellenir, sadece URL ve boyutları kayda yazılır.
+Bu modül fotoğrafları tarayıcı dışında, paylaşılan bağlantı havuzuyla (aiohttp) indirir:
+1. Eşzamanlılık sınırı (toplam ve host başına) ve üstel geri çekilmeli yeniden deneme
+2. İçerik adresli önbellek: dosya adı içeriğin SHA-256 özetidir (objects/ab/abcd....jpg); aynı
+   fotoğraf farklı URL'lerden gelse de bir kez saklanır
+3. URL indeksi (index/): daha önce indirilmiş URL'ler çalıştırmalar arasında tekrar istenmez
+
+Kullanım:
+    python photo_downloader.py data/raw/yandex_reviews_*.jsonl.gz --cache data/photos --concurrency 8
+"""
+
+import os
+import json
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# İçerik tipine göre dosya uzantısı
+CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg', 'image/png': '.png', 'image/webp': '.webp', 'image/gif': '.gif',
+    'image/avif': '.avif', 'image/heic': '.heic'
+}
+# Yeniden denenmeyen (kalıcı) HTTP durumları
+PERMANENT_STATUSES = {400, 401, 403, 404, 410}
+
+
+def _aiohttp():
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError("Fotoğraf indirici için aiohttp gerekli: pip install aiohttp") from e
+    return aiohttp
+
+
+def url_key(url):
+    """URL indeksindeki anahtar (128-bit blake2b hex)"""
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class PhotoCache:
+    """İçerik adresli disk önbelleği: objects/<sha256[:2]>/<sha256><ext> + URL → nesne indeksi"""
+
+    def __init__(self, root=os.path.join('data', 'photos')):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_dir = os.path.join(root, 'index')
+
+    def _index_path(self, url):
+        key = url_key(url)
+        return os.path.join(self.index_dir, key[:2], key)
+
+    def _write_atomic(self, path, data):
+        """Yarım yazılmış dosya görünmesin: geçici dosya + os.replace"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def lookup(self, url):
+        """URL daha önce indirildiyse önbellekteki dosya yolu, yoksa None"""
+        try:
+            with open(self._index_path(url), 'r', encoding='utf-8') as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return None
+        path = os.path.join(self.objects_dir, name[:2], name)
+        return path if os.path.exists(path) else None
+
+    def store(self, url, content, content_type=None):
+        """İçeriği kaydet (aynı içerik zaten varsa yeniden yazılmaz) ve URL'yi indeksle; dosya yolunu döndür"""
+        digest = hashlib.sha256(content).hexdigest()
+        extension = CONTENT_TYPE_EXTENSIONS.get((content_type or '').split(';')[0].strip().lower(), '')
+        name = digest + extension
+        path = os.path.join(self.objects_dir, digest[:2], name)
+        if not os.path.exists(path):
+            self._write_atomic(path, content)
+        self._write_atomic(self._index_path(url), name.encode('utf-8'))
+        return path
+
+
+class PhotoDownloader:
+    """Bağlantı havuzlu, eşzamanlılık sınırlı, yeniden denemeli asenkron fotoğraf indirici"""
+
+    def __init__(self, cache_dir=os.path.join('data', 'photos'), concurrency=8, per_host=4, retries=3,
+                 timeout=30.0, backoff_base=0.5):
+        self.cache = PhotoCache(cache_dir)
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.session = None
+        self.stats = {'downloaded': 0, 'cached': 0, 'failed': 0, 'bytes': 0}
+
+    async def __aenter__(self):
+        aiohttp = _aiohttp()
+        # Havuz sınırı eşzamanlılık sınırıyla aynı; bağlantılar istekler arasında yeniden kullanılır
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                                   '(KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36'}
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        self.session = None
+
+    async def fetch(self, url):
+        """Tek fotoğraf: önbellekte varsa ağa gidilmez. Dönüş: dosya yolu veya None (başarısız)"""
+        path = self.cache.lookup(url)
+        if path:
+            self.stats['cached'] += 1
+            return path
+        aiohttp = _aiohttp()
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self.session.get(url) as response:
+                    if response.status in PERMANENT_STATUSES:
+                        logger.warning(f"⚠️ Fotoğraf alınamadı ({response.status}): {url}")
+                        break
+                    response.raise_for_status()
+                    content = await response.read()
+                    # Disk yazımı olay döngüsünü bekletmesin
+                    path = await asyncio.to_thread(self.cache.store, url, content,
+                                                   response.headers.get('Content-Type'))
+                self.stats['downloaded'] += 1
+                self.stats['bytes'] += len(content)
+                return path
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    logger.warning(f"⚠️ Fotoğraf {attempt} denemede alınamadı: {url} ({e})")
+                    break
+                await asyncio.sleep(self.backoff_base * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2))
+        self.stats['failed'] += 1
+        return None
+
+    async def download(self, urls):
+        """URL'leri indir (tekrarlar bir kez). Dönüş: {url: dosya yolu veya None}"""
+        unique = list(dict.fromkeys(urls))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(url):
+            async with semaphore:
+                return await self.fetch(url)
+
+        paths = await asyncio.gather(*(run(url) for url in unique))
+        return dict(zip(unique, paths))
+
+
+def iter_photo_urls(reviews):
+    """Yorumlardaki (sözlük, ReviewRecord veya JSON metni) fotoğraf URL'leri"""
+    for review in reviews:
+        photos = review.get('photos')
+        if isinstance(photos, str):
+            photos = json.loads(photos) if photos else None
+        for photo in photos or ():
+            url = photo.get('url') if isinstance(photo, dict) else photo[0]
+            if url:
+                yield url
+
+
+async def download_review_photos(reviews, **kwargs):
+    """Yorum listesindeki tüm fotoğrafları indir. kwargs PhotoDownloader'a aktarılır."""
+    async with PhotoDownloader(**kwargs) as downloader:
+        paths = await downloader.download(iter_photo_urls(reviews))
+        logger.info(f"📷 {len(paths)} fotoğraf: {downloader.stats['downloaded']} indirildi, "
+                    f"{downloader.stats['cached']} önbellekten, {downloader.stats['failed']} başarısız "
+                    f"({downloader.stats['bytes'] / 2**20:.1f} MiB)")
+        return paths
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kazınmış yorumlardaki fotoğrafları indir")
+    parser.add_argument('files', nargs='+', help="Ham yorum dosyaları (.jsonl/.jsonl.gz/.jsonl.zst veya .json)")
+    parser.add_argument('--cache', default=os.path.join('data', 'photos'), help="İçerik adresli önbellek klasörü")
+    parser.add_argument('--concurrency', type=int, default=8, help="Aynı anda en fazla indirme")
+    parser.add_argument('--per-host', type=int, default=4, help="Host başına en fazla bağlantı")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=30.0, help="İstek başına zaman aşımı (sn)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from review_storage import is_jsonl_path, iter_review_batches
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    reviews = []
+    for path in args.files:
+        if is_jsonl_path(path):
+            for batch in iter_review_batches(path):
+                reviews.extend(batch)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                reviews.extend(json.load(f).get('reviews', []))
+    asyncio.run(download_review_photos(reviews, cache_dir=args.cache, concurrency=args.concurrency,
+                                       per_host=args.per_host, retries=args.retries, timeout=args.timeout))
+
+
+if __name__ == "__main__":
+    main()
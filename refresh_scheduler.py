@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yorum Hızına Duyarlı Yenileme Planlayıcısı
+Path: refresh_scheduler.py
+
+Her işletmenin yorum geliş hızını (λ, yorum/gün) öğrenir ve yenileme aralıklarını günlük
+tarayıcı-saati bütçesine göre dağıtır:
+1. Hız tahmini: ardışık kazımalardaki total_review_count farkları; yeterli gözlem yoksa
+   toplamlardaki yorum tarihleri. Az veriyle aşırı tepki vermemek için zayıf bir ön dağılım
+   (gamma-Poisson) eklenir.
+2. Bayatlık (staleness): T günde bir yenilenen bir işletmede, herhangi bir anda henüz çekilmemiş
+   beklenen yorum sayısı λ·T/2'dir.
+3. Planlama: önce her işletme hedef bayatlığı sağlayan en seyrek aralıkla (T = 2·hedef/λ) planlanır.
+   Bunun maliyeti bütçeyi aşıyorsa toplam bayatlığı bütçe altında en aza indiren aralık
+   T_i ∝ sqrt(c_i / λ_i) kullanılır (c_i: bir kazımanın tarayıcı-saati maliyeti).
+
+Örnek:
+    python refresh_scheduler.py --budget-hours 6 --target-staleness 5
+    python refresh_scheduler.py --budget-hours 6 --enqueue
+"""
+
+import os
+import math
+import json
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+from review_aggregates import AggregateStore
+
+logger = logging.getLogger(__name__)
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _parse_time(value):
+    return datetime.strptime(value[:19], _TIME_FORMAT) if len(value) > 10 else datetime.strptime(value, "%Y-%m-%d")
+
+
+class RefreshScheduler:
+    """Yorum hızına ve tarayıcı bütçesine göre yenileme planı üretir"""
+
+    def __init__(self, store, budget_hours_per_day=6.0, target_staleness=5.0, min_interval_days=0.25,
+                 max_interval_days=60.0, window_days=90, prior_reviews=0.02, prior_days=1.0,
+                 base_scrape_seconds=60.0, seconds_per_review=0.5, max_reviews=None):
+        self.store = store
+        self.budget_hours_per_day = budget_hours_per_day
+        # Hedef: herhangi bir anda çekilmemiş beklenen yorum sayısı
+        self.target_staleness = target_staleness
+        self.min_interval_days = min_interval_days
+        self.max_interval_days = max_interval_days
+        self.window_days = window_days
+        # Zayıf gamma ön dağılımı (1 günlük sözde gözlem, ~0.02 yorum/gün): hiç veri yokken aralık üst sınıra gider
+        self.prior_reviews = prior_reviews
+        self.prior_days = prior_days
+        # Kazıma süresi gözlemi yoksa kullanılan maliyet modeli
+        self.base_scrape_seconds = base_scrape_seconds
+        self.seconds_per_review = seconds_per_review
+        self.max_reviews = max_reviews
+
+    def arrival_rate(self, business_id, history):
+        """Yorum geliş hızı (yorum/gün) ve tahminin kaynağı"""
+        events, exposure, source = 0.0, 0.0, 'prior'
+        counted = [h for h in history if h['total_review_count']]
+        if len(counted) >= 2:
+            last = counted[-1]
+            last_time = _parse_time(last['observed_at'])
+            # Pencere içindeki en eski gözlemle karşılaştır
+            first = next((h for h in counted
+                          if (last_time - _parse_time(h['observed_at'])).days <= self.window_days), counted[0])
+            days = (last_time - _parse_time(first['observed_at'])).total_seconds() / 86400
+            delta = last['total_review_count'] - first['total_review_count']
+            if days >= 1 and delta >= 0:
+                events, exposure, source = delta, days, 'total_review_count'
+
+        if source == 'prior':
+            # Yorum tarihleri: son gözlemden geriye window_days içindeki günlük sayılar
+            summary = self.store.get(business_id)
+            if summary and summary['last_review_date']:
+                until = _parse_time(history[-1]['observed_at']) if history else _parse_time(summary['last_review_date'])
+                since = until - timedelta(days=self.window_days)
+                first_review = _parse_time(summary['first_review_date'])
+                exposure = (until - max(since, first_review)).total_seconds() / 86400
+                events = sum(self.store.daily_counts(business_id, since.strftime("%Y-%m-%d"),
+                                                     until.strftime("%Y-%m-%d")).values())
+                source = 'review_dates' if exposure > 0 else 'prior'
+        return (events + self.prior_reviews) / (max(exposure, 0) + self.prior_days), source
+
+    def scrape_cost_hours(self, history):
+        """Bir kazımanın tarayıcı-saati maliyeti: son gözlemlenen süreler, yoksa yorum sayısından model"""
+        seconds = sorted(h['scrape_seconds'] for h in history[-5:] if h['scrape_seconds'])
+        if seconds:
+            return seconds[len(seconds) // 2] / 3600
+        total = next((h['total_review_count'] for h in reversed(history) if h['total_review_count']), 0)
+        if self.max_reviews:
+            total = min(total, self.max_reviews)
+        return (self.base_scrape_seconds + self.seconds_per_review * total) / 3600
+
+    def _clamp(self, interval):
+        return min(self.max_interval_days, max(self.min_interval_days, interval))
+
+    def plan(self, now=None):
+        """Tüm bilinen işletmeler için yenileme planı (en erken yenilenecek önce)"""
+        now = now or datetime.now()
+        histories = {}
+        for row in self.store.scrape_history():
+            histories.setdefault(row['business_id'], []).append(row)
+
+        entries = []
+        for business_id, history in histories.items():
+            rate, source = self.arrival_rate(business_id, history)
+            entries.append({
+                'business_id': business_id,
+                'url': next((h['url'] for h in reversed(history) if h['url']), None),
+                'last_scraped_at': history[-1]['observed_at'],
+                'rate_per_day': rate,
+                'rate_source': source,
+                'cost_hours': self.scrape_cost_hours(history)
+            })
+        if not entries:
+            return []
+
+        # 1. Hedef bayatlığı sağlayan en seyrek aralıklar
+        for entry in entries:
+            entry['interval_days'] = self._clamp(2 * self.target_staleness / entry['rate_per_day'])
+        daily_hours = sum(e['cost_hours'] / e['interval_days'] for e in entries)
+
+        # 2. Bütçe yetmiyorsa: toplam bayatlık Σ λ_i·T_i/2'yi Σ c_i/T_i ≤ B altında en aza indir
+        #    Lagrange çözümü: T_i = sqrt(c_i/λ_i) · Σ_j sqrt(c_j·λ_j) / B
+        if daily_hours > self.budget_hours_per_day:
+            scale = sum(math.sqrt(e['cost_hours'] * e['rate_per_day']) for e in entries) / self.budget_hours_per_day
+            for entry in entries:
+                entry['interval_days'] = self._clamp(math.sqrt(entry['cost_hours'] / entry['rate_per_day']) * scale)
+            daily_hours = sum(e['cost_hours'] / e['interval_days'] for e in entries)
+            if daily_hours > self.budget_hours_per_day * 1.01:
+                logger.warning(f"⚠️ min/max aralık sınırları nedeniyle bütçe aşıldı: {daily_hours:.2f} saat/gün")
+
+        for entry in entries:
+            entry['expected_staleness'] = entry['rate_per_day'] * entry['interval_days'] / 2
+            next_refresh = _parse_time(entry['last_scraped_at']) + timedelta(days=entry['interval_days'])
+            entry['next_refresh_at'] = max(next_refresh, now).strftime(_TIME_FORMAT)
+        logger.info(f"🗓️ {len(entries)} işletme planlandı, günlük maliyet: {daily_hours:.2f} / "
+                    f"{self.budget_hours_per_day} tarayıcı-saati")
+        return sorted(entries, key=lambda e: e['next_refresh_at'])
+
+    def enqueue(self, queue, plan=None):
+        """Planı iş kuyruğuna 'refresh' işleri olarak yaz (available_at = planlanan yenileme zamanı)"""
+        plan = plan if plan is not None else self.plan()
+        count = 0
+        for entry in plan:
+            if not entry['url']:
+                logger.warning(f"⚠️ {entry['business_id']}: URL bilinmiyor, kuyruğa alınmadı")
+                continue
+            available_at = _parse_time(entry['next_refresh_at']).timestamp()
+            # Worker iş bitince interval_days sonrasına yeniden planlar; aralıklar planlayıcı tekrar
+            # çalıştırılınca (yeni gözlemlerle) güncellenir
+            payload = {'interval_days': round(entry['interval_days'], 4)}
+            if self.max_reviews:
+                payload['max_reviews'] = self.max_reviews
+            queue.enqueue(entry['url'], business_id=entry['business_id'], kind='refresh',
+                          # Hızlı değişen işletmeler aynı anda hazır olduğunda önce çalışır
+                          priority=int(entry['rate_per_day'] * 100), available_at=available_at, payload=payload)
+            count += 1
+        return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Yorum hızına göre işletme yenileme planı üret")
+    parser.add_argument('--aggregates', default=os.path.join('data', 'aggregates.sqlite'),
+                        help="İşletme toplamları veritabanı (varsayılan: data/aggregates.sqlite)")
+    parser.add_argument('--budget-hours', type=float, default=6.0, help="Günlük tarayıcı-saati bütçesi")
+    parser.add_argument('--target-staleness', type=float, default=5.0,
+                        help="Herhangi bir anda çekilmemiş beklenen en fazla yorum sayısı")
+    parser.add_argument('--min-interval', type=float, default=0.25, help="En kısa yenileme aralığı (gün)")
+    parser.add_argument('--max-interval', type=float, default=60.0, help="En uzun yenileme aralığı (gün)")
+    parser.add_argument('--max-reviews', type=int, default=None, help="Yenileme başına en fazla yorum")
+    parser.add_argument('--enqueue', action='store_true', help="Planı iş kuyruğuna 'refresh' işleri olarak yaz")
+    parser.add_argument('--queue', default=None, help="İş kuyruğu veritabanı (varsayılan: data/jobs.sqlite)")
+    parser.add_argument('--output', default=None, help="Planı JSON olarak bu dosyaya yaz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    store = AggregateStore(args.aggregates)
+    scheduler = RefreshScheduler(store, budget_hours_per_day=args.budget_hours,
+                                 target_staleness=args.target_staleness, min_interval_days=args.min_interval,
+                                 max_interval_days=args.max_interval, max_reviews=args.max_reviews)
+    plan = scheduler.plan()
+    for entry in plan:
+        print(f"{entry['business_id']:>14}  λ={entry['rate_per_day']:8.3f}/gün ({entry['rate_source']})  "
+              f"maliyet={entry['cost_hours'] * 60:6.1f} dk  aralık={entry['interval_days']:6.2f} gün  "
+              f"bayatlık={entry['expected_staleness']:5.1f}  sonraki={entry['next_refresh_at']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, ensure_ascii=False, indent=2)
+    if args.enqueue:
+        from job_queue import JobQueue, DEFAULT_QUEUE_PATH
+        queue = JobQueue(args.queue or DEFAULT_QUEUE_PATH)
+        logger.info(f"📥 {scheduler.enqueue(queue, plan)} yenileme işi kuyruğa alındı")
+        queue.close()
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
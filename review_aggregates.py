@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Artımlı İşletme Toplamları
+Path: review_aggregates.py
+
+İşletme bazında sürekli güncel tutulan özetler (SQLite):
+1. Puan histogramı (1-5) ve ortalama puan
+2. Günlük yorum sayıları (reviews per day)
+3. Fotoğraflı yorum oranı ve işletme yanıt oranı
+4. Kazıma geçmişi: sitedeki toplam yorum sayısı, süre ve URL (yenileme planlaması için)
+
+Her güncelleme sadece yeni gelen yorumlarla O(yeni yorum) maliyetle yapılır; daha önce
+sayılmış yorumlar (review_id veya yazar+metin anahtarıyla) tekrar sayılmaz.
+"""
+
+import os
+import sqlite3
+import hashlib
+from datetime import datetime, timedelta
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS business_aggregates (
+    business_id TEXT PRIMARY KEY,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum REAL NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
+    photo_count INTEGER NOT NULL DEFAULT 0,
+    reply_count INTEGER NOT NULL DEFAULT 0,
+    first_review_date TEXT,
+    last_review_date TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS daily_review_counts (
+    business_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (business_id, day)
+);
+CREATE TABLE IF NOT EXISTS scrape_observations (
+    business_id TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    total_review_count INTEGER,
+    scraped_review_count INTEGER,
+    scrape_seconds REAL,
+    url TEXT,
+    count_source TEXT,
+    PRIMARY KEY (business_id, observed_at)
+);
+CREATE TABLE IF NOT EXISTS aggregated_reviews (
+    business_id TEXT NOT NULL,
+    review_key TEXT NOT NULL,
+    PRIMARY KEY (business_id, review_key)
+) WITHOUT ROWID;
+"""
+
+
+def review_key(review):
+    """Yorumu toplamlarda tekil sayabilmek için anahtar üret"""
+    review_id = review.get('review_id')
+    if review_id:
+        return str(review_id)
+    content = f"{review.get('author_name') or ''}\x1f{review.get('text_original') or ''}"
+    return hashlib.md5(content.encode()).hexdigest()
+
+
+def review_days(reviews, scrape_date):
+    """Her yorum için YYYY-MM-DD gün değeri (review_date yoksa ham tarih metni çözülür)"""
+    days = [None] * len(reviews)
+    raw_indices = []
+    for i, review in enumerate(reviews):
+        value = review.get('review_date')
+        if value is not None and value == value:  # NaN/NaT kontrolü
+            days[i] = str(value)[:10]
+        elif review.get('date'):
+            raw_indices.append(i)
+    if raw_indices:
+        from date_parser import parse_review_dates
+        parsed = parse_review_dates([reviews[i].get('date') for i in raw_indices], scrape_date)
+        for i, value in zip(raw_indices, parsed):
+            if value == value and value is not None:
+                days[i] = value.strftime("%Y-%m-%d")
+    return days
+
+
+class AggregateStore:
+    """SQLite tabanlı artımlı işletme toplamları"""
+
+    def __init__(self, path=os.path.join('data', 'aggregates.sqlite')):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(scrape_observations)")}
+        if 'count_source' not in columns:
+            # Eski veritabanları: sayının kaynağı (meta, state, header, network, ...) sonradan eklendi
+            self.conn.execute("ALTER TABLE scrape_observations ADD COLUMN count_source TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def _new_reviews(self, business_id, reviews):
+        """Daha önce sayılmamış yorumları ve anahtarlarını döndür"""
+        keyed = {}
+        for review in reviews:
+            keyed.setdefault(review_key(review), review)
+        keys = list(keyed)
+        known = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT review_key FROM aggregated_reviews WHERE business_id = ? "
+                f"AND review_key IN ({','.join('?' * len(chunk))})",
+                [business_id, *chunk]
+            )
+            known.update(row[0] for row in rows)
+        return [(key, review) for key, review in keyed.items() if key not in known]
+
+    def update(self, business_id, reviews, scrape_date=None):
+        """Yeni yorum grubunu toplamlara ekle. reviews: sözlük listesi veya DataFrame.
+        Dönüş: gerçekten eklenen (daha önce sayılmamış) yorum sayısı."""
+        if hasattr(reviews, 'to_dict'):
+            from review_schema import frame_records
+            reviews = frame_records(reviews)
+        if not business_id or not reviews:
+            return 0
+        business_id = str(business_id)
+
+        with self.conn:
+            new = self._new_reviews(business_id, reviews)
+            if not new:
+                return 0
+            histogram = [0] * 5
+            rating_count = 0
+            rating_sum = 0.0
+            photo_count = 0
+            reply_count = 0
+            daily = {}
+            for (_, review), day in zip(new, review_days([r for _, r in new], scrape_date)):
+                rating = review.get('rating')
+                if rating is not None and rating == rating and 1 <= float(rating) <= 5:
+                    rating_count += 1
+                    rating_sum += float(rating)
+                    histogram[int(round(float(rating))) - 1] += 1
+                if review.get('has_photos') is True:
+                    photo_count += 1
+                reply = review.get('business_reply')
+                if isinstance(reply, str) and reply.strip():
+                    reply_count += 1
+                if day:
+                    daily[day] = daily.get(day, 0) + 1
+
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO aggregated_reviews (business_id, review_key) VALUES (?, ?)",
+                [(business_id, key) for key, _ in new]
+            )
+            self.conn.execute(
+                """
+                INSERT INTO business_aggregates (business_id, review_count, rating_count, rating_sum,
+                    rating_1, rating_2, rating_3, rating_4, rating_5, photo_count, reply_count,
+                    first_review_date, last_review_date, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(business_id) DO UPDATE SET
+                    review_count = review_count + excluded.review_count,
+                    rating_count = rating_count + excluded.rating_count,
+                    rating_sum = rating_sum + excluded.rating_sum,
+                    rating_1 = rating_1 + excluded.rating_1,
+                    rating_2 = rating_2 + excluded.rating_2,
+                    rating_3 = rating_3 + excluded.rating_3,
+                    rating_4 = rating_4 + excluded.rating_4,
+                    rating_5 = rating_5 + excluded.rating_5,
+                    photo_count = photo_count + excluded.photo_count,
+                    reply_count = reply_count + excluded.reply_count,
+                    first_review_date = MIN(COALESCE(first_review_date, excluded.first_review_date),
+                                            COALESCE(excluded.first_review_date, first_review_date)),
+                    last_review_date = MAX(COALESCE(last_review_date, excluded.last_review_date),
+                                           COALESCE(excluded.last_review_date, last_review_date)),
+                    updated_at = excluded.updated_at
+                """,
+                (business_id, len(new), rating_count, rating_sum, *histogram, photo_count, reply_count,
+                 min(daily) if daily else None, max(daily) if daily else None,
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO daily_review_counts (business_id, day, review_count) VALUES (?, ?, ?)
+                ON CONFLICT(business_id, day) DO UPDATE SET review_count = review_count + excluded.review_count
+                """,
+                [(business_id, day, count) for day, count in daily.items()]
+            )
+        return len(new)
+
+    def get(self, business_id, window_days=30):
+        """İşletmenin önceden hesaplanmış özetini döndür (yoksa None)"""
+        self.conn.row_factory = sqlite3.Row
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM business_aggregates WHERE business_id = ?", (str(business_id),)
+            ).fetchone()
+        finally:
+            self.conn.row_factory = None
+        if row is None:
+            return None
+        review_count = row['review_count']
+        summary = {
+            'business_id': row['business_id'],
+            'review_count': review_count,
+            'average_rating': row['rating_sum'] / row['rating_count'] if row['rating_count'] else None,
+            'rating_histogram': {star: row[f'rating_{star}'] for star in range(1, 6)},
+            'photo_share': row['photo_count'] / review_count if review_count else 0,
+            'reply_rate': row['reply_count'] / review_count if review_count else 0,
+            'first_review_date': row['first_review_date'],
+            'last_review_date': row['last_review_date'],
+            'updated_at': row['updated_at'],
+            'reviews_per_day': self.reviews_per_day(business_id, window_days, row['last_review_date'])
+        }
+        return summary
+
+    def record_scrape(self, business_id, total_review_count=None, scraped_review_count=None,
+                      scrape_seconds=None, url=None, observed_at=None, count_source=None):
+        """Bir kazıma çalıştırmasının gözlemini kaydet (sitedeki toplam yorum sayısı ve kaynağı, süre, URL)"""
+        if not business_id:
+            return
+        observed_at = observed_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scrape_observations (business_id, observed_at, total_review_count, "
+                "scraped_review_count, scrape_seconds, url, count_source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(business_id), observed_at, total_review_count, scraped_review_count, scrape_seconds, url,
+                 count_source)
+            )
+
+    def scrape_history(self, business_id=None):
+        """Kazıma gözlemleri (eskiden yeniye); business_id verilmezse tüm işletmeler"""
+        self.conn.row_factory = sqlite3.Row
+        try:
+            if business_id is None:
+                rows = self.conn.execute(
+                    "SELECT * FROM scrape_observations ORDER BY business_id, observed_at").fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT * FROM scrape_observations WHERE business_id = ? ORDER BY observed_at",
+                    (str(business_id),)).fetchall()
+        finally:
+            self.conn.row_factory = None
+        return [dict(row) for row in rows]
+
+    def last_total_count(self, business_id, count_source=None):
+        """Son gözlemde sitede görülen toplam yorum sayısı (yoksa None).
+
+        count_source verilirse sadece aynı kaynaktan (ör. 'network', 'header') okunmuş son sayı döner.
+        """
+        query = ("SELECT total_review_count FROM scrape_observations WHERE business_id = ? "
+                 "AND total_review_count IS NOT NULL")
+        params = [str(business_id)]
+        if count_source is not None:
+            query += " AND count_source = ?"
+            params.append(count_source)
+        row = self.conn.execute(query + " ORDER BY observed_at DESC LIMIT 1", params).fetchone()
+        return row[0] if row else None
+
+    def known_review_ids(self, business_id):
+        """Toplamlara eklenmiş yorumların 16 baytlık kimlikleri (artımlı kazımada atlanır)"""
+        rows = self.conn.execute("SELECT review_key FROM aggregated_reviews WHERE business_id = ?",
+                                 (str(business_id),))
+        known = set()
+        for (key,) in rows:
+            try:
+                known.add(bytes.fromhex(key))
+            except ValueError:
+                continue
+        return known
+
+    def daily_counts(self, business_id, since=None, until=None):
+        """Gün bazında yorum sayıları {YYYY-MM-DD: sayı}"""
+        rows = self.conn.execute(
+            "SELECT day, review_count FROM daily_review_counts WHERE business_id = ? "
+            "AND day >= COALESCE(?, day) AND day <= COALESCE(?, day) ORDER BY day",
+            (str(business_id), since, until)
+        )
+        return dict(rows.fetchall())
+
+    def reviews_per_day(self, business_id, window_days=30, until=None):
+        """Son window_days gündeki ortalama günlük yorum sayısı (until: pencerenin son günü)"""
+        until = until or datetime.now().strftime("%Y-%m-%d")
+        since = (datetime.strptime(until, "%Y-%m-%d") - timedelta(days=window_days - 1)).strftime("%Y-%m-%d")
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(review_count), 0) FROM daily_review_counts "
+            "WHERE business_id = ? AND day BETWEEN ? AND ?",
+            (str(business_id), since, until)
+        ).fetchone()[0]
+        return total / window_days
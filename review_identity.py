@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Kararlı Yorum Kimliği
+Path: review_identity.py
+
+Yorum kimliği çalıştırmalar arasında değişmemelidir. Eski kimlik (yazar + metin + tarih MD5'i)
+"2 gün önce" gibi göreli tarihler kaydıkça, metin farklı genişletildiğinde veya yazar sezgisi başka
+bir düğüm seçtiğinde değişiyordu. Öncelik sırası:
+1. Yandex'in kendi yorum kimliği (DOM data-* öznitelikleri veya ağdan gelen yorum JSON'u)
+2. Normalize edilmiş yazar adı + yorum metninin başı (tarih hariç) üzerinden 128-bit blake2b özeti
+
+Kimlik bellekte 16 baytlık ikili özet olarak tutulur; hex metin sadece çıktıda üretilir.
+"""
+
+import hashlib
+
+from text_normalization import normalize_review_text
+
+# İçerik kimliğinde kullanılan normalize metin uzunluğu: kısaltılmış ("devamı") ve tam metin aynı kimliği üretir
+IDENTITY_TEXT_PREFIX = 120
+# Ağ yanıtlarında yorum kimliği ve yazar kimliği alanları
+NATIVE_REVIEW_ID_KEYS = ('reviewId', 'review_id')
+NATIVE_AUTHOR_ID_KEYS = ('publicId', 'authorId', 'uid')
+
+# Tek evaluate ile yorum kartındaki yerel kimlikler (öznitelikler veya yazar profili bağlantısı)
+REVIEW_NATIVE_IDS_JS = r"""
+(element) => {
+    const card = element.closest('[data-review-id], .business-review-view, .business-reviews-card-view__review')
+        || element;
+    const attr = (el, names) => {
+        for (const name of names) {
+            const value = el && el.getAttribute(name);
+            if (value) return value;
+        }
+        return null;
+    };
+    const inner = card.querySelector('[data-review-id]');
+    const reviewId = attr(card, ['data-review-id', 'data-id']) || attr(inner, ['data-review-id']);
+    let authorId = attr(card.querySelector('[data-author-id]'), ['data-author-id']);
+    if (!authorId) {
+        const link = card.querySelector('a[href*="/user/"]');
+        const match = link && (link.getAttribute('href') || '').match(/\/user\/([^/?#]+)/);
+        authorId = match ? match[1] : null;
+    }
+    return {reviewId, authorId};
+}
+"""
+
+
+def _digest(value, size=16):
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=size).digest()
+
+
+def native_review_digest(native_review_id):
+    """Yandex yorum kimliğinin 16 baytlık özeti"""
+    return _digest(f"native\x1f{native_review_id}")
+
+
+def content_review_digest(author_name, text):
+    """Yerel kimlik yoksa: normalize yazar + metin başının 16 baytlık özeti (tarih dahil edilmez)"""
+    author = ' '.join(str(author_name or '').casefold().split())
+    body = normalize_review_text(text or '')[:IDENTITY_TEXT_PREFIX]
+    return _digest(f"content\x1f{author}\x1f{body}")
+
+
+def review_identity(author_name, text, native_review_id=None):
+    """(16 baytlık özet, kaynak) - kaynak 'native' veya 'content'"""
+    if native_review_id:
+        return native_review_digest(native_review_id), 'native'
+    return content_review_digest(author_name, text), 'content'
+
+
+def text_key(text):
+    """Ağdan gelen yorumu sayfadaki kartla eşleştirmek için metin başının 8 baytlık özeti"""
+    return _digest(normalize_review_text(text or '')[:IDENTITY_TEXT_PREFIX], size=8)
+
+
+class NativeReviewIds:
+    """Ağ yanıtlarındaki (JSON) yorumlardan metin → (yorum kimliği, yazar kimliği) eşlemesi"""
+
+    def __init__(self):
+        self.by_text = {}
+
+    def __len__(self):
+        return len(self.by_text)
+
+    def add_payload(self, data, depth=0):
+        """JSON içinde yorum kimliği taşıyan nesneleri bul ve kaydet; eklenen sayıyı döndür"""
+        if depth > 10:
+            return 0
+        added = 0
+        if isinstance(data, dict):
+            review_id = next((data[k] for k in NATIVE_REVIEW_ID_KEYS if isinstance(data.get(k), str)), None)
+            if review_id and isinstance(data.get('text'), str):
+                author = data.get('author') if isinstance(data.get('author'), dict) else {}
+                author_id = next((author[k] for k in NATIVE_AUTHOR_ID_KEYS if author.get(k)), None)
+                self.by_text[text_key(data['text'])] = (review_id, author_id)
+                return 1
+            values = data.values()
+        elif isinstance(data, list):
+            values = data
+        else:
+            return 0
+        for value in values:
+            if isinstance(value, (dict, list)):
+                added += self.add_payload(value, depth + 1)
+        return added
+
+    def lookup(self, text):
+        """Metne karşılık gelen (yorum kimliği, yazar kimliği) veya (None, None)"""
+        return self.by_text.get(text_key(text), (None, None))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Kompakt Yorum Kayıtları
+Path: review_records.py
+
+Kazıma döngüsü boyunca yorumlar sözlük yerine __slots__ kullanan ReviewRecord nesneleri olarak
+tutulur: alan adları her nesnede tekrarlanmaz, review_id 32 karakterlik hex metin yerine 16 baytlık
+özet olarak saklanır (bkz. review_identity), yazar adları ve tarih metinleri intern edilir. Tekrar kontrolü 64-bit tam
+sayı özetleriyle yapılır. Sözlüğe/DataFrame'e dönüşüm sadece çıktı aşamasında yapılır.
+"""
+
+import sys
+import json
+import hashlib
+import collections
+
+from text_normalization import normalize_review_text
+from review_identity import review_identity
+
+REVIEW_FIELDS = ('review_id', 'native_review_id', 'author_id', 'author_name', 'rating', 'text_original', 'date',
+                 'has_photos', 'business_reply', 'photos')
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _pack_photos(photos):
+    """[{'url', 'width', 'height'}, ...] (veya JSON metni) → ((url, width, height), ...); boşsa None"""
+    if isinstance(photos, str):
+        photos = json.loads(photos) if photos else None
+    if not isinstance(photos, (list, tuple)) or not photos:
+        return None
+    return tuple((p['url'], p.get('width'), p.get('height')) if isinstance(p, dict) else tuple(p) for p in photos)
+
+
+class ReviewRecord:
+    """Tek bir yorum (sözlüğe göre çok daha az bellek kullanır)"""
+
+    __slots__ = ('review_digest', 'native_review_id', 'author_id', 'author_name', 'rating', 'text_original', 'date',
+                 'has_photos', 'business_reply', '_photos')
+
+    def __init__(self, review_digest, author_name, rating, text_original, date, has_photos, business_reply,
+                 native_review_id=None, author_id=None, photos=None):
+        self.review_digest = review_digest
+        # Yandex'in kendi yorum/yazar kimlikleri (bulunamazsa None)
+        self.native_review_id = native_review_id
+        self.author_id = author_id
+        # Aynı yazar ve göreli tarih metinleri ("2 gün önce") çok tekrar eder
+        self.author_name = _intern(author_name)
+        self.rating = rating
+        self.text_original = text_original
+        self.date = _intern(date)
+        self.has_photos = has_photos
+        self.business_reply = business_reply
+        # Fotoğraflar sözlük listesi yerine (url, genişlik, yükseklik) demetleri olarak tutulur
+        self._photos = _pack_photos(photos)
+
+    @classmethod
+    def create(cls, author_name, rating, text_original, date, has_photos, business_reply,
+               native_review_id=None, author_id=None, photos=None):
+        """Alanlardan kayıt oluştur; kimlik yerel yorum kimliğinden, yoksa yazar + metinden üretilir"""
+        digest, _ = review_identity(author_name, text_original, native_review_id)
+        return cls(digest, author_name, rating, text_original, date, has_photos, business_reply,
+                   native_review_id, author_id, photos)
+
+    @classmethod
+    def from_dict(cls, review):
+        review_id = review.get('review_id')
+        if isinstance(review_id, str) and len(review_id) == 32:
+            digest = bytes.fromhex(review_id)
+        else:
+            digest, _ = review_identity(review.get('author_name'), review.get('text_original'),
+                                        review.get('native_review_id'))
+        return cls(digest, review.get('author_name'), review.get('rating'), review.get('text_original'),
+                   review.get('date'), review.get('has_photos'), review.get('business_reply'),
+                   review.get('native_review_id'), review.get('author_id'), review.get('photos'))
+
+    @property
+    def review_id(self):
+        return self.review_digest.hex()
+
+    @property
+    def photos(self):
+        return [{'url': url, 'width': width, 'height': height} for url, width, height in self._photos or ()]
+
+    def get(self, field, default=None):
+        """Sözlük benzeri okuma (çıktı katmanındaki eski kodla uyumluluk için)"""
+        return getattr(self, field, default)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in REVIEW_FIELDS}
+
+
+def records_to_dicts(records):
+    """Kayıtları sırayla sözlüğe çevir (üretici; tüm listeyi bir anda kopyalamaz)"""
+    for record in records:
+        yield record.to_dict() if isinstance(record, ReviewRecord) else record
+
+
+def records_to_frame(records):
+    """Kayıtlardan sütun sütun DataFrame oluştur (ara sözlük listesi oluşturmadan)"""
+    import pandas as pd
+
+    if records and not isinstance(records[0], ReviewRecord):
+        return pd.DataFrame(records)
+    columns = {field: [getattr(r, field) for r in records] for field in REVIEW_FIELDS if field != 'photos'}
+    # CSV/Parquet'te fotoğraf listesi JSON metni olarak saklanır (fotoğrafsız yorumlarda boş)
+    columns['photos'] = [json.dumps(r.photos, ensure_ascii=False) if r._photos else None for r in records]
+    return pd.DataFrame(columns)
+
+
+def content_digest(text):
+    """Normalize edilmiş metnin 64-bit özeti (tam sayı)"""
+    normalized = normalize_review_text(text or '')
+    return int.from_bytes(hashlib.blake2b(normalized.encode(), digest_size=8).digest(), 'little')
+
+
+class ReviewDedupeIndex:
+    """Kazıma sırasında tekrar kontrolü: son kimlikler + tüm veri boyunca içerik özetleri"""
+
+    def __init__(self, recent_size=30):
+        self.recent_ids = collections.deque(maxlen=recent_size)
+        self.content_digests = set()
+        self.duplicate_count = 0
+        # Önceki çalıştırmalardan bilinen kimlikler (artımlı kazımada atlanır)
+        self.known_digests = set()
+
+    def __len__(self):
+        return len(self.content_digests)
+
+    def add_known(self, digests):
+        self.known_digests.update(digests)
+
+    def reset_known(self, digests=()):
+        """Bilinen kimlikleri bu çalıştırmanınkilerle değiştir (tek atama: paylaşan parçalar boş küme görmez)"""
+        self.known_digests = set(digests)
+
+    def is_known(self, digest):
+        return digest in self.known_digests
+
+    def is_duplicate(self, record):
+        """Kayıt daha önce görüldüyse True; görülmediyse indekse ekler"""
+        if record.review_digest in self.recent_ids:
+            self.duplicate_count += 1
+            return True
+        digest = content_digest(record.text_original)
+        if digest in self.content_digests:
+            self.duplicate_count += 1
+            return True
+        self.recent_ids.append(record.review_digest)
+        self.content_digests.add(digest)
+        return False
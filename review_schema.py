@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yorum Tablosu Şeması
+Path: review_schema.py
+
+Temizleyicinin yüklediği ve dışa aktardığı yorum DataFrame'leri için açık şema. Varsayılan object
+sütunları yerine:
+1. Metin sütunları pyarrow string (yorum başına Python str nesnesi yok)
+2. İşletme kimliği ve kazıma zamanı kategori (dosya boyunca aynı birkaç değer tekrar eder)
+3. Puan nullable Int8, fotoğraf bayrağı nullable boolean, review_date datetime64
+4. Sabit sütun sırası: REVIEW_FIELDS, ardından türetilmiş sütunlar; bilinmeyen sütunlar sona eklenir
+
+Not: Yazar adları kategori yerine string tutulur; işletme başına yazarların çoğu tek yorum yazar
+(kategori sözlüğü küçülmez) ve temizlik adımları yazar sütununa yeni değerler atar.
+"""
+
+import json
+
+import pandas as pd
+
+from review_records import REVIEW_FIELDS
+from text_normalization import string_dtype
+
+# Sütun sırası: kazıma alanları + temizleyicinin türettiği sütunlar + bölümleme sütunları
+REVIEW_COLUMNS = REVIEW_FIELDS + ('review_date', 'text_length', 'business_id', 'scrape_date')
+
+STRING_COLUMNS = ('review_id', 'native_review_id', 'author_id', 'author_name', 'text_original', 'date',
+                  'business_reply', 'photos')
+CATEGORY_COLUMNS = ('business_id', 'scrape_date')
+
+# CSV'den metin olarak gelen bayrak değerleri
+_BOOLEAN_VALUES = {'true': True, 'false': False, '1': True, '0': False, '1.0': True, '0.0': False}
+
+
+def _to_string(series, dtype):
+    if series.dtype == object and series.map(lambda value: isinstance(value, (list, dict))).any():
+        # JSON girdisindeki fotoğraf listeleri CSV/Parquet'teki gibi JSON metni olarak saklanır
+        series = series.map(lambda value: json.dumps(value, ensure_ascii=False)
+                            if isinstance(value, (list, dict)) else value)
+    return series.astype(dtype)
+
+
+def _to_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    # Sayı olarak okunmuş kimlikler (CSV) diğer formatlarla aynı metin kategorilerine düşer
+    return series.where(series.isna(), series.astype(str)).astype('category')
+
+
+def _to_rating(series):
+    numeric = pd.to_numeric(series, errors='coerce')
+    # Int8'e sığmayan değerler eksik sayılır; 5 üzeri geçersiz puanlar clean_data'da raporlanır
+    return numeric.where(numeric.abs() <= 127).round().astype('Int8')
+
+
+def _to_boolean(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype('boolean')
+    flags = series.astype('string').str.strip().str.lower().map(_BOOLEAN_VALUES)
+    return flags.astype(object).where(flags.notna(), None).astype('boolean')
+
+
+def apply_review_schema(df, prefer_arrow=True):
+    """Yorum DataFrame'ini şemaya uydur (sadece var olan sütunlar dönüştürülür, sıra sabitlenir)"""
+    df = df.copy(deep=False)
+    text_dtype = string_dtype(prefer_arrow)
+    for column in STRING_COLUMNS:
+        if column in df.columns:
+            df[column] = _to_string(df[column], text_dtype)
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = _to_category(df[column])
+    if 'rating' in df.columns:
+        df['rating'] = _to_rating(df['rating'])
+    if 'has_photos' in df.columns:
+        df['has_photos'] = _to_boolean(df['has_photos'])
+    if 'review_date' in df.columns:
+        df['review_date'] = pd.to_datetime(df['review_date'], errors='coerce', format='ISO8601')
+    if 'text_length' in df.columns:
+        df['text_length'] = df['text_length'].astype('Int32')
+    ordered = [column for column in REVIEW_COLUMNS if column in df.columns]
+    return df[ordered + [column for column in df.columns if column not in REVIEW_COLUMNS]]
+
+
+def frame_records(df):
+    """DataFrame → sözlük listesi; eksik değerler (NA, NaN, NaT) None olur"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
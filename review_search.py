@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yorum Tam Metin Arama İndeksi
+Path: review_search.py
+
+Tüm yorum arşivi üzerinde SQLite FTS5 indeksi (CSV'leri pandas'a yükleyip str.contains yerine):
+1. İndekslenen metin normalize_review_text kurallarıyla hazırlanır; Türkçe ı/i farkı ve aksanlar
+   (ş, ç, ö, ü, ğ) ve Rusça ё/е katlanır, böylece "kotu" sorgusu "kötü" yorumlarını da bulur
+2. Artımlı güncelleme: scraper ve temizleyici yazdıkça yeni yorumlar eklenir, bilinen yorumlar
+   (review_key) güncellenir; temizleyicinin temiz metni kazıma metninin yerine geçer
+3. İşletme, puan aralığı ve tarih aralığı filtreleri; sonuçlar bm25 sırasıyla döner
+
+Kullanım:
+    python review_search.py index data/clean/*.csv data/raw/*.jsonl.gz
+    python review_search.py search "soğuk kahve" --business 85454152633 --max-rating 2 --since 2024-01-01
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+import argparse
+
+from review_aggregates import review_days, review_key
+from text_normalization import normalize_review_text
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    business_id TEXT NOT NULL,
+    review_key TEXT NOT NULL,
+    author_name TEXT,
+    rating INTEGER,
+    review_date TEXT,
+    date TEXT,
+    text_original TEXT,
+    UNIQUE (business_id, review_key)
+);
+CREATE INDEX IF NOT EXISTS reviews_business_date ON reviews (business_id, review_date);
+CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+    text, author,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+# search_text kuralları değişince artar; eski indeksler açılırken FTS tablosu yeniden oluşturulur
+SEARCH_TEXT_VERSION = 2
+
+# Sorgu sözdizimi: "tam ifade", önek*, -hariç
+_QUERY_TOKEN_RE = re.compile(r'(-?)"([^"]+)"|(-?)(\S+)')
+
+
+def search_text(text):
+    """İndekslenen/sorgulanan metin: normalize_review_text + ı/i ve ё/е katlaması
+    (Latin aksanları FTS5 tokenizer'ı remove_diacritics ile katlar)"""
+    if not text:
+        return ''
+    # İ, lower() ile "i" + birleşik nokta olur ve nokta kelime ayırıcı sayılır ("i stanbul");
+    # bu yüzden büyük İ/I normalize etmeden önce katlanır
+    text = text.replace('İ', 'i').replace('I', 'i')
+    # unicode61 tokenizer'ı bu harfleri katlamaz (str.replace, translate'ten hızlı)
+    return normalize_review_text(text).replace('ı', 'i').replace('ё', 'е')
+
+
+def build_match_query(query):
+    """Kullanıcı sorgusunu FTS5 MATCH ifadesine çevir (terimler AND ile birleşir)"""
+    include, exclude = [], []
+    for match in _QUERY_TOKEN_RE.finditer(query):
+        negate = match.group(1) or match.group(3)
+        raw = match.group(2) if match.group(2) is not None else match.group(4)
+        prefix = match.group(2) is None and raw.endswith('*')
+        text = search_text(raw)
+        if not text:
+            continue
+        term = f'"{text}"' + ('*' if prefix else '')
+        (exclude if negate else include).append(term)
+    if not include:
+        return None
+    expression = ' AND '.join(include)
+    for term in exclude:
+        expression += f' NOT {term}'
+    return expression
+
+
+def _rating(value):
+    try:
+        rating = int(round(float(value)))
+    except (TypeError, ValueError):
+        return None
+    return rating if 1 <= rating <= 5 else None
+
+
+class ReviewSearchIndex:
+    """SQLite FTS5 tabanlı artımlı yorum arama indeksi"""
+
+    def __init__(self, path=os.path.join('data', 'search.sqlite')):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SEARCH_TEXT_VERSION:
+            self.rebuild()
+
+    def rebuild(self):
+        """FTS tablosunu saklanan metinlerden güncel search_text kurallarıyla yeniden oluştur"""
+        with self.conn:
+            self.conn.execute("DELETE FROM reviews_fts")
+            rows = self.conn.execute("SELECT id, text_original, author_name FROM reviews")
+            self.conn.executemany("INSERT INTO reviews_fts (rowid, text, author) VALUES (?, ?, ?)",
+                                  ((row_id, search_text(text), search_text(author)) for row_id, text, author in rows))
+            self.conn.execute(f"PRAGMA user_version = {SEARCH_TEXT_VERSION}")
+        if self.count():
+            logger.info(f"🔎 Arama indeksi yeniden oluşturuldu ({self.count()} yorum)")
+
+    def close(self):
+        self.conn.close()
+
+    def _existing(self, business_id, keys):
+        """review_key → (id, text_original) (indekste olanlar)"""
+        existing = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT review_key, id, text_original FROM reviews WHERE business_id = ? "
+                f"AND review_key IN ({','.join('?' * len(chunk))})",
+                [business_id, *chunk]
+            )
+            existing.update((key, (row_id, text)) for key, row_id, text in rows)
+        return existing
+
+    def add(self, business_id, reviews, scrape_date=None):
+        """Yorum grubunu indekse ekle/güncelle. reviews: sözlük/ReviewRecord listesi veya DataFrame.
+        Dönüş: (eklenen, metni güncellenen) yorum sayısı."""
+        if hasattr(reviews, 'to_dict'):
+            from review_schema import frame_records
+            reviews = frame_records(reviews)
+        if not business_id or not len(reviews):
+            return 0, 0
+        business_id = str(business_id)
+        keyed = {}
+        for review in reviews:
+            keyed[review_key(review)] = review
+        keys = list(keyed)
+        days = review_days(list(keyed.values()), scrape_date)
+
+        added = updated = 0
+        with self.conn:
+            existing = self._existing(business_id, keys)
+            for key, day in zip(keys, days):
+                review = keyed[key]
+                text = review.get('text_original')
+                text = text if isinstance(text, str) else None
+                author = review.get('author_name')
+                author = author if isinstance(author, str) else None
+                values = (author, _rating(review.get('rating')), day, review.get('date'), text)
+                if key not in existing:
+                    row_id = self.conn.execute(
+                        "INSERT INTO reviews (business_id, review_key, author_name, rating, review_date, date, "
+                        "text_original) VALUES (?, ?, ?, ?, ?, ?, ?)", (business_id, key, *values)
+                    ).lastrowid
+                    self.conn.execute("INSERT INTO reviews_fts (rowid, text, author) VALUES (?, ?, ?)",
+                                      (row_id, search_text(text), search_text(author)))
+                    added += 1
+                    continue
+                row_id, old_text = existing[key]
+                self.conn.execute(
+                    "UPDATE reviews SET author_name = COALESCE(?, author_name), rating = COALESCE(?, rating), "
+                    "review_date = COALESCE(?, review_date), date = COALESCE(?, date), "
+                    "text_original = COALESCE(?, text_original) WHERE id = ?", (*values, row_id)
+                )
+                if text is not None and text != old_text:
+                    self.conn.execute("UPDATE reviews_fts SET text = ? WHERE rowid = ?", (search_text(text), row_id))
+                    updated += 1
+        return added, updated
+
+    def search(self, query, business_id=None, min_rating=None, max_rating=None, since=None, until=None,
+               limit=50, offset=0):
+        """Anahtar kelime araması (en alakalı önce). since/until: YYYY-MM-DD (review_date)"""
+        expression = build_match_query(query)
+        if expression is None:
+            return []
+        conditions = ["reviews_fts MATCH ?"]
+        params = [expression]
+        for clause, value in (("r.business_id = ?", str(business_id) if business_id else None),
+                              ("r.rating >= ?", min_rating), ("r.rating <= ?", max_rating),
+                              ("r.review_date >= ?", since), ("r.review_date <= ?", until)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        rows = self.conn.execute(
+            "SELECT r.business_id, r.review_key, r.author_name, r.rating, r.review_date, r.date, r.text_original, "
+            "bm25(reviews_fts) AS score FROM reviews_fts JOIN reviews r ON r.id = reviews_fts.rowid "
+            f"WHERE {' AND '.join(conditions)} ORDER BY score LIMIT ? OFFSET ?",
+            [*params, limit, offset]
+        )
+        columns = [column[0] for column in rows.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def count(self, business_id=None):
+        if business_id is None:
+            return self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM reviews WHERE business_id = ?",
+                                 (str(business_id),)).fetchone()[0]
+
+    def optimize(self):
+        """FTS segmentlerini birleştir (büyük toplu yüklemelerden sonra sorguları hızlandırır)"""
+        with self.conn:
+            self.conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('optimize')")
+
+
+def index_files(index, paths):
+    """Ham (.jsonl*/.json) ve temiz (.csv/.parquet) dosyaları indekse ekle; eklenen toplam yorum sayısı"""
+    import pandas as pd
+    from review_storage import is_jsonl_path, iter_review_batches, read_reviews_parquet
+
+    total = 0
+    for path in paths:
+        if is_jsonl_path(path):
+            header = {}
+            for batch in iter_review_batches(path, header=header):
+                added, _ = index.add(header.get('business_id'), batch, header.get('scrape_date'))
+                total += added
+            continue
+        if path.endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            frames = [(data.get('business_id'), data.get('reviews') or [], data.get('scrape_date'))]
+        else:
+            df = read_reviews_parquet(path) if path.endswith('.parquet') or os.path.isdir(path) else pd.read_csv(path)
+            if 'business_id' not in df.columns:
+                logger.warning(f"⚠️ business_id sütunu yok, atlandı: {path}")
+                continue
+            frames = [(business_id, group, None) for business_id, group in df.groupby('business_id')]
+        for business_id, reviews, scrape_date in frames:
+            added, _ = index.add(business_id, reviews, scrape_date)
+            total += added
+        logger.info(f"🔎 İndekslendi: {path}")
+    return total
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Yorum tam metin arama indeksi")
+    parser.add_argument('--index', default=os.path.join('data', 'search.sqlite'), help="İndeks veritabanı")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    index = sub.add_parser('index', help="Dosyaları indekse ekle")
+    index.add_argument('files', nargs='+', help="Ham (.jsonl/.jsonl.gz/.json) veya temiz (.csv/.parquet) dosyalar")
+
+    search = sub.add_parser('search', help="İndekste ara")
+    search.add_argument('query', help='Anahtar kelimeler ("tam ifade", önek*, -hariç)')
+    search.add_argument('--business', default=None)
+    search.add_argument('--min-rating', type=int, default=None)
+    search.add_argument('--max-rating', type=int, default=None)
+    search.add_argument('--since', default=None, help="YYYY-MM-DD")
+    search.add_argument('--until', default=None, help="YYYY-MM-DD")
+    search.add_argument('--limit', type=int, default=20)
+    search.add_argument('--json', action='store_true', help="Sonuçları JSON satırları olarak yaz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    index = ReviewSearchIndex(args.index)
+    try:
+        if args.command == 'index':
+            added = index_files(index, args.files)
+            index.optimize()
+            logger.info(f"✅ {added} yeni yorum indekslendi (toplam {index.count()})")
+            return
+        results = index.search(args.query, business_id=args.business, min_rating=args.min_rating,
+                               max_rating=args.max_rating, since=args.since, until=args.until, limit=args.limit)
+        for result in results:
+            if args.json:
+                print(json.dumps(result, ensure_ascii=False))
+                continue
+            rating = f"{result['rating']}⭐" if result['rating'] else "-"
+            print(f"[{result['business_id']}] {rating} {result['review_date'] or result['date'] or ''} "
+                  f"{result['author_name'] or ''}: {(result['text_original'] or '')[:200]}")
+        if not args.json:
+            print(f"🔎 {len(results)} sonuç")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
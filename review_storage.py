@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yorum Depolama Formatları
+Path: review_storage.py
+
+Scraper ve veri temizleyicinin ortak okuma/yazma katmanı:
+1. Sıkıştırılmış JSON Lines (NDJSON) - kanonik ham format
+2. Parquet (tek dosya) yazma/okuma
+3. business_id ve kazıma tarihine göre bölümlenmiş (partitioned) Parquet veri seti
+
+NDJSON formatı: her satır bir JSON kaydıdır. "_type": "business" alanı taşıyan satırlar
+işletme bilgilerini içeren başlık kayıtlarıdır (sonradan eklenen başlık öncekini günceller),
+diğer tüm satırlar birer yorumdur. .gz ve .zst uzantıları şeffaf şekilde sıkıştırılır.
+"""
+
+import io
+import os
+import gzip
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ['business_id', 'scrape_date']
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson', '.jsonl.gz', '.ndjson.gz', '.jsonl.zst', '.ndjson.zst')
+HEADER_TYPE = 'business'
+
+
+def is_jsonl_path(path):
+    """Dosya yolu (sıkıştırılmış olabilir) bir NDJSON dosyasını mı gösteriyor?"""
+    return str(path).lower().endswith(JSONL_EXTENSIONS)
+
+
+def jsonl_extension(compression='gz'):
+    """Sıkıştırma tipine göre NDJSON uzantısını döndür ('gz', 'zst' veya None)"""
+    return '.jsonl' + (f'.{compression}' if compression else '')
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd sıkıştırma desteği için zstandard gerekli: pip install zstandard") from e
+    return zstandard
+
+
+def open_jsonl(path, mode='r'):
+    """NDJSON dosyasını metin modunda aç; .gz/.zst uzantısına göre şeffaf sıkıştırma.
+
+    mode: 'r' (okuma), 'w' (yazma) veya 'a' (sona ekleme). gzip ve zstd ekleme modunda
+    yeni bir sıkıştırma çerçevesi açar; okuyucular tüm çerçeveleri art arda okur.
+    """
+    path = str(path)
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if path.endswith('.zst'):
+        zstandard = _zstandard()
+        raw = open(path, mode + 'b')
+        if mode == 'r':
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=6).stream_writer(raw)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def write_reviews_jsonl(path, reviews, header=None, append=False):
+    """Yorumları NDJSON olarak yaz. header verilirse yorumlardan önce başlık kaydı yazılır."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    count = 0
+    with open_jsonl(path, 'a' if append else 'w') as f:
+        if header is not None:
+            record = {'_type': HEADER_TYPE}
+            record.update({k: v for k, v in header.items() if k != 'reviews'})
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        for review in reviews:
+            f.write(json.dumps(review, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def iter_jsonl_records(path):
+    """NDJSON dosyasındaki kayıtları (başlık veya yorum) sırayla, sabit bellekle üret"""
+    with open_jsonl(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_review_batches(path, batch_size=10000, header=None, skip=0):
+    """NDJSON dosyasındaki yorumları listeler halinde üret.
+
+    header sözlüğü verilirse okunan başlık kayıtlarının alanları içine yazılır.
+    skip verilirse ilk skip yorum satırı JSON olarak ayrıştırılmadan atlanır (artımlı okuma).
+    """
+    batch = []
+    seen = 0
+    with open_jsonl(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            # Başlık satırları her zaman "_type" alanıyla başlar
+            if line.startswith('{"_type"'):
+                record = json.loads(line)
+                if record.get('_type') == HEADER_TYPE:
+                    if header is not None:
+                        header.update({k: v for k, v in record.items() if k != '_type'})
+                    continue
+            seen += 1
+            if seen <= skip:
+                continue
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def read_reviews_jsonl(path):
+    """NDJSON dosyasını eski JSON belge yapısına ({..., 'reviews': [...]}) çevirerek oku"""
+    header = {}
+    reviews = []
+    for batch in iter_review_batches(path, header=header):
+        reviews.extend(batch)
+    header['reviews'] = reviews
+    return header
+
+
+def _require_pyarrow():
+    """Parquet işlemleri için pyarrow kurulu mu kontrol et"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet desteği için pyarrow gerekli: pip install pyarrow") from e
+
+
+def with_partition_columns(df, business_id=None, scrape_date=None):
+    """Bölümleme sütunlarını (business_id, scrape_date=YYYY-MM-DD) DataFrame'e ekle"""
+    df = df.copy()
+    if 'business_id' not in df.columns or df['business_id'].isna().all():
+        df['business_id'] = str(business_id) if business_id is not None else 'unknown'
+    df['business_id'] = df['business_id'].astype(str)
+    if 'scrape_date' not in df.columns or df['scrape_date'].isna().all():
+        df['scrape_date'] = scrape_date
+    # Bölüm anahtarı olarak sadece gün kullanılır
+    df['scrape_date'] = df['scrape_date'].astype(object).fillna('unknown').astype(str).str.slice(0, 10)
+    return df
+
+
+def write_reviews_parquet(df, path, compression='zstd'):
+    """Yorumları tek bir Parquet dosyasına yaz"""
+    _require_pyarrow()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    df.to_parquet(path, engine='pyarrow', compression=compression, index=False)
+    return path
+
+
+def write_reviews_dataset(df, root_dir, business_id=None, scrape_date=None, compression='zstd'):
+    """Yorumları business_id=/scrape_date= klasörlerine bölümlenmiş Parquet veri setine ekle"""
+    _require_pyarrow()
+    df = with_partition_columns(df, business_id, scrape_date)
+    os.makedirs(root_dir, exist_ok=True)
+    # Varsayılan dosya adları benzersizdir; mevcut bölümlere yeni parça olarak eklenir
+    df.to_parquet(root_dir, engine='pyarrow', compression=compression, index=False,
+                  partition_cols=PARTITION_COLUMNS)
+    return root_dir
+
+
+def read_reviews_parquet(path, columns=None, filters=None):
+    """Parquet dosyası veya bölümlenmiş veri setini oku (sütun seçimi ve filtre desteğiyle)"""
+    _require_pyarrow()
+    import pandas as pd
+    df = pd.read_parquet(path, engine='pyarrow', columns=columns, filters=filters, memory_map=True)
+    # Bölüm sütunları kategori olarak gelir; diğer formatlarla tutarlı olması için string'e çevir
+    for col in PARTITION_COLUMNS:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    return df
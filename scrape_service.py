@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Yerel Kazıma Servisi (opsiyonel)
+Path: scrape_service.py
+
+Birden fazla aracın aynı işletmeler için ayrı tarayıcı açmaması için scraper'ı saran küçük HTTP servisi:
+1. Birleştirme (coalescing): aynı business_id için eşzamanlı istekler tek işe bağlanır
+2. TTL önbelleği: yakın zamanda kazınmış sonuçlar tarayıcı açılmadan döner (JSON bir kez serileştirilir)
+3. İlerleme akışı: /jobs/<id>/events satır başına bir JSON olay (queued, started, progress, done, error)
+4. Eşzamanlı tarayıcı sayısı sınırlı; refresh istekleri önce yorum sayısını yoklar
+
+Uç noktalar:
+    POST /scrape   {"business_id": "...", "url": "...", "max_reviews": 500, "force": false, "wait": false}
+    POST /refresh  (aynı gövde; yorum sayısı değişmediyse önbellekteki sonuç tazelenir)
+    GET  /jobs/<business_id>          iş durumu
+    GET  /jobs/<business_id>/events   ilerleme akışı (NDJSON)
+    GET  /results/<business_id>       önbellekteki sonuç (?reviews=0 ile yorumlar hariç)
+
+Kullanım:
+    python scrape_service.py --port 8765 --ttl 900 --concurrency 2
+"""
+
+import json
+import time
+import asyncio
+import logging
+import argparse
+import collections
+from datetime import datetime
+
+from structured_logging import configure_logging, log_context
+
+logger = logging.getLogger(__name__)
+
+# Yandex işletmeyi kimliğinden bulur; URL'deki isim kısmı yönlendirmeyle düzeltilir
+ORG_URL_TEMPLATE = "https://yandex.com.tr/maps/org/isletme/{business_id}/"
+# Akışta en fazla bu kadar yorumda bir ilerleme olayı
+PROGRESS_EVERY = 25
+TERMINAL_EVENTS = ('done', 'error')
+
+
+def _aiohttp_web():
+    try:
+        from aiohttp import web
+    except ImportError as e:
+        raise ImportError("Kazıma servisi için aiohttp gerekli: pip install aiohttp") from e
+    return web
+
+
+class ResultCache:
+    """business_id → (son kullanma zamanı, sonuç) TTL önbelleği; en fazla max_entries sonuç (LRU)"""
+
+    def __init__(self, ttl=900.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, business_id, max_reviews=None):
+        """Süresi dolmamış ve istenen yorum sayısını karşılayan sonuç, yoksa None"""
+        entry = self.entries.get(business_id)
+        if entry is None or entry[0] < time.monotonic():
+            self.entries.pop(business_id, None)
+            self.misses += 1
+            return None
+        result = entry[1]
+        if not result.covers(max_reviews):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(business_id)
+        self.hits += 1
+        return result
+
+    def peek(self, business_id):
+        """Süresi dolmamış sonuç (yorum sayısı koşulu olmadan), yoksa None"""
+        entry = self.entries.get(business_id)
+        return entry[1] if entry is not None and entry[0] >= time.monotonic() else None
+
+    def put(self, business_id, result):
+        self.entries[business_id] = (time.monotonic() + self.ttl, result)
+        self.entries.move_to_end(business_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def touch(self, business_id):
+        """Yorum sayısı değişmediğinde sonucun süresini uzat; sonuç yoksa False"""
+        entry = self.entries.get(business_id)
+        if entry is None:
+            return False
+        self.put(business_id, entry[1])
+        return True
+
+
+class ScrapeResult:
+    """Önbellekteki sonuç: yanıt gövdeleri bir kez serileştirilir"""
+
+    def __init__(self, data, max_reviews=None):
+        from review_records import records_to_dicts
+
+        reviews = data.get('reviews') or []
+        self.max_reviews = max_reviews
+        # Sitedeki tüm yorumlar çekildiyse daha büyük limitli istekleri de karşılar
+        self.complete = max_reviews is None or len(reviews) < max_reviews
+        summary = {key: value for key, value in data.items() if key != 'reviews'}
+        summary['cached_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.summary = summary
+        self.body = json.dumps(dict(summary, reviews=list(records_to_dicts(reviews))),
+                               ensure_ascii=False, default=str).encode('utf-8')
+        self.summary_body = json.dumps(summary, ensure_ascii=False, default=str).encode('utf-8')
+
+    def covers(self, max_reviews):
+        return self.complete or _limit_covers(self.max_reviews, max_reviews)
+
+
+def _limit_covers(limit, max_reviews):
+    """limit yorumluk bir kazıma max_reviews yorumluk isteği karşılar mı (None: tümü)"""
+    return limit is None or (max_reviews is not None and max_reviews <= limit)
+
+
+class ScrapeJob:
+    """Bir işletme için yürüyen iş: olay geçmişi ve abonelere dağıtım"""
+
+    def __init__(self, business_id, kind, url, max_reviews):
+        self.business_id = business_id
+        self.kind = kind
+        self.url = url
+        self.max_reviews = max_reviews
+        self.created_at = time.time()
+        self.future = asyncio.get_running_loop().create_future()
+        self.events = []
+        self.last_progress = None
+        self.subscribers = set()
+        self.waiters = 0
+
+    def publish(self, event, **fields):
+        entry = dict(fields, event=event, business_id=self.business_id, kind=self.kind,
+                     elapsed=round(time.time() - self.created_at, 1))
+        # İlerleme olayları geçmişte birikmez; geç abone sadece sonuncusunu görür
+        if event == 'progress':
+            self.last_progress = entry
+        else:
+            self.events.append(entry)
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(entry)
+
+    def history(self):
+        events = list(self.events)
+        if self.last_progress and not any(e['event'] in TERMINAL_EVENTS for e in events):
+            events.append(self.last_progress)
+        return events
+
+    def status(self):
+        last = self.history()[-1] if self.events else None
+        return {
+            'business_id': self.business_id,
+            'kind': self.kind,
+            'max_reviews': self.max_reviews,
+            'state': last['event'] if last else 'queued',
+            'reviews': (self.last_progress or {}).get('reviews', 0),
+            'waiters': self.waiters,
+            'elapsed': round(time.time() - self.created_at, 1)
+        }
+
+    async def stream(self):
+        """Geçmiş olaylar + iş bitene kadar yeni olaylar"""
+        subscriber = asyncio.Queue()
+        self.subscribers.add(subscriber)
+        try:
+            for entry in self.history():
+                yield entry
+                if entry['event'] in TERMINAL_EVENTS:
+                    return
+            while True:
+                entry = await subscriber.get()
+                yield entry
+                if entry['event'] in TERMINAL_EVENTS:
+                    return
+        finally:
+            self.subscribers.discard(subscriber)
+
+
+class ScrapeService:
+    """İstek birleştirme + TTL önbelleği + sınırlı eşzamanlı tarayıcı"""
+
+    def __init__(self, config=None, ttl=900.0, concurrency=2, default_max_reviews=2000,
+                 url_template=ORG_URL_TEMPLATE, save_results=True):
+        from pagination_scraper import ScraperConfig
+
+        self.config = config or ScraperConfig(interactive=False)
+        self.cache = ResultCache(ttl)
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.default_max_reviews = default_max_reviews
+        self.url_template = url_template
+        self.save_results = save_results
+        self.jobs = {}
+        # Yürüyen işi karşılamayan istekler için, o iş bitince başlayacak tek bekleyen iş
+        self.queued = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'jobs': 0}
+
+    def request(self, business_id, kind='scrape', url=None, max_reviews=None, force=False):
+        """(önbellekteki sonuç, None) veya (None, yürüyen/yeni iş)"""
+        self.stats['requests'] += 1
+        if max_reviews is None:
+            max_reviews = self.default_max_reviews
+        max_reviews = max_reviews or None  # 0 / 'all' → tüm yorumlar
+        if not force and kind == 'scrape':
+            cached = self.cache.get(business_id, max_reviews)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached, None
+        running = self.jobs.get(business_id)
+        # Yürüyen iş istenen limiti karşılıyorsa ona bağlan (refresh, yürüyen tam kazımayı da bekleyebilir;
+        # scrape ise refresh'in döndürdüğü sadece yeni yorumlarla yetinemez)
+        if running is not None and (running.kind == kind or kind == 'refresh') \
+                and _limit_covers(running.max_reviews, max_reviews):
+            return None, self._join(running)
+        queued = self.queued.get(business_id)
+        if queued is not None:
+            # Henüz başlamamış iş, bağlanan isteklerin hepsini karşılayacak şekilde genişletilir
+            if kind == 'scrape':
+                queued.kind = 'scrape'
+            if not _limit_covers(queued.max_reviews, max_reviews):
+                queued.max_reviews = max_reviews
+            return None, self._join(queued)
+        job = ScrapeJob(business_id, kind, url or self.url_template.format(business_id=business_id), max_reviews)
+        job.waiters = 1
+        self.stats['jobs'] += 1
+        job.publish('queued')
+        if running is not None:
+            # Yürüyen iş ezilmez (ikinci tarayıcı açılmaz); yenisi o bitince başlar
+            self.queued[business_id] = job
+        else:
+            self.jobs[business_id] = job
+        asyncio.create_task(self._run(job, after=running))
+        return None, job
+
+    def _join(self, job):
+        job.waiters += 1
+        self.stats['coalesced'] += 1
+        return job
+
+    def job(self, business_id):
+        """Yürüyen, yoksa sırada bekleyen iş"""
+        return self.jobs.get(business_id) or self.queued.get(business_id)
+
+    async def _run(self, job, after=None):
+        try:
+            if after is not None:
+                await asyncio.wait([after.future])
+                self.queued.pop(job.business_id, None)
+                self.jobs[job.business_id] = job
+                cached = self.cache.get(job.business_id, job.max_reviews) if job.kind == 'scrape' else None
+                if cached is not None:
+                    # Önceki iş bu isteği de karşılayan bir sonuç bıraktıysa tarayıcı açılmaz
+                    job.publish('done', reviews=cached.summary.get('scraped_review_count', 0), unchanged=False)
+                    job.future.set_result(cached)
+                    return
+            async with self.semaphore:
+                with log_context(business_id=job.business_id, phase=f'service:{job.kind}'):
+                    job.publish('started')
+                    data = await (self._refresh(job) if job.kind == 'refresh' else self._scrape(job))
+            if data.get('unchanged') and self.cache.touch(job.business_id):
+                result = self.cache.entries[job.business_id][1]
+            else:
+                result = ScrapeResult(data, job.max_reviews)
+                if data.get('incremental'):
+                    # Sadece yeni yorumlar geldi: tam sonuç gibi önbelleğe yazılmaz, eski tam sonuç da artık eksik
+                    self.cache.entries.pop(job.business_id, None)
+                elif data.get('business_id') and not data.get('unchanged'):
+                    self.cache.put(job.business_id, result)
+            job.publish('done', reviews=data.get('scraped_review_count', 0), unchanged=bool(data.get('unchanged')))
+            job.future.set_result(result)
+        except Exception as e:
+            logger.error(f"💥 {job.business_id} servis işi başarısız: {e}")
+            job.publish('error', error=str(e))
+            job.future.set_exception(e)
+            # Bekleyen yoksa "hiç alınmadı" uyarısı basılmasın
+            job.future.exception()
+        finally:
+            if self.jobs.get(job.business_id) is job:
+                del self.jobs[job.business_id]
+
+    def _scraper(self):
+        from pagination_scraper import YandexMapsScraper
+
+        return YandexMapsScraper(self.config)
+
+    async def _scrape(self, job):
+        """iter_reviews ile kazı; ilerleme olayları yorum geldikçe yayınlanır"""
+        scraper = self._scraper()
+        reviews = []
+        async for review in scraper.iter_reviews(job.url, max_reviews=job.max_reviews):
+            reviews.append(review)
+            if len(reviews) % PROGRESS_EVERY == 0:
+                job.publish('progress', reviews=len(reviews), total=scraper.total_reviews or None)
+        scraper.update_aggregates(reviews)
+        scraper.update_search_index(reviews)
+        data = {
+            'business_id': scraper.business_id,
+            'business_name': scraper.business_name,
+            'reviews': reviews,
+            'total_review_count': scraper.total_reviews,
+            'total_review_count_confidence': scraper.total_reviews_confidence,
+            'scraped_review_count': len(reviews),
+            'scrape_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'scrape_url': job.url
+        }
+        if self.save_results:
+            await scraper.save_to_files(data, f"yandex_reviews_{job.business_id}")
+        return data
+
+    async def _refresh(self, job):
+        scraper = self._scraper()
+        data = await scraper.scrape_if_changed(job.url, max_reviews=job.max_reviews)
+        if data.get('error'):
+            raise RuntimeError(data['error'])
+        if self.save_results and not data.get('unchanged'):
+            await scraper.save_to_files(data, f"yandex_reviews_{job.business_id}")
+        return data
+
+
+def create_app(service):
+    """aiohttp uygulaması"""
+    web = _aiohttp_web()
+
+    def result_response(result, include_reviews=True, cached=False):
+        return web.Response(body=result.body if include_reviews else result.summary_body,
+                            content_type='application/json', headers={'X-Cache': 'HIT' if cached else 'MISS'})
+
+    async def handle_request(request, kind):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({'error': "Geçersiz JSON gövdesi"}, status=400)
+        business_id = str(body.get('business_id') or '')
+        if not business_id.isdigit():
+            return web.json_response({'error': "Sayısal business_id gerekli"}, status=400)
+        cached, job = service.request(business_id, kind, url=body.get('url'), max_reviews=body.get('max_reviews'),
+                                      force=bool(body.get('force')))
+        include_reviews = body.get('reviews', True)
+        if cached is not None:
+            return result_response(cached, include_reviews, cached=True)
+        if not body.get('wait'):
+            return web.json_response(job.status(), status=202)
+        try:
+            result = await asyncio.shield(job.future)
+        except Exception as e:
+            return web.json_response({'error': str(e), 'business_id': business_id}, status=502)
+        return result_response(result, include_reviews)
+
+    async def scrape(request):
+        return await handle_request(request, 'scrape')
+
+    async def refresh(request):
+        return await handle_request(request, 'refresh')
+
+    async def job_status(request):
+        job = service.job(request.match_info['business_id'])
+        if job is None:
+            return web.json_response({'error': "Yürüyen iş yok"}, status=404)
+        return web.json_response(job.status())
+
+    async def job_events(request):
+        job = service.job(request.match_info['business_id'])
+        if job is None:
+            return web.json_response({'error': "Yürüyen iş yok"}, status=404)
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        async for entry in job.stream():
+            await response.write(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n')
+        await response.write_eof()
+        return response
+
+    async def result(request):
+        cached = service.cache.peek(request.match_info['business_id'])
+        if cached is None:
+            return web.json_response({'error': "Önbellekte sonuç yok"}, status=404)
+        return result_response(cached, request.query.get('reviews') != '0', cached=True)
+
+    async def stats(request):
+        return web.json_response(dict(service.stats, cached_results=len(service.cache.entries),
+                                      running_jobs=len(service.jobs),
+                                      queued_jobs=len(service.queued)))
+
+    app = web.Application()
+    app.router.add_post('/scrape', scrape)
+    app.router.add_post('/refresh', refresh)
+    app.router.add_get('/jobs/{business_id}', job_status)
+    app.router.add_get('/jobs/{business_id}/events', job_events)
+    app.router.add_get('/results/{business_id}', result)
+    app.router.add_get('/stats', stats)
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Yerel Yandex Maps kazıma servisi")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ttl', type=float, default=900.0, help="Sonuç önbelleği süresi (sn)")
+    parser.add_argument('--concurrency', type=int, default=2, help="Aynı anda en fazla tarayıcı")
+    parser.add_argument('--max-reviews', type=int, default=2000, help="İstekte belirtilmezse (0: tümü)")
+    parser.add_argument('--output-dir', default='data')
+    parser.add_argument('--no-save', action='store_true', help="Sonuçları dosyaya yazma, sadece önbellekte tut")
+    parser.add_argument('--log-file', default='scrape_service.log', help="Log dosyası ('' ile kapatılır)")
+    parser.add_argument('--log-json', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from pagination_scraper import ScraperConfig
+
+    web = _aiohttp_web()
+    args = parse_args(argv)
+    configure_logging(args.log_file or None, json_format=args.log_json)
+
+    async def build_app():
+        # Semafor ve işler uygulamanın olay döngüsünde oluşturulur
+        service = ScrapeService(ScraperConfig(interactive=False, output_dir=args.output_dir), ttl=args.ttl,
+                                concurrency=args.concurrency, default_max_reviews=args.max_reviews,
+                                save_results=not args.no_save)
+        logger.info(f"🛰️ Kazıma servisi: http://{args.host}:{args.port} (TTL {args.ttl:.0f} sn, "
+                    f"{args.concurrency} tarayıcı)")
+        return create_app(service)
+
+    web.run_app(build_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Arama Sonuçlarından İşletme Keşfi
+Path: search_discovery.py
+
+Bir arama sorgusu (ve isteğe bağlı şehir / koordinat kutusu) için Yandex Haritalar sonuç listesini
+kaydırır, işletme (org) kimliklerini ve değerlendirme sayılarını tek bir page.evaluate çağrısıyla
+toplu çıkarır ve bulunan işletmeleri beklenen maliyete göre sıralayıp çoklu işletme scraper'ına verir.
+
+Örnek:
+    python search_discovery.py "kafe" --city İstanbul --max-results 50 --scrape --concurrency 2
+    python search_discovery.py --fixture fixtures/search_results.html
+"""
+
+import os
+import re
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from urllib.parse import quote, urljoin
+
+logger = logging.getLogger(__name__)
+
+ORG_URL_PATTERN = re.compile(r'/org/([^/?#]+)/(\d+)')
+# "2,4 тыс.", "1.2K", "3 bin" gibi kısaltmalar
+_COUNT_PATTERN = re.compile(r'(\d[\d\s  ]*(?:[.,]\d+)?)\s*(тыс|bin|k\b)?', re.IGNORECASE)
+
+# Sonuç panelindeki her kartın ham alanlarını tek seferde topla; ayrıştırma Python tarafında yapılır
+EXTRACT_RESULTS_JS = """
+() => {
+    const text = (root, selector) => {
+        const el = root.querySelector(selector);
+        return el ? el.textContent.trim() : null;
+    };
+    return Array.from(document.querySelectorAll('.search-snippet-view')).map(card => {
+        const link = card.querySelector('a[href*="/org/"]');
+        return {
+            href: link ? link.getAttribute('href') : null,
+            name: text(card, '.search-business-snippet-view__title, .search-snippet-view__title'),
+            category: text(card, '.search-business-snippet-view__category'),
+            address: text(card, '.search-business-snippet-view__address'),
+            rating_text: text(card, '.business-rating-badge-view__rating-text'),
+            count_text: text(card, '.business-rating-amount-view'),
+            advert: !!card.querySelector('._advert')
+        };
+    });
+}
+"""
+
+# Sonuç listesini sonuna kadar kaydır; yeni kaydırma yüksekliğini döndür
+SCROLL_RESULTS_JS = """
+() => {
+    const container = document.querySelector('.search-list-view .scroll__container')
+        || document.querySelector('.scroll__container');
+    if (!container) return null;
+    container.scrollTop = container.scrollHeight;
+    return container.scrollHeight;
+}
+"""
+
+
+def build_search_url(query, city=None, bbox=None, base_url="https://yandex.com.tr/maps"):
+    """Arama URL'si oluştur. bbox: (min_lon, min_lat, max_lon, max_lat)"""
+    text = f"{query} {city}" if city else query
+    url = f"{base_url}/?text={quote(text)}"
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        url += f"&bbox={min_lon},{min_lat}~{max_lon},{max_lat}"
+    return url
+
+
+def parse_count(text):
+    """'1 245 değerlendirme', '(8 312)', '2,4 тыс. оценок' gibi metinlerden sayıyı çıkar"""
+    if not text:
+        return None
+    match = _COUNT_PATTERN.search(text)
+    if not match:
+        return None
+    number = re.sub(r'[\s  ]', '', match.group(1))
+    if match.group(2):
+        return int(round(float(number.replace(',', '.')) * 1000))
+    return int(re.sub(r'\D', '', number))
+
+
+def parse_rating(text):
+    """'4,6' / '4.6' puan metnini float'a çevir"""
+    if not text:
+        return None
+    match = re.search(r'\d+(?:[.,]\d+)?', text)
+    return float(match.group(0).replace(',', '.')) if match else None
+
+
+def parse_search_results(raw_cards, base_url="https://yandex.com.tr/maps"):
+    """EXTRACT_RESULTS_JS çıktısını işletme kayıtlarına çevir (org bağlantısı olmayanlar atlanır)"""
+    results = []
+    for card in raw_cards:
+        match = ORG_URL_PATTERN.search(card.get('href') or '')
+        if not match:
+            continue
+        slug, org_id = match.groups()
+        results.append({
+            'business_id': org_id,
+            'name': card.get('name'),
+            'url': urljoin(base_url + '/', f"org/{slug}/{org_id}/"),
+            'category': card.get('category'),
+            'address': card.get('address'),
+            'rating': parse_rating(card.get('rating_text')),
+            'review_count': parse_count(card.get('count_text')),
+            'advert': bool(card.get('advert'))
+        })
+    return results
+
+
+def merge_results(found, results):
+    """Yeni kartları business_id → kayıt sözlüğüne ekle; reklam kartı yerine organik kartın bilgileri tercih edilir"""
+    for result in results:
+        current = found.get(result['business_id'])
+        if current is None or (current['advert'] and not result['advert']):
+            found[result['business_id']] = result
+    return found
+
+
+def expected_cost(result, max_reviews=None, default_count=100):
+    """İşletmeyi kazımanın beklenen maliyeti (çekilecek yorum sayısı)"""
+    count = result.get('review_count')
+    if count is None:
+        count = default_count
+    return min(count, max_reviews) if max_reviews else count
+
+
+def order_by_cost(results, max_reviews=None):
+    """En pahalı işletmeler önce: paralel çalıştırmada en uzun işler başta başlar, toplam süre kısalır"""
+    return sorted(results, key=lambda r: expected_cost(r, max_reviews), reverse=True)
+
+
+class SearchDiscovery:
+    """Açık bir Playwright sayfası üzerinde arama sonuçlarını toplar"""
+
+    def __init__(self, page, base_url="https://yandex.com.tr/maps"):
+        self.page = page
+        self.base_url = base_url
+
+    async def collect_visible(self):
+        """Sayfadaki tüm sonuç kartlarını tek evaluate çağrısıyla oku"""
+        raw_cards = await self.page.evaluate(EXTRACT_RESULTS_JS)
+        return parse_search_results(raw_cards, self.base_url)
+
+    async def discover(self, query=None, city=None, bbox=None, max_results=200, max_scrolls=50,
+                       idle_rounds=3, scroll_delay=1.5):
+        """Sorguyu aç, liste bitene kadar kaydır ve tekil işletmeleri döndür.
+
+        query verilmezse sayfa zaten açık kabul edilir (ör. yerel fixture).
+        """
+        if query:
+            url = build_search_url(query, city, bbox, self.base_url)
+            logger.info(f"🔎 Arama sonuçları açılıyor: {url}")
+            await self.page.goto(url)
+            await self.page.wait_for_load_state('networkidle')
+
+        found = {}
+        idle = 0
+        for _ in range(max_scrolls):
+            before = len(found)
+            merge_results(found, await self.collect_visible())
+            logger.info(f"📋 Bulunan işletme sayısı: {len(found)}")
+            if len(found) >= max_results:
+                break
+            idle = idle + 1 if len(found) == before else 0
+            if idle >= idle_rounds:
+                break
+            if await self.page.evaluate(SCROLL_RESULTS_JS) is None:
+                break
+            await asyncio.sleep(scroll_delay)
+        return list(found.values())[:max_results]
+
+
+async def run_fixture(fixture_path, expected_path=None):
+    """Keşif çıkarımını yerel bir sonuç paneli kopyası üzerinde çalıştır ve beklenen çıktıyla karşılaştır"""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto('file://' + os.path.abspath(fixture_path))
+        results = await SearchDiscovery(page).discover(max_scrolls=1, scroll_delay=0)
+        await browser.close()
+
+    ordered = order_by_cost(results)
+    print(json.dumps(ordered, ensure_ascii=False, indent=2))
+    expected_path = expected_path or os.path.splitext(fixture_path)[0] + '.expected.json'
+    if os.path.exists(expected_path):
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        if ordered != expected:
+            logger.error(f"❌ Fixture çıktısı beklenenden farklı: {expected_path}")
+            return False
+        logger.info(f"✅ Fixture çıktısı beklenenle aynı ({len(ordered)} işletme)")
+    return True
+
+
+async def run_discovery(args):
+    """Sorguyu çalıştır, sonuçları kaydet ve istenirse işletmeleri kazı"""
+    from pagination_scraper import ScraperConfig, YandexMapsScraper, scrape_multiple_businesses
+
+    # Terminalden çalıştırıldığında sonuç sayfasındaki CAPTCHA elle çözülebilir
+    scraper = YandexMapsScraper(ScraperConfig(interactive=sys.stdin.isatty()))
+    await scraper.start_browser()
+    try:
+        discovery = SearchDiscovery(scraper.page, scraper.base_url)
+        await discovery.page.goto(build_search_url(args.query, args.city, args.bbox, scraper.base_url))
+        await discovery.page.wait_for_load_state('networkidle')
+        await scraper.check_and_handle_captcha()
+        discovery.page = scraper.page
+        results = await discovery.discover(max_results=args.max_results, max_scrolls=args.max_scrolls)
+    finally:
+        await scraper.close()
+
+    ordered = order_by_cost(results, args.max_reviews)
+    os.makedirs(args.output_dir, exist_ok=True)
+    slug = re.sub(r'\W+', '_', f"{args.query} {args.city or ''}".strip()).strip('_').lower()
+    output_path = os.path.join(args.output_dir,
+                               f"discovery_{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'query': args.query,
+            'city': args.city,
+            'bbox': args.bbox,
+            'discovered_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'results': ordered
+        }, f, ensure_ascii=False, indent=2)
+    logger.info(f"💾 {len(ordered)} işletme kaydedildi: {output_path}")
+
+    if args.scrape and ordered:
+        await scrape_multiple_businesses(ordered, max_reviews=args.max_reviews, concurrency=args.concurrency)
+    return ordered
+
+
+def parse_bbox(value):
+    parts = [float(p) for p in re.split(r'[,~]', value)]
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("bbox formatı: min_lon,min_lat,max_lon,max_lat")
+    return tuple(parts)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Yandex Haritalar arama sonuçlarından işletmeleri keşfet ve kazı")
+    parser.add_argument('query', nargs='?', help="Arama sorgusu (ör. 'kafe')")
+    parser.add_argument('--city', default=None, help="Şehir adı (sorguya eklenir)")
+    parser.add_argument('--bbox', type=parse_bbox, default=None,
+                        help="Koordinat kutusu: min_lon,min_lat,max_lon,max_lat")
+    parser.add_argument('--max-results', type=int, default=200, help="En fazla kaç işletme toplanacak")
+    parser.add_argument('--max-scrolls', type=int, default=50, help="Sonuç listesinde en fazla kaydırma sayısı")
+    parser.add_argument('--output-dir', default=os.path.join('data', 'discovery'), help="Keşif sonuçlarının klasörü")
+    parser.add_argument('--scrape', action='store_true', help="Bulunan işletmelerin yorumlarını da çek")
+    parser.add_argument('--max-reviews', type=int, default=None, help="İşletme başına en fazla yorum")
+    parser.add_argument('--concurrency', type=int, default=2, help="Aynı anda kazınacak işletme sayısı")
+    parser.add_argument('--fixture', default=None,
+                        help="Canlı site yerine yerel sonuç paneli HTML'i üzerinde çıkarımı doğrula")
+    args = parser.parse_args(argv)
+    if not args.query and not args.fixture:
+        parser.error("arama sorgusu veya --fixture gerekli")
+    return args
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    if args.fixture:
+        if not asyncio.run(run_fixture(args.fixture)):
+            raise SystemExit(1)
+        return
+    asyncio.run(run_discovery(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Bloklamayan Yapısal Loglama
+Path: structured_logging.py
+
+Log çağrısı yapan kod (olay döngüsü) diske yazmayı beklemez: kök logger'a sadece bir QueueHandler
+bağlanır, dosya/konsol yazımı QueueListener iş parçacığında yapılır.
+1. Bağlam alanları (job_id, business_id, phase) contextvars ile taşınır; her asyncio görevi kendi
+   kopyasını görür, eşzamanlı oturumların logları karışmaz.
+2. JSON formatı: satır başına bir kayıt (ts, level, logger, msg + bağlam alanları + extra alanlar).
+3. İş başına log dosyası: JobFileHandler kayıtları job_id'ye göre ayrı dosyalara yazar.
+4. Örnekleme: LogSampler, yorum başına tekrarlanan mesajları anahtar başına belli aralıkla sınırlar.
+
+Örnek:
+    listener = configure_logging("scraper.log", json_format=True, job_log_dir="data/logs/jobs")
+    with log_context(job_id=12, business_id="85454152633"):
+        ...
+"""
+
+import os
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+import logging.handlers
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+CONTEXT_FIELDS = ('job_id', 'business_id', 'phase')
+_CONTEXT = {name: contextvars.ContextVar(name, default=None) for name in CONTEXT_FIELDS}
+# LogRecord'un standart öznitelikleri (JSON'da extra alan olarak tekrar yazılmaz)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+_listener = None
+_atexit_registered = False
+
+
+def set_log_context(**fields):
+    """Geçerli görevin (veya iş parçacığının) bağlam alanlarını ayarla; reset için token'ları döndür"""
+    return {name: _CONTEXT[name].set(value) for name, value in fields.items()}
+
+
+def reset_log_context(tokens):
+    for name, token in tokens.items():
+        _CONTEXT[name].reset(token)
+
+
+@contextmanager
+def log_context(**fields):
+    """Blok boyunca bağlam alanları (iç içe kullanılabilir)"""
+    tokens = set_log_context(**fields)
+    try:
+        yield
+    finally:
+        reset_log_context(tokens)
+
+
+class ContextFilter(logging.Filter):
+    """Bağlam alanlarını kayda ekler (log çağıran görevde çalışır, kuyruğa girmeden önce)"""
+
+    def filter(self, record):
+        for name, var in _CONTEXT.items():
+            if getattr(record, name, None) is None:
+                setattr(record, name, var.get())
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Mesajı çağıran tarafta birleştirir; istisna metni mesaja gömülmez, ayrı alan olarak kalır"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Satır başına bir JSON kaydı"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class JobFileHandler(logging.Handler):
+    """job_id taşıyan kayıtları <directory>/job_<job_id>.log dosyalarına yazar"""
+
+    def __init__(self, directory, max_open_files=32):
+        super().__init__()
+        self.directory = directory
+        self.max_open_files = max_open_files
+        self.files = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def emit(self, record):
+        job_id = getattr(record, 'job_id', None)
+        if job_id is None:
+            return
+        try:
+            stream = self.files.get(job_id)
+            if stream is None:
+                if len(self.files) >= self.max_open_files:
+                    # En eski açılan dosyayı kapat (dict ekleme sırasını korur)
+                    self.files.pop(next(iter(self.files))).close()
+                path = os.path.join(self.directory, f"job_{job_id}.log")
+                stream = self.files[job_id] = open(path, 'a', encoding='utf-8')
+            stream.write(self.format(record) + '\n')
+            stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            for stream in self.files.values():
+                stream.close()
+            self.files.clear()
+        finally:
+            self.release()
+        super().close()
+
+
+class LogSampler:
+    """Anahtar başına en fazla `interval` saniyede bir log izni; aradaki bastırılan mesajları sayar"""
+
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self.last = {}
+        self.suppressed = {}
+        self.lock = threading.Lock()
+
+    def allow(self, key):
+        """(izin var mı, son izinden beri bastırılan mesaj sayısı)"""
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last.get(key, float('-inf')) >= self.interval:
+                self.last[key] = now
+                return True, self.suppressed.pop(key, 0)
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False, 0
+
+    def log(self, logger, level, key, message, *args, **kwargs):
+        """İzin varsa logla; bastırılan sayı kayda 'suppressed' alanı olarak eklenir"""
+        if not logger.isEnabledFor(level):
+            return
+        allowed, suppressed = self.allow(key)
+        if not allowed:
+            return
+        if suppressed:
+            message = f"{message} (+{suppressed} benzer mesaj bastırıldı)"
+        extra = dict(kwargs.pop('extra', None) or {}, sample_key=key, suppressed=suppressed)
+        logger.log(level, message, *args, extra=extra, **kwargs)
+
+
+def configure_logging(log_file="scraper.log", level=logging.INFO, json_format=False, console=True,
+                      job_log_dir=None):
+    """Kök logger'ı QueueHandler → QueueListener (arka plan iş parçacığı) olarak kur.
+
+    json_format=True ise dosya ve iş dosyaları JSON satırları yazar (konsol okunabilir kalır).
+    Dönüş: QueueListener (çıkışta otomatik durdurulur; stop_logging ile elle de durdurulabilir).
+    """
+    global _listener, _atexit_registered
+    stop_logging()
+    text_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_formatter = JsonFormatter() if json_format else text_formatter
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(text_formatter)
+        handlers.append(console_handler)
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(file_formatter)
+        handlers.append(file_handler)
+    if job_log_dir:
+        job_handler = JobFileHandler(job_log_dir)
+        job_handler.setFormatter(file_formatter)
+        handlers.append(job_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    if not _atexit_registered:
+        atexit.register(stop_logging)
+        _atexit_registered = True
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Kuyruktaki kayıtları yazıp dinleyiciyi durdur"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
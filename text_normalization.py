@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Yandex Maps - Ortak Metin Normalizasyon Kuralları
+Path: text_normalization.py
+
+Scraper ve veri temizleyicinin paylaştığı metin kuralları:
+1. Arayüzden sızan gereksiz metinler (Abone ol, Varsayılan, ...)
+2. Tekrar kontrolü için normalize edilmiş metin üretimi
+3. Aynı kuralların pandas Series üzerinde vektörel uygulanması
+"""
+
+import re
+
+# Scraper'ın yorum gövdesinden çıkardığı arayüz metinleri
+SCRAPER_NOISE_TEXTS = [
+    "Varsayılan", "Default", "Abone ol", "Subscribe", "Follow",
+    "seviye şehir uzmanı", "level local guide", "yerel rehber",
+    "Yanıtla", "Reply", "Beğen", "Like", "Share", "Paylaş"
+]
+
+# Temizleyicinin kayıtlı yorum metinlerinden çıkardığı arayüz metinleri
+CLEANER_NOISE_TEXTS = ["Abone ol", "Subscribe", "Varsayılan", "Default", "Deneyimini paylaş"]
+
+MONTH_NAMES = [
+    'ocak', 'şubat', 'mart', 'nisan', 'mayıs', 'haziran', 'temmuz', 'ağustos',
+    'eylül', 'ekim', 'kasım', 'aralık',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august',
+    'september', 'october', 'november', 'december'
+]
+
+
+# pyarrow (RE2) ve Python re motorlarında aynı davranan boşluk sınıfı
+SPACE_CLASS = r'[\s\xa0]'
+
+
+def _noise_alternative(text):
+    """Tek bir gereksiz metin için motor bağımsız regex parçası üret"""
+    body = (SPACE_CLASS + '+').join(re.escape(part) for part in text.split())
+    # \b sadece ASCII harf/rakam kenarlarında iki motorda da aynı çalışır
+    if text[0].isascii() and text[0].isalnum():
+        body = r'\b' + body
+    if text[-1].isascii() and text[-1].isalnum():
+        body = body + r'\b'
+    return body
+
+
+def build_noise_regex(texts):
+    """Metin listesinden tek bir regex deseni (string) üret"""
+    alternatives = sorted((_noise_alternative(text) for text in texts), key=len, reverse=True)
+    return '(?:' + '|'.join(alternatives) + ')'
+
+
+def build_cleanup_regex(texts):
+    """Gereksiz metinleri ve fazla boşlukları tek geçişte yakalayan regex deseni üret"""
+    return '(?:' + SPACE_CLASS + '*' + build_noise_regex(texts) + ')+' + SPACE_CLASS + '*|' + SPACE_CLASS + '+'
+
+
+SCRAPER_NOISE_RE = re.compile(build_noise_regex(SCRAPER_NOISE_TEXTS))
+CLEANER_CLEANUP_REGEX = build_cleanup_regex(CLEANER_NOISE_TEXTS)
+WHITESPACE_RE = re.compile(r'\s+')
+
+# normalize_review_text kuralları (sırası önemli). Desenler RE2 (pyarrow) ile de uyumludur;
+# yalnızca noktalama deseni Unicode \W için motor bazında ayrı tutulur.
+_LEADING_SYMBOLS_REGEX = r'^[^a-zA-Z0-9а-яА-Яçğıöşü]+'
+_PROFILE_NOISE_REGEX = r'\d+\.\s*şehir uzmanı|\d+\.\s*level local guide'
+_DATE_NOISE_REGEX = (
+    r'\d+\s*(?:' + '|'.join(MONTH_NAMES) + r')\s*'
+    r'|\d{1,2}\.\d{1,2}\.\d{4}'
+    r'|\d{1,2}/\d{1,2}/\d{4}'
+)
+_PUNCTUATION_REGEX = r'[\W_]+'
+_ARROW_PUNCTUATION_REGEX = r'[^\p{L}\p{N}]+'
+
+_LEADING_SYMBOLS_RE = re.compile(_LEADING_SYMBOLS_REGEX)
+_PROFILE_NOISE_RE = re.compile(_PROFILE_NOISE_REGEX)
+_DATE_NOISE_RE = re.compile(_DATE_NOISE_REGEX)
+_PUNCTUATION_RE = re.compile(_PUNCTUATION_REGEX)
+
+
+def normalize_review_text(text):
+    """Yorum metnini tekrar kontrolü için normalize et (küçük harf, noktalama, tarih/seviye temizliği)"""
+    if not text:
+        return ''
+    text = text.lower()
+    text = _LEADING_SYMBOLS_RE.sub('', text)
+    text = _PROFILE_NOISE_RE.sub('', text)
+    text = _DATE_NOISE_RE.sub('', text)
+    text = _PUNCTUATION_RE.sub(' ', text)
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+def string_dtype(prefer_arrow=True):
+    """Mümkünse pyarrow destekli string dtype'ı döndür"""
+    if prefer_arrow:
+        try:
+            import pyarrow  # noqa: F401
+            return "string[pyarrow]"
+        except ImportError:
+            pass
+    return "string[python]"
+
+
+def clean_review_texts(series, prefer_arrow=True):
+    """Yorum metinlerini vektörel temizle: gereksiz metinler + fazla boşluklar tek regex ile"""
+    series = series.fillna('').astype(string_dtype(prefer_arrow))
+    # Desen string olarak verilir ki pyarrow dtype'ında RE2 ile vektörel çalışsın
+    return series.str.replace(CLEANER_CLEANUP_REGEX, ' ', regex=True).str.strip()
+
+
+def normalize_review_texts(series, prefer_arrow=True):
+    """normalize_review_text kurallarını bir Series üzerinde vektörel uygula"""
+    series = series.fillna('').astype(string_dtype(prefer_arrow)).str.lower()
+    punctuation = _ARROW_PUNCTUATION_REGEX if series.dtype.storage == "pyarrow" else _PUNCTUATION_REGEX
+    for pattern, replacement in ((_LEADING_SYMBOLS_REGEX, ''), (_PROFILE_NOISE_REGEX, ''),
+                                 (_DATE_NOISE_REGEX, ''), (punctuation, ' ')):
+        series = series.str.replace(pattern, replacement, regex=True)
+    return series.str.strip()